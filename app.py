@@ -10,11 +10,16 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Initialize NLTK resources
+# Check NLTK resources locally (no network access at startup)
 from nltk_setup import initialize_nltk  # noqa: E402
-logger.info("Initializing NLTK resources...")
+logger.info("Checking NLTK resources...")
 initialize_nltk()
 
+# Optionally load models now rather than on the first request
+if Config.PRELOAD_MODELS:
+    from nlp_utils import warm_up  # noqa: E402
+    warm_up()
+
 # Create Flask app
 app = Flask(__name__)
 app.secret_key = os.environ.get("SESSION_SECRET", Config.SECRET_KEY)
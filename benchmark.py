@@ -0,0 +1,576 @@
+import argparse
+import json
+import logging
+import random
+import statistics
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+from nltk.corpus import stopwords
+from nltk.sentiment.vader import SentimentIntensityAnalyzer
+from nltk.stem import WordNetLemmatizer
+from nltk.tag import PerceptronTagger
+
+from config import Config
+from nlp_utils import (
+    perform_tokenization,
+    perform_stopword_removal,
+    perform_lemmatization,
+    perform_pos_tagging,
+    perform_ner,
+    perform_text_summarization,
+    perform_keyword_extraction,
+    perform_text_similarity,
+    perform_language_detection,
+    perform_batch,
+    get_language_detector_factory,
+    word_tokenize,
+    get_stopwords,
+    get_lemmatizer,
+    get_sentiment_analyzer,
+    get_vectorized_sentiment_analyzer,
+    get_pos_tagger,
+    get_spacy_model,
+    evict_spacy_doc,
+    SPACY_TASK_COMPONENTS,
+    _resolve_spacy_components,
+    _parse_spacy,
+    _split_sentences,
+    SUMMARY_METHODS,
+    KEYWORD_METHODS,
+    vector_cache
+)
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+# Tasks that can be benchmarked against both libraries
+BENCHMARK_TASKS = {
+    'tokenization': perform_tokenization,
+    'stopword_removal': perform_stopword_removal,
+    'lemmatization': perform_lemmatization,
+    'pos_tagging': perform_pos_tagging,
+    'ner': perform_ner
+}
+
+BENCHMARK_LIBRARIES = ('nltk', 'spacy')
+
+# Approximate length (in characters) of the generated benchmark texts
+TEXT_SIZES = {
+    'small': 500,
+    'medium': 5000,
+    'large': 50000
+}
+
+# Sentence counts of the generated summarization benchmark texts
+SUMMARY_SENTENCE_COUNTS = (10, 100, 1000)
+
+# Short texts in several languages and scripts for the language suite
+LANGUAGE_SAMPLES = (
+    "The quick brown fox jumps over the lazy dog.",
+    "El rápido zorro marrón salta sobre el perro perezoso.",
+    "Der schnelle braune Fuchs springt über den faulen Hund.",
+    "Быстрая коричневая лиса прыгает через ленивую собаку.",
+    "الثعلب البني السريع يقفز فوق الكلب الكسول",
+    "素早い茶色の狐がのろまな犬を飛び越える",
+    "빠른 갈색 여우가 게으른 개를 뛰어넘는다",
+    "Η γρήγορη καφέ αλεπού πηδάει πάνω από το τεμπέλικο σκυλί",
+    "สุนัขจิ้งจอกสีน้ำตาลกระโดดข้ามสุนัขขี้เกียจ",
+    "Le renard brun rapide saute par-dessus le chien paresseux."
+)
+
+MAX_REPETITIONS = 50
+MAX_WARMUP = 10
+
+# tracemalloc is process-wide, so only one benchmark may run at a time
+_benchmark_lock = threading.Lock()
+
+
+def generate_benchmark_text(task, size):
+    """
+    Generate a benchmark text of roughly the requested size.
+
+    Args:
+        task (str): The NLP task, used to pick a representative sample text
+        size (str): One of the keys of TEXT_SIZES
+
+    Returns:
+        str: Generated text
+    """
+    target_length = TEXT_SIZES[size]
+    sample = Config.SAMPLE_TEXTS.get(task, Config.DEFAULT_SAMPLE_TEXT)
+    repeats = max(1, -(-target_length // (len(sample) + 1)))
+    return ' '.join([sample] * repeats)
+
+
+def _percentile(values, percent):
+    """Return the given percentile of a list of values."""
+    return float(np.percentile(values, percent))
+
+
+def _time_call(func, *args):
+    """
+    Run a function once and measure its wall and CPU time.
+
+    Returns:
+        tuple: (wall_ms, cpu_ms)
+    """
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    func(*args)
+    cpu_ms = (time.thread_time() - cpu_start) * 1000
+    wall_ms = (time.perf_counter() - wall_start) * 1000
+    return wall_ms, cpu_ms
+
+
+def _peak_memory(func, *args):
+    """
+    Run a function once under tracemalloc and return its peak allocation.
+
+    Returns:
+        int: Peak traced memory in bytes
+    """
+    tracemalloc.start()
+    try:
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def benchmark_function(func, args, repetitions=5, warmup=1, setup=None):
+    """
+    Benchmark a callable with warm-up runs and repeated measurements.
+
+    Timings are collected without tracemalloc, which would otherwise slow
+    every allocation down; peak memory is measured in one extra run.
+
+    Args:
+        func (callable): The function to benchmark
+        args (tuple): Positional arguments for the function
+        repetitions (int): Number of measured runs
+        warmup (int): Number of unmeasured runs before measuring
+        setup (callable, optional): Called before every run, untimed
+
+    Returns:
+        dict: Timing and memory statistics
+    """
+    setup = setup or (lambda: None)
+    for _ in range(warmup):
+        setup()
+        func(*args)
+
+    wall_times = []
+    cpu_times = []
+    for _ in range(repetitions):
+        setup()
+        wall_ms, cpu_ms = _time_call(func, *args)
+        wall_times.append(wall_ms)
+        cpu_times.append(cpu_ms)
+
+    setup()
+    peak_bytes = _peak_memory(func, *args)
+
+    return {
+        'median_ms': statistics.median(wall_times),
+        'p95_ms': _percentile(wall_times, 95),
+        'min_ms': min(wall_times),
+        'cpu_median_ms': statistics.median(cpu_times),
+        'cpu_p95_ms': _percentile(cpu_times, 95),
+        'peak_memory_mb': peak_bytes / (1024 * 1024),
+        'repetitions': repetitions,
+        'warmup': warmup
+    }
+
+
+def run_benchmark(task, size='medium', repetitions=5, warmup=1,
+                  libraries=BENCHMARK_LIBRARIES):
+    """
+    Benchmark an NLP task for each library on a generated text.
+
+    Args:
+        task (str): The NLP task to benchmark
+        size (str): The text size ('small', 'medium' or 'large')
+        repetitions (int): Number of measured runs per library
+        warmup (int): Number of warm-up runs per library
+        libraries (tuple): Libraries to benchmark
+
+    Returns:
+        dict: Benchmark results keyed by library
+
+    Raises:
+        ValueError: If the task, size or run counts are invalid
+    """
+    if task not in BENCHMARK_TASKS:
+        raise ValueError(f"Unsupported benchmark task: {task}")
+    if size not in TEXT_SIZES:
+        raise ValueError(f"Unsupported text size: {size}")
+    if not 1 <= repetitions <= MAX_REPETITIONS:
+        raise ValueError(
+            f"Repetitions must be between 1 and {MAX_REPETITIONS}")
+    if not 0 <= warmup <= MAX_WARMUP:
+        raise ValueError(f"Warm-up runs must be between 0 and {MAX_WARMUP}")
+
+    func = BENCHMARK_TASKS[task]
+    text = generate_benchmark_text(task, size)
+
+    results = {}
+    with _benchmark_lock:
+        for library in libraries:
+            logger.info(f"Benchmarking {task} with {library} ({size})")
+            # Every run parses: a Doc cached by the previous run would
+            # turn spaCy timings into cache lookups
+            results[library] = benchmark_function(
+                func, (text, library), repetitions, warmup,
+                setup=lambda: evict_spacy_doc(text))
+
+    return {
+        'task': task,
+        'text_size': size,
+        'text_length': len(text),
+        'results': results
+    }
+
+
+def benchmark_resources(repetitions=5, warmup=1):
+    """
+    Compare building NLTK resources per request with the shared registry.
+
+    Each pair runs the same per-request work once with a freshly built
+    resource (the old behaviour) and once with the process-wide instance.
+
+    Args:
+        repetitions (int): Number of measured runs
+        warmup (int): Number of warm-up runs
+
+    Returns:
+        dict: Per-resource statistics and the median saving per request
+    """
+    text = Config.SAMPLE_TEXTS['sentiment_analysis']
+    words = word_tokenize(text)
+
+    cases = {
+        'vader_lexicon': (
+            lambda: SentimentIntensityAnalyzer().polarity_scores(text),
+            lambda: get_sentiment_analyzer().polarity_scores(text)),
+        'stopwords': (
+            lambda: set(stopwords.words('english')),
+            get_stopwords),
+        'wordnet_lemmatizer': (
+            lambda: [WordNetLemmatizer().lemmatize(w) for w in words],
+            lambda: [get_lemmatizer().lemmatize(w) for w in words]),
+        'perceptron_tagger': (
+            lambda: PerceptronTagger().tag(words),
+            lambda: get_pos_tagger().tag(words))
+    }
+
+    results = {}
+    with _benchmark_lock:
+        for name, (per_request, shared) in cases.items():
+            try:
+                before = benchmark_function(per_request, (), repetitions,
+                                            warmup)
+                after = benchmark_function(shared, (), repetitions, warmup)
+            except LookupError as e:
+                logger.warning(f"Skipping {name}: {str(e)}")
+                continue
+            results[name] = {
+                'per_request': before,
+                'shared': after,
+                'saving_ms': before['median_ms'] - after['median_ms']
+            }
+    return results
+
+
+def benchmark_spacy_pipelines(size='medium', repetitions=5, warmup=1):
+    """
+    Compare the full spaCy pipeline with the task-aware component selection.
+
+    Args:
+        size (str): The text size ('small', 'medium' or 'large')
+        repetitions (int): Number of measured runs
+        warmup (int): Number of warm-up runs
+
+    Returns:
+        dict: Per-task median latency of both variants and the speedup
+    """
+    nlp = get_spacy_model()
+    results = {}
+    with _benchmark_lock:
+        for task, components in SPACY_TASK_COMPONENTS.items():
+            text = generate_benchmark_text(task, size)
+            selected = _resolve_spacy_components(nlp, components)
+            full = benchmark_function(nlp, (text,), repetitions, warmup)
+            task_aware = benchmark_function(_parse_spacy,
+                                            (nlp, text, selected),
+                                            repetitions, warmup)
+            results[task] = {
+                'components': sorted(selected),
+                'full_pipeline_ms': full['median_ms'],
+                'task_aware_ms': task_aware['median_ms'],
+                'speedup': full['median_ms'] / task_aware['median_ms']
+            }
+    return results
+
+
+def benchmark_sentiment_engines(n_sentences=100000):
+    """
+    Compare stock VADER with the vectorized engine on many sentences.
+
+    Each engine scores the same sentences once; the scores of both engines
+    are compared to check the vectorized engine reproduces VADER.
+
+    Args:
+        n_sentences (int): Number of sentences to score
+
+    Returns:
+        dict: Time and throughput of each engine, the speedup and the
+            largest score difference
+    """
+    sentences = [sentence for text in Config.SAMPLE_TEXTS.values()
+                 for sentence in _split_sentences(text)]
+    sentences = (sentences * (n_sentences // len(sentences) + 1))[:n_sentences]
+
+    stock = get_sentiment_analyzer()
+    vectorized = get_vectorized_sentiment_analyzer()
+    with _benchmark_lock:
+        start = time.perf_counter()
+        stock_scores = [stock.polarity_scores(sentence)
+                        for sentence in sentences]
+        stock_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        vectorized_scores = vectorized.polarity_scores_batch(sentences)
+        vectorized_seconds = time.perf_counter() - start
+
+    max_difference = max(
+        abs(expected[key] - actual[key])
+        for expected, actual in zip(stock_scores, vectorized_scores)
+        for key in expected)
+    return {
+        'sentences': n_sentences,
+        'vader_seconds': stock_seconds,
+        'vectorized_seconds': vectorized_seconds,
+        'vader_sentences_per_second': n_sentences / stock_seconds,
+        'vectorized_sentences_per_second': n_sentences / vectorized_seconds,
+        'speedup': stock_seconds / vectorized_seconds,
+        'max_score_difference': max_difference
+    }
+
+
+def generate_sentences_text(count, seed=0):
+    """
+    Generate a text of distinct sentences drawn from the sample vocabulary.
+
+    Args:
+        count (int): Number of sentences
+        seed (int): Random seed, so runs are comparable
+
+    Returns:
+        str: Generated text
+    """
+    rng = random.Random(seed)
+    words = Config.SAMPLE_TEXTS['text_summarization'].replace('.', '').split()
+    return ' '.join(
+        ' '.join(rng.choices(words, k=rng.randint(8, 20))) + '.'
+        for _ in range(count))
+
+
+def benchmark_summarization(counts=SUMMARY_SENTENCE_COUNTS, repetitions=5,
+                            warmup=1):
+    """
+    Compare the summarization methods on texts of increasing length.
+
+    Args:
+        counts (tuple): Sentence counts of the generated texts
+        repetitions (int): Number of measured runs
+        warmup (int): Number of warm-up runs
+
+    Returns:
+        dict: Median latency per method, keyed by sentence count
+    """
+    results = {}
+    with _benchmark_lock:
+        for count in counts:
+            text = generate_sentences_text(count)
+            results[count] = {
+                method: benchmark_function(
+                    lambda: perform_text_summarization(text, method=method),
+                    (), repetitions, warmup)['median_ms']
+                for method in SUMMARY_METHODS
+            }
+    return results
+
+
+def benchmark_keyword_methods(size='medium', repetitions=5, warmup=1):
+    """
+    Compare the keyword extraction methods for each library.
+
+    Methods a library cannot run (noun chunks without spaCy, or with a
+    model that has no parser) are skipped.
+
+    Args:
+        size (str): The text size ('small', 'medium' or 'large')
+        repetitions (int): Number of measured runs
+        warmup (int): Number of warm-up runs
+
+    Returns:
+        dict: Median latency per method, keyed by library
+    """
+    text = generate_benchmark_text('keyword_extraction', size)
+    results = {}
+    with _benchmark_lock:
+        for library in BENCHMARK_LIBRARIES:
+            results[library] = {}
+            for method in KEYWORD_METHODS:
+                try:
+                    perform_keyword_extraction(text, library, method)
+                except ValueError as e:
+                    logger.warning(f"Skipping {method} with {library}: "
+                                   f"{str(e)}")
+                    continue
+                results[library][method] = benchmark_function(
+                    perform_keyword_extraction, (text, library, method),
+                    repetitions, warmup,
+                    setup=lambda: evict_spacy_doc(text))['median_ms']
+    return {'text_length': len(text), 'results': results}
+
+
+def benchmark_similarity_vectorizers(n_texts=50):
+    """
+    Compare the similarity vectorizers on every pair of a set of texts.
+
+    The hashing vectorizer is timed twice: with an empty vector cache and
+    again with every text's vector cached.
+
+    Args:
+        n_texts (int): Number of texts; all pairs of them are compared
+
+    Returns:
+        dict: Total time per variant and how far hashing scores are from
+            the per-pair TF-IDF scores
+    """
+    texts = [generate_sentences_text(3 + i % 5, seed=i)
+             for i in range(n_texts)]
+    pairs = [(a, b) for i, a in enumerate(texts) for b in texts[i + 1:]]
+
+    def compare_all(vectorizer):
+        start = time.perf_counter()
+        scores = [perform_text_similarity(a, b, vectorizer=vectorizer)[0]
+                  ['similarity_score'] for a, b in pairs]
+        return time.perf_counter() - start, np.array(scores)
+
+    with _benchmark_lock:
+        tfidf_seconds, tfidf_scores = compare_all('tfidf')
+        vector_cache.clear()
+        cold_seconds, hashing_scores = compare_all('hashing')
+        warm_seconds, _ = compare_all('hashing')
+
+    differences = np.abs(hashing_scores - tfidf_scores)
+    return {
+        'pairs': len(pairs),
+        'tfidf_seconds': tfidf_seconds,
+        'hashing_cold_seconds': cold_seconds,
+        'hashing_warm_seconds': warm_seconds,
+        'max_score_difference': float(differences.max()),
+        'mean_score_difference': float(differences.mean()),
+        'score_correlation': float(np.corrcoef(hashing_scores,
+                                               tfidf_scores)[0, 1])
+    }
+
+
+def benchmark_language_detection(n_texts=1000):
+    """
+    Compare language detection with the former two-pass approach.
+
+    The baseline runs langdetect's detect() and then detect_langs() on
+    each text, as language detection used to; it is compared with
+    perform_language_detection per text and with one batch.
+
+    Args:
+        n_texts (int): Number of texts, cycling through LANGUAGE_SAMPLES
+
+    Returns:
+        dict: Time per variant and how often the detected codes agree
+    """
+    texts = [LANGUAGE_SAMPLES[i % len(LANGUAGE_SAMPLES)]
+             for i in range(n_texts)]
+    factory = get_language_detector_factory()
+
+    def two_pass(text):
+        detector = factory.create()
+        detector.append(text)
+        language_code = detector.detect()
+        detector = factory.create()
+        detector.append(text)
+        detector.get_probabilities()
+        return language_code
+
+    with _benchmark_lock:
+        start = time.perf_counter()
+        baseline = [two_pass(text) for text in texts]
+        baseline_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        single = [perform_language_detection(text)['language_code']
+                  for text in texts]
+        single_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        perform_batch('language_detection',
+                      [(i, text, None) for i, text in enumerate(texts)])
+        batch_seconds = time.perf_counter() - start
+
+    return {
+        'texts': n_texts,
+        'two_pass_seconds': baseline_seconds,
+        'single_pass_seconds': single_seconds,
+        'batch_seconds': batch_seconds,
+        'speedup': baseline_seconds / single_seconds,
+        'agreement': sum(a == b for a, b in zip(baseline, single)) / n_texts
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Benchmark the NLP tasks and their building blocks')
+    parser.add_argument('suite', nargs='?', default='tasks',
+                        choices=['tasks', 'resources', 'pipelines',
+                                 'sentiment', 'summarization', 'keywords',
+                                 'similarity', 'language'])
+    parser.add_argument('--task', default='tokenization',
+                        choices=sorted(BENCHMARK_TASKS))
+    parser.add_argument('--size', default='medium', choices=list(TEXT_SIZES))
+    parser.add_argument('--repetitions', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--sentences', type=int, default=100000,
+                        help='number of sentences for the sentiment suite')
+    cli_args = parser.parse_args()
+
+    if cli_args.suite == 'resources':
+        output = benchmark_resources(cli_args.repetitions, cli_args.warmup)
+    elif cli_args.suite == 'pipelines':
+        output = benchmark_spacy_pipelines(cli_args.size,
+                                           cli_args.repetitions,
+                                           cli_args.warmup)
+    elif cli_args.suite == 'sentiment':
+        output = benchmark_sentiment_engines(cli_args.sentences)
+    elif cli_args.suite == 'language':
+        output = benchmark_language_detection()
+    elif cli_args.suite == 'similarity':
+        output = benchmark_similarity_vectorizers()
+    elif cli_args.suite == 'keywords':
+        output = benchmark_keyword_methods(cli_args.size,
+                                           cli_args.repetitions,
+                                           cli_args.warmup)
+    elif cli_args.suite == 'summarization':
+        output = benchmark_summarization(repetitions=cli_args.repetitions,
+                                         warmup=cli_args.warmup)
+    else:
+        output = run_benchmark(cli_args.task, cli_args.size,
+                               cli_args.repetitions, cli_args.warmup)
+    print(json.dumps(output, indent=2))
@@ -0,0 +1,550 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from config import Config
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+
+def hash_text(text):
+    """
+    Return a stable content hash for a text.
+
+    Args:
+        text (str): The text to hash (None is treated as empty)
+
+    Returns:
+        str: Hex-encoded SHA-256 digest
+    """
+    return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache bounded by entry count and size.
+
+    Each entry is stored with its size in bytes; when either bound is
+    exceeded the least recently used entries are evicted. Entries can also
+    expire after a time-to-live. Hit, miss, eviction and expiration
+    counters are kept so the bounds can be tuned from stats().
+    """
+
+    def __init__(self, max_entries=128, max_bytes=64 * 1024 * 1024,
+                 sizeof=None, ttl=None):
+        """
+        Args:
+            max_entries (int): Maximum number of entries
+            max_bytes (int): Maximum total size of all entries in bytes
+            sizeof (callable, optional): Function returning the size of a
+                value in bytes, used when set() is not given a size
+            ttl (float, optional): Seconds after which entries expire
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._sizeof = sizeof or sys.getsizeof
+        # key -> (value, size, expires_at)
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _expired(self, entry):
+        """Check whether an entry has outlived its time-to-live."""
+        return entry[2] is not None and entry[2] <= time.monotonic()
+
+    def _remove(self, key):
+        """Remove an entry and release its size (lock must be held)."""
+        entry = self._entries.pop(key)
+        self._total_bytes -= entry[1]
+        return entry
+
+    def get(self, key, default=None, validate=None):
+        """
+        Return the value for key and mark it as recently used.
+
+        Args:
+            key: The cache key
+            default: Value returned on a miss
+            validate (callable, optional): Entries for which this returns
+                False are left in place but treated as a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry):
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None or (validate and not validate(entry[0])):
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def peek(self, key, default=None):
+        """Return the value for key without updating recency or counters."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._expired(entry):
+                return default
+            return entry[0]
+
+    def set(self, key, value, size=None, ttl=None):
+        """
+        Store a value, evicting old entries if the cache is over its bounds.
+
+        Values larger than max_bytes on their own are not cached. ttl, when
+        given, replaces the cache's time-to-live for this entry.
+        """
+        if size is None:
+            size = self._sizeof(value)
+        if size > self.max_bytes:
+            logger.debug(f"Not caching value of {size} bytes (limit "
+                         f"{self.max_bytes})")
+            return
+
+        if ttl is None:
+            ttl = self.ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, expires_at)
+            self._total_bytes += size
+            self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries until within bounds."""
+        while self._entries and (len(self._entries) > self.max_entries
+                                 or self._total_bytes > self.max_bytes):
+            _, (_, size, _) = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            self.evictions += 1
+
+    def purge_expired(self):
+        """
+        Remove all expired entries.
+
+        Returns:
+            int: Number of entries removed
+        """
+        with self._lock:
+            expired = [key for key, entry in self._entries.items()
+                       if self._expired(entry)]
+            for key in expired:
+                self._remove(key)
+            self.expirations += len(expired)
+            return len(expired)
+
+    def pop(self, key, default=None):
+        """Remove an entry and return its value."""
+        with self._lock:
+            if key not in self._entries:
+                return default
+            return self._remove(key)[0]
+
+    def clear(self):
+        """Remove all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self):
+        """
+        Get cache usage statistics.
+
+        Returns:
+            dict: Entry/byte usage and hit, miss and eviction counters
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'ttl': self.ttl,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+class SQLiteCache:
+    """
+    Cache stored in a local SQLite database shared by all worker processes.
+
+    The database runs in WAL mode so readers in one worker do not block
+    writers in another. Values are pickled and zlib-compressed when large.
+    A background thread in each process drops expired entries and compacts
+    the database back under max_bytes by evicting least recently used
+    entries.
+    """
+
+    # Values whose pickle is at least this large are compressed
+    COMPRESS_MIN_BYTES = 512
+    # Access times are only rewritten when older than this many seconds
+    TOUCH_INTERVAL = 60
+
+    def __init__(self, path, namespace, max_bytes=256 * 1024 * 1024,
+                 ttl=None, maintenance_interval=60):
+        """
+        Args:
+            path (str): Path of the SQLite database file
+            namespace (str): Name separating this cache's keys from others
+            max_bytes (int): Size the compaction pass shrinks the whole
+                database's values to
+            ttl (float, optional): Seconds after which entries expire
+            maintenance_interval (float): Seconds between expiry and
+                compaction passes (0 disables the background thread)
+        """
+        self.path = path
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.maintenance_interval = maintenance_interval
+        self._local = threading.local()
+        self._maintenance_pid = None
+        self._maintenance_lock = threading.Lock()
+        # Guards the counters, which several threads update
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _connection(self):
+        """Get this thread's connection, reopening it after a fork."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5,
+                                   isolation_level=None)
+            conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cache (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )''')
+            conn.execute('CREATE INDEX IF NOT EXISTS cache_accessed '
+                         'ON cache (accessed_at)')
+            conn.execute('CREATE INDEX IF NOT EXISTS cache_expires '
+                         'ON cache (expires_at)')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+            self._start_maintenance()
+        return conn
+
+    @staticmethod
+    def _key(key):
+        """Encode a (possibly tuple) key as text."""
+        return json.dumps(key, separators=(',', ':'))
+
+    @classmethod
+    def _encode(cls, value):
+        """Encode a value as a compact binary blob."""
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) >= cls.COMPRESS_MIN_BYTES:
+            return b'z' + zlib.compress(data)
+        return b'p' + data
+
+    @staticmethod
+    def _decode(blob):
+        """Decode a blob written by _encode."""
+        data = blob[1:]
+        if blob[:1] == b'z':
+            data = zlib.decompress(data)
+        return pickle.loads(data)
+
+    def get(self, key, default=None):
+        """Return the value for key, or default if missing or expired."""
+        return self.get_with_ttl(key, default)[0]
+
+    def get_with_ttl(self, key, default=None):
+        """
+        Look up a key along with the seconds left before it expires.
+
+        Returns:
+            tuple: (value, ttl), where ttl is None for entries that don't
+                expire and for misses
+        """
+        conn = self._connection()
+        now = time.time()
+        text_key = self._key(key)
+        row = conn.execute(
+            'SELECT value, expires_at FROM cache '
+            'WHERE namespace = ? AND key = ?',
+            (self.namespace, text_key)).fetchone()
+        if row is None or (row[1] is not None and row[1] <= now):
+            with self._stats_lock:
+                self.misses += 1
+            return default, None
+
+        conn.execute(
+            'UPDATE cache SET accessed_at = ? '
+            'WHERE namespace = ? AND key = ? AND accessed_at < ?',
+            (now, self.namespace, text_key, now - self.TOUCH_INTERVAL))
+        with self._stats_lock:
+            self.hits += 1
+        ttl = row[1] - now if row[1] is not None else None
+        return self._decode(row[0]), ttl
+
+    def set(self, key, value, size=None):
+        """Store a value (size is taken from the encoded blob)."""
+        blob = self._encode(value)
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl else None
+        self._connection().execute(
+            'INSERT OR REPLACE INTO cache '
+            '(namespace, key, value, size, expires_at, accessed_at) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            (self.namespace, self._key(key), blob, len(blob), expires_at,
+             now))
+
+    def pop(self, key, default=None):
+        """Remove an entry and return its value (not counted as a lookup)."""
+        conn = self._connection()
+        text_key = self._key(key)
+        row = conn.execute(
+            'SELECT value, expires_at FROM cache '
+            'WHERE namespace = ? AND key = ?',
+            (self.namespace, text_key)).fetchone()
+        conn.execute('DELETE FROM cache WHERE namespace = ? AND key = ?',
+                     (self.namespace, text_key))
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            return default
+        return self._decode(row[0])
+
+    def clear(self):
+        """Remove all entries of this namespace."""
+        self._connection().execute('DELETE FROM cache WHERE namespace = ?',
+                                   (self.namespace,))
+
+    def purge_expired(self):
+        """
+        Remove expired entries of all namespaces.
+
+        Returns:
+            int: Number of entries removed
+        """
+        removed = self._connection().execute(
+            'DELETE FROM cache WHERE expires_at <= ?',
+            (time.time(),)).rowcount
+        with self._stats_lock:
+            self.expirations += removed
+        return removed
+
+    def compact(self):
+        """
+        Evict least recently used entries until the database is within
+        max_bytes, then return the freed pages to the filesystem.
+
+        Returns:
+            int: Number of entries evicted
+        """
+        conn = self._connection()
+        total = conn.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM cache').fetchone()[0]
+        excess = total - self.max_bytes
+        if excess <= 0:
+            return 0
+
+        victims = []
+        for namespace, key, size in conn.execute(
+                'SELECT namespace, key, size FROM cache '
+                'ORDER BY accessed_at'):
+            victims.append((namespace, key))
+            excess -= size
+            if excess <= 0:
+                break
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany(
+                'DELETE FROM cache WHERE namespace = ? AND key = ?', victims)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('PRAGMA incremental_vacuum')
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        with self._stats_lock:
+            self.evictions += len(victims)
+        return len(victims)
+
+    def _start_maintenance(self):
+        """Start the expiry/compaction thread once per process."""
+        if not self.maintenance_interval:
+            return
+        with self._maintenance_lock:
+            if self._maintenance_pid == os.getpid():
+                return
+            self._maintenance_pid = os.getpid()
+        thread = threading.Thread(target=self._maintenance_loop,
+                                  name=f"cache-maintenance-{self.namespace}",
+                                  daemon=True)
+        thread.start()
+
+    def _maintenance_loop(self):
+        """Periodically drop expired entries and compact the database."""
+        while True:
+            time.sleep(self.maintenance_interval)
+            try:
+                self.purge_expired()
+                self.compact()
+            except sqlite3.Error as e:
+                logger.warning(f"Cache maintenance failed: {str(e)}")
+
+    def stats(self):
+        """
+        Get cache usage statistics for this namespace.
+
+        Returns:
+            dict: Entry/byte usage and this process's counters
+        """
+        entries, total = self._connection().execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache '
+            'WHERE namespace = ?', (self.namespace,)).fetchone()
+        with self._stats_lock:
+            hits, misses = self.hits, self.misses
+            evictions, expirations = self.evictions, self.expirations
+        lookups = hits + misses
+        return {
+            'path': self.path,
+            'entries': entries,
+            'bytes': total,
+            'max_bytes': self.max_bytes,
+            'hits': hits,
+            'misses': misses,
+            'evictions': evictions,
+            'expirations': expirations,
+            'ttl': self.ttl,
+            'hit_rate': hits / lookups if lookups else 0.0
+        }
+
+
+class TieredCache:
+    """
+    Two-level cache: an in-process LRUCache (L1) in front of a shared
+    backend (L2). L2 hits are promoted into L1, expiring no later than
+    their L2 entry.
+    """
+
+    def __init__(self, l1, l2):
+        self.l1 = l1
+        self.l2 = l2
+
+    def get(self, key, default=None):
+        """Return the value for key from L1, falling back to L2."""
+        value = self.l1.get(key)
+        if value is not None:
+            return value
+        try:
+            value, ttl = self.l2.get_with_ttl(key)
+        except sqlite3.Error as e:
+            logger.warning(f"Shared cache read failed: {str(e)}")
+            return default
+        if value is None:
+            return default
+        if ttl is not None and self.l1.ttl:
+            ttl = min(ttl, self.l1.ttl)
+        self.l1.set(key, value, ttl=ttl)
+        return value
+
+    def set(self, key, value, size=None):
+        """Store a value in both levels."""
+        self.l1.set(key, value, size)
+        try:
+            self.l2.set(key, value, size)
+        except sqlite3.Error as e:
+            logger.warning(f"Shared cache write failed: {str(e)}")
+
+    def pop(self, key, default=None):
+        """Remove an entry from both levels."""
+        value = self.l1.pop(key, default)
+        try:
+            l2_value = self.l2.pop(key, default)
+        except sqlite3.Error as e:
+            logger.warning(f"Shared cache delete failed: {str(e)}")
+            return value
+        return l2_value if value is default else value
+
+    def clear(self):
+        """Remove all entries from both levels."""
+        self.l1.clear()
+        self.l2.clear()
+
+    def purge_expired(self):
+        """Remove expired entries from both levels."""
+        return self.l1.purge_expired() + self.l2.purge_expired()
+
+    def stats(self):
+        """Get statistics for both levels."""
+        return {'l1': self.l1.stats(), 'l2': self.l2.stats()}
+
+
+def create_cache(namespace, max_entries, max_bytes, ttl=None, sizeof=None):
+    """
+    Create a cache using the configured backend.
+
+    With CACHE_BACKEND=sqlite the in-memory LRU becomes an L1 in front of
+    the SQLite database shared by all workers on the node.
+
+    Args:
+        namespace (str): Name separating this cache's keys in shared storage
+        max_entries (int): Maximum number of in-memory entries
+        max_bytes (int): Maximum size of the in-memory entries
+        ttl (float, optional): Seconds after which entries expire
+        sizeof (callable, optional): Size function for in-memory values
+
+    Returns:
+        LRUCache or TieredCache: The cache
+    """
+    memory = LRUCache(max_entries=max_entries, max_bytes=max_bytes,
+                      sizeof=sizeof, ttl=ttl)
+    if max_entries <= 0:
+        # A disabled cache stays disabled regardless of the backend
+        return memory
+    if Config.CACHE_BACKEND == 'sqlite':
+        shared = SQLiteCache(Config.CACHE_SQLITE_PATH, namespace,
+                             max_bytes=Config.CACHE_SQLITE_MAX_BYTES,
+                             ttl=ttl,
+                             maintenance_interval=Config.CACHE_MAINTENANCE_INTERVAL)
+        return TieredCache(memory, shared)
+    if Config.CACHE_BACKEND != 'memory':
+        logger.warning(f"Unknown cache backend '{Config.CACHE_BACKEND}', "
+                       f"using memory")
+    return memory
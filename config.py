@@ -18,8 +18,122 @@ class Config:
     GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY", "")
     GEMINI_MODEL = os.environ.get("GEMINI_MODEL", "gemini-1.5-flash")
 
+    # Model and corpus resources (never downloaded at import time)
+    SPACY_MODEL = os.environ.get("SPACY_MODEL", "en_core_web_sm")
+    NLTK_DATA_PATH = os.environ.get("NLTK_DATA_PATH", "")
+    NLTK_AUTO_DOWNLOAD = os.environ.get("NLTK_AUTO_DOWNLOAD", "0") == "1"
+    PRELOAD_MODELS = os.environ.get("PRELOAD_MODELS", "0") == "1"
+
+    # Shared cache of parsed spaCy Docs
+    DOC_CACHE_MAX_ENTRIES = int(os.environ.get("DOC_CACHE_MAX_ENTRIES", "256"))
+    DOC_CACHE_MAX_BYTES = int(
+        os.environ.get("DOC_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+    # Texts longer than SPACY_CHUNK_CHARS are parsed in chunks split at
+    # paragraph/sentence boundaries; from SPACY_PARALLEL_MIN_CHARS on, the
+    # chunks are parsed by up to SPACY_N_PROCESS processes
+    SPACY_CHUNK_CHARS = int(os.environ.get("SPACY_CHUNK_CHARS", "100000"))
+    SPACY_PARALLEL_MIN_CHARS = int(
+        os.environ.get("SPACY_PARALLEL_MIN_CHARS", "500000"))
+    SPACY_N_PROCESS = int(os.environ.get("SPACY_N_PROCESS", "1"))
+
+    # Per-sentence results for incremental re-analysis
+    SENTENCE_CACHE_MAX_ENTRIES = int(
+        os.environ.get("SENTENCE_CACHE_MAX_ENTRIES", "20000"))
+    SENTENCE_CACHE_MAX_BYTES = int(
+        os.environ.get("SENTENCE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+    # Cache of /api/process results (set max entries to 0 to disable)
+    RESULT_CACHE_MAX_ENTRIES = int(
+        os.environ.get("RESULT_CACHE_MAX_ENTRIES", "1024"))
+    RESULT_CACHE_MAX_BYTES = int(
+        os.environ.get("RESULT_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+    RESULT_CACHE_TTL = float(os.environ.get("RESULT_CACHE_TTL", "3600")) or None
+
+    # Streaming tokenization (/api/process/stream)
+    STREAM_CHUNK_SIZE = int(os.environ.get("STREAM_CHUNK_SIZE", "65536"))
+    STREAM_BATCH_SENTENCES = int(
+        os.environ.get("STREAM_BATCH_SENTENCES", "64"))
+    STREAM_MAX_SENTENCE_CHARS = int(
+        os.environ.get("STREAM_MAX_SENTENCE_CHARS", "100000"))
+
+    # Gemini response cache
+    GEMINI_CACHE_MAX_ENTRIES = int(
+        os.environ.get("GEMINI_CACHE_MAX_ENTRIES", "256"))
+    GEMINI_CACHE_MAX_BYTES = int(
+        os.environ.get("GEMINI_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+    GEMINI_CACHE_TTL = float(os.environ.get("GEMINI_CACHE_TTL", "86400")) or None
+
+    # Cache backend: 'memory' (per process) or 'sqlite' (shared by all
+    # workers on the node, with the in-memory cache in front as L1)
+    CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "memory")
+    CACHE_SQLITE_PATH = os.environ.get("CACHE_SQLITE_PATH",
+                                       "instance/nlp_cache.sqlite3")
+    CACHE_SQLITE_MAX_BYTES = int(
+        os.environ.get("CACHE_SQLITE_MAX_BYTES", str(512 * 1024 * 1024)))
+    CACHE_MAINTENANCE_INTERVAL = float(
+        os.environ.get("CACHE_MAINTENANCE_INTERVAL", "60"))
+
+    # Hashed similarity vectors: feature space size and per-text cache
+    HASHING_FEATURES = int(os.environ.get("HASHING_FEATURES", str(2 ** 20)))
+    VECTOR_CACHE_MAX_ENTRIES = int(
+        os.environ.get("VECTOR_CACHE_MAX_ENTRIES", "10000"))
+    VECTOR_CACHE_MAX_BYTES = int(
+        os.environ.get("VECTOR_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+    # Reference documents for /api/similarity/search
+    CORPUS_INDEX_PATH = os.environ.get("CORPUS_INDEX_PATH",
+                                       "instance/corpus_index.npz")
+    SIMILARITY_MAX_TOP_K = int(os.environ.get("SIMILARITY_MAX_TOP_K", "100"))
+
+    # /api/similarity/matrix: documents per request, documents for a full
+    # (unthresholded) matrix, pairs above a threshold, and scores computed
+    # per row block
+    SIMILARITY_MATRIX_MAX_DOCUMENTS = int(
+        os.environ.get("SIMILARITY_MATRIX_MAX_DOCUMENTS", "50000"))
+    SIMILARITY_MATRIX_MAX_DENSE = int(
+        os.environ.get("SIMILARITY_MATRIX_MAX_DENSE", "2000"))
+    SIMILARITY_MATRIX_MAX_PAIRS = int(
+        os.environ.get("SIMILARITY_MATRIX_MAX_PAIRS", "1000000"))
+    SIMILARITY_BLOCK_CELLS = int(
+        os.environ.get("SIMILARITY_BLOCK_CELLS", "4000000"))
+
+    # Minimum estimated Jaccard similarity of near-duplicate documents
+    NEAR_DUPLICATE_THRESHOLD = float(
+        os.environ.get("NEAR_DUPLICATE_THRESHOLD", "0.8"))
+
+    # Batch processing limits
+    BATCH_MAX_ITEMS = int(os.environ.get("BATCH_MAX_ITEMS", "5000"))
+    BATCH_DEFAULT_SIZE = int(os.environ.get("BATCH_DEFAULT_SIZE", "64"))
+    # Worker processes a batch request may start; every gunicorn worker can
+    # start this many per request, so raise it only with spare cores
+    BATCH_MAX_PROCESSES = int(os.environ.get("BATCH_MAX_PROCESSES", "1"))
+
     # NLP default settings
     DEFAULT_LIBRARY = "nltk"
+    # Sentiment scorer: 'vader' (stock NLTK) or 'vectorized' (NumPy engine)
+    DEFAULT_SENTIMENT_ENGINE = os.environ.get("DEFAULT_SENTIMENT_ENGINE",
+                                              "vader")
+    # Background IDF table for keyword extraction (built by idf_table.py)
+    IDF_TABLE_PATH = os.environ.get("IDF_TABLE_PATH", "instance/idf_table")
+    # Fraction of sentences kept by extractive summarization
+    SUMMARY_RATIO = float(os.environ.get("SUMMARY_RATIO", "0.3"))
+    # Longest text accepted for summarization
+    SUMMARY_MAX_CHARS = int(os.environ.get("SUMMARY_MAX_CHARS", "5000000"))
+    # Texts longer than this are summarized hierarchically, a section of
+    # SUMMARY_SECTION_CHARS at a time over SUMMARY_N_PROCESS processes
+    SUMMARY_HIERARCHICAL_CHARS = int(
+        os.environ.get("SUMMARY_HIERARCHICAL_CHARS", "100000"))
+    SUMMARY_SECTION_CHARS = int(
+        os.environ.get("SUMMARY_SECTION_CHARS", "20000"))
+    SUMMARY_N_PROCESS = int(os.environ.get("SUMMARY_N_PROCESS", "1"))
+    # TextRank summarization: edges kept per sentence, damping factor and
+    # the L1 change at which power iteration stops
+    TEXTRANK_NEIGHBOURS = int(os.environ.get("TEXTRANK_NEIGHBOURS", "10"))
+    TEXTRANK_DAMPING = float(os.environ.get("TEXTRANK_DAMPING", "0.85"))
+    TEXTRANK_TOLERANCE = float(os.environ.get("TEXTRANK_TOLERANCE", "1e-6"))
+    TEXTRANK_MAX_ITERATIONS = int(
+        os.environ.get("TEXTRANK_MAX_ITERATIONS", "100"))
     DEFAULT_SAMPLE_TEXT = "Natural language processing (NLP) is a subfield of linguistics, computer science, and artificial intelligence concerned with the interactions between computers and human language."
 
     # Sample texts for different tasks
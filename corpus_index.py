@@ -0,0 +1,362 @@
+import fcntl
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+from scipy.sparse import csr_matrix, diags, vstack
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from config import Config
+from nlp_utils import (
+    MINHASH_BANDS,
+    MINHASH_EMPTY,
+    MINHASH_PERMUTATIONS,
+    MINHASH_SHINGLE_WORDS,
+    MinHashLSH,
+    estimate_jaccard,
+    minhash_band_keys,
+    minhash_signature,
+    minhash_signatures
+)
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+# Stop words left out of the index, as in nlp_utils' TF-IDF similarity
+STOP_WORDS = 'english'
+
+# Signature layout saved with the index; signatures saved with another
+# layout cannot be compared with new ones
+MINHASH_LAYOUT = [MINHASH_PERMUTATIONS, MINHASH_BANDS, MINHASH_SHINGLE_WORDS]
+
+
+class CorpusIndex:
+    """
+    TF-IDF index of reference documents for one-vs-corpus similarity.
+
+    Raw term counts are kept in a CSR matrix over a vocabulary that grows
+    as documents are added, together with per-term document frequencies,
+    so adding documents never refits the existing ones. The L2-normalised
+    TF-IDF matrix, weighted exactly as TfidfVectorizer would weight the
+    same corpus, is rebuilt lazily on the first search after an add; a
+    search is then one sparse matrix-vector product and an argpartition.
+
+    Each document's MinHash signature is kept alongside its counts; the
+    LSH buckets over them are built on the first near-duplicate lookup
+    and extended as documents are added.
+    """
+
+    def __init__(self):
+        # The same terms as the pairwise and matrix similarity vectorizers
+        self.analyzer = TfidfVectorizer(
+            stop_words=STOP_WORDS).build_analyzer()
+        self.vocabulary = {}
+        self.ids = []
+        self.id_rows = {}
+        self.counts = csr_matrix((0, 0), dtype=np.float64)
+        self.document_frequency = np.zeros(0, dtype=np.int64)
+        self.signatures = np.zeros((0, MINHASH_PERMUTATIONS), dtype=np.uint32)
+        self._lsh = None
+        self._pending = []
+        self._weighted = None
+        self._idf = None
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _count_vector(self, text, grow):
+        """
+        Count the terms of a text as a (1 x vocabulary) row.
+
+        Args:
+            text (str): The text
+            grow (bool): Add unseen terms to the vocabulary; otherwise
+                they are ignored
+
+        Returns:
+            tuple: (column indices, counts) of the row
+        """
+        counts = {}
+        for term in self.analyzer(text):
+            column = self.vocabulary.get(term)
+            if column is None:
+                if not grow:
+                    continue
+                column = self.vocabulary[term] = len(self.vocabulary)
+            counts[column] = counts.get(column, 0) + 1
+        columns = np.fromiter(counts, dtype=np.int64, count=len(counts))
+        values = np.fromiter(counts.values(), dtype=np.float64,
+                             count=len(counts))
+        return columns, values
+
+    def add(self, documents):
+        """
+        Add documents to the index.
+
+        Args:
+            documents (list): (id, text) pairs
+
+        Raises:
+            ValueError: If an id is already indexed or repeated
+        """
+        with self._lock:
+            new_ids = {}
+            for doc_id, _ in documents:
+                if doc_id in self.id_rows or doc_id in new_ids:
+                    raise ValueError(f"Document already indexed: {doc_id}")
+                new_ids[doc_id] = len(self.ids) + len(new_ids)
+            rows = [self._count_vector(text, grow=True)
+                    for _, text in documents]
+
+            size = len(self.vocabulary)
+            frequency = np.zeros(size, dtype=np.int64)
+            frequency[:len(self.document_frequency)] = self.document_frequency
+            for columns, _ in rows:
+                frequency[columns] += 1
+            self.document_frequency = frequency
+
+            signatures = minhash_signatures([text for _, text in documents])
+            if self._lsh is not None:
+                self._lsh.add(*minhash_band_keys(signatures), len(self.ids))
+            self.signatures = np.concatenate([self.signatures, signatures])
+
+            self._pending.extend(rows)
+            self.ids.extend(new_ids)
+            self.id_rows.update(new_ids)
+            self._weighted = None
+
+    def _flush(self):
+        """Append pending rows to the count matrix."""
+        if not self._pending:
+            return
+        size = len(self.vocabulary)
+        lengths = [len(columns) for columns, _ in self._pending]
+        pending = csr_matrix(
+            (np.concatenate([values for _, values in self._pending]),
+             np.concatenate([columns for columns, _ in self._pending]),
+             np.concatenate([[0], np.cumsum(lengths)])),
+            shape=(len(self._pending), size))
+        existing = self.counts
+        existing.resize((existing.shape[0], size))
+        self.counts = vstack([existing, pending], format='csr')
+        self._pending = []
+
+    def _weighted_matrix(self):
+        """Get the normalised TF-IDF matrix, rebuilding it after adds."""
+        if self._weighted is None:
+            self._flush()
+            documents = len(self.ids)
+            self._idf = (np.log((1 + documents) /
+                                (1 + self.document_frequency)) + 1)
+            weighted = self.counts @ diags(self._idf)
+            norms = np.sqrt(np.asarray(
+                weighted.multiply(weighted).sum(axis=1)).ravel())
+            norms[norms == 0] = 1
+            self._weighted = (diags(1 / norms) @ weighted).tocsr()
+        return self._weighted
+
+    def search(self, text, top_k=10):
+        """
+        Find the indexed documents most similar to a text.
+
+        Args:
+            text (str): The query text
+            top_k (int): Number of documents to return
+
+        Returns:
+            list: {'id', 'score'} dictionaries, most similar first
+        """
+        with self._lock:
+            if not self.ids:
+                return []
+            matrix = self._weighted_matrix()
+            columns, values = self._count_vector(text, grow=False)
+            query = values * self._idf[columns]
+            norm = np.linalg.norm(query)
+            if norm == 0:
+                return []
+            query_vector = np.zeros(matrix.shape[1])
+            query_vector[columns] = query / norm
+            scores = matrix @ query_vector
+            ids = self.ids
+
+        top_k = min(top_k, len(scores))
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.lexsort((top, -scores[top]))]
+        return [{'id': ids[i], 'score': float(scores[i])} for i in top
+                if scores[i] > 0]
+
+    def _lsh_index(self):
+        """Get the LSH buckets, building them on first use."""
+        if self._lsh is None:
+            self._lsh = MinHashLSH()
+            self._lsh.add(*minhash_band_keys(self.signatures))
+        return self._lsh
+
+    def near_duplicates(self, text, threshold):
+        """
+        Find the indexed documents that are near-duplicates of a text.
+
+        Only documents sharing an LSH bucket with the text are compared,
+        so the cost depends on the number of candidates rather than on
+        the size of the index.
+
+        Args:
+            text (str): The text to check
+            threshold (float): Minimum estimated Jaccard similarity
+
+        Returns:
+            list: {'id', 'similarity'} dictionaries, most similar first
+        """
+        signature = minhash_signature(text)
+        keys, mask = minhash_band_keys(signature[None])
+        if not mask[0]:
+            return []
+        with self._lock:
+            candidates = self._lsh_index().candidates(keys[0])
+            scores = estimate_jaccard(signature, self.signatures[candidates])
+            ids = self.ids
+        matches = [(score, row) for row, score in zip(candidates, scores)
+                   if score >= threshold]
+        matches.sort(key=lambda match: (-match[0], match[1]))
+        return [{'id': ids[row], 'similarity': float(score)}
+                for score, row in matches]
+
+    def save(self, path):
+        """
+        Write the index to a single .npz file, replacing it atomically.
+
+        Args:
+            path (str): File to write
+        """
+        with self._lock:
+            self._flush()
+            counts = self.counts
+            meta = json.dumps({'terms': list(self.vocabulary),
+                               'ids': self.ids,
+                               'stop_words': STOP_WORDS,
+                               'minhash': MINHASH_LAYOUT}).encode('utf-8')
+            temporary = f"{path}.{os.getpid()}.tmp"
+            with open(temporary, 'wb') as f:
+                np.savez(f, data=counts.data, indices=counts.indices,
+                         indptr=counts.indptr, shape=np.array(counts.shape),
+                         document_frequency=self.document_frequency,
+                         signatures=self.signatures,
+                         meta=np.frombuffer(meta, dtype=np.uint8))
+            os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read an index written by save.
+
+        Args:
+            path (str): File to read
+
+        Returns:
+            CorpusIndex: The loaded index
+        """
+        index = cls()
+        with np.load(path, allow_pickle=False) as arrays:
+            meta = json.loads(arrays['meta'].tobytes().decode('utf-8'))
+            if meta.get('stop_words') != STOP_WORDS:
+                logger.warning(f"Corpus index at {path} was built with other "
+                               f"stop words; rebuild it for scores matching "
+                               f"the similarity task")
+            index.counts = csr_matrix(
+                (arrays['data'], arrays['indices'], arrays['indptr']),
+                shape=tuple(arrays['shape']))
+            index.document_frequency = arrays['document_frequency']
+            if meta.get('minhash') == MINHASH_LAYOUT:
+                index.signatures = arrays['signatures']
+            else:
+                logger.warning(f"Corpus index at {path} has no compatible "
+                               f"MinHash signatures; its documents are "
+                               f"skipped by near-duplicate checks")
+                index.signatures = np.full(
+                    (len(meta['ids']), MINHASH_PERMUTATIONS), MINHASH_EMPTY,
+                    dtype=np.uint32)
+        index.vocabulary = {term: i for i, term in enumerate(meta['terms'])}
+        index.ids = meta['ids']
+        index.id_rows = {doc_id: i for i, doc_id in enumerate(index.ids)}
+        return index
+
+
+_corpus_index = None
+# Path and modification time of the file the index was loaded from
+_corpus_index_version = None
+_corpus_index_lock = threading.Lock()
+
+
+def _index_mtime(path):
+    """Get the modification time and size of the saved index, or None."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _current_index():
+    """Return the index, reloading it if the saved file changed."""
+    global _corpus_index, _corpus_index_version
+    path = Config.CORPUS_INDEX_PATH
+    version = (path, _index_mtime(path))
+    if _corpus_index is None or version != _corpus_index_version:
+        if version[1] is None:
+            _corpus_index = CorpusIndex()
+        else:
+            logger.info(f"Loading corpus index from {path}")
+            _corpus_index = CorpusIndex.load(path)
+        _corpus_index_version = version
+    return _corpus_index
+
+
+def get_corpus_index():
+    """
+    Get the process-wide corpus index.
+
+    The index is loaded from Config.CORPUS_INDEX_PATH, and loaded again
+    when another worker has saved a newer version since.
+
+    Returns:
+        CorpusIndex: The index
+    """
+    with _corpus_index_lock:
+        return _current_index()
+
+
+def add_to_corpus_index(documents):
+    """
+    Add documents to the corpus index and save it.
+
+    Workers serialise adds on a lock file and reload the saved index
+    first, so concurrent adds from several workers are not lost. If the
+    add or the save fails, the index is reloaded from disk on next use,
+    so this worker does not keep documents the others never see.
+
+    Args:
+        documents (list): (id, text) pairs
+
+    Returns:
+        int: Number of indexed documents
+    """
+    global _corpus_index, _corpus_index_version
+    path = Config.CORPUS_INDEX_PATH
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with _corpus_index_lock, open(f"{path}.lock", 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        index = _current_index()
+        try:
+            index.add(documents)
+            index.save(path)
+        except Exception:
+            _corpus_index = _corpus_index_version = None
+            raise
+        _corpus_index_version = (path, _index_mtime(path))
+        return len(index)
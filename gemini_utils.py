@@ -1,6 +1,7 @@
 import logging
 import traceback
 from config import Config
+from cache import create_cache, hash_text
 import google.generativeai as genai
 import os
 
@@ -30,6 +31,36 @@ def initialize_gemini():
 # Initialize Gemini when module is loaded
 gemini_available = initialize_gemini()
 
+# Cache of Gemini responses keyed by model and prompt
+gemini_cache = create_cache('gemini',
+                            max_entries=Config.GEMINI_CACHE_MAX_ENTRIES,
+                            max_bytes=Config.GEMINI_CACHE_MAX_BYTES,
+                            ttl=Config.GEMINI_CACHE_TTL)
+
+
+def generate_content(prompt):
+    """
+    Generate a Gemini response for a prompt, reusing cached responses.
+
+    Only successful responses are cached; errors propagate to the caller.
+
+    Args:
+        prompt (str): The prompt to send
+
+    Returns:
+        str: Response text from Gemini
+    """
+    key = (Config.GEMINI_MODEL, hash_text(prompt))
+    cached = gemini_cache.get(key)
+    if cached is not None:
+        return cached
+
+    model = genai.GenerativeModel(Config.GEMINI_MODEL)
+    response = model.generate_content(prompt)
+    text = response.text
+    gemini_cache.set(key, text, size=len(text.encode('utf-8')))
+    return text
+
 
 def create_gemini_prompt(prompt_type, **kwargs):
     """
@@ -122,10 +153,7 @@ def ask_gemini(question):
             return "Sorry, Gemini API is not available. Please check your API key."
 
         prompt = create_gemini_prompt("general", question=question)
-        model = genai.GenerativeModel(Config.GEMINI_MODEL)
-        response = model.generate_content(prompt)
-
-        return response.text
+        return generate_content(prompt)
     except Exception as e:
         logger.error(
             f"Error asking Gemini: {str(e)}\n{traceback.format_exc()}")
@@ -147,10 +175,7 @@ def explain_code_with_gemini(code):
             return "Sorry, Gemini API is not available. Please check your API key."
 
         prompt = create_gemini_prompt("code_explanation", code=code)
-        model = genai.GenerativeModel(Config.GEMINI_MODEL)
-        response = model.generate_content(prompt)
-
-        return response.text
+        return generate_content(prompt)
     except Exception as e:
         logger.error(
             f"Error explaining code with Gemini: {str(e)}\n{traceback.format_exc()}"
@@ -184,10 +209,7 @@ def compare_libraries_with_gemini(code,
                                       target_library=target_library,
                                       include_performance=include_performance)
 
-        model = genai.GenerativeModel(Config.GEMINI_MODEL)
-        response = model.generate_content(prompt)
-
-        return response.text
+        return generate_content(prompt)
     except Exception as e:
         logger.error(
             f"Error comparing libraries with Gemini: {str(e)}\n{traceback.format_exc()}"
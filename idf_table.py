@@ -0,0 +1,189 @@
+import argparse
+import json
+import logging
+import os
+import re
+from collections import Counter
+
+import numpy as np
+
+from config import Config
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+IDF_FILE = 'idf.npy'
+VOCAB_FILE = 'vocab.json'
+
+# Words as the keyword extractor sees them: lowercase runs of letters
+_WORD = re.compile(r'[^\W\d_]+')
+
+
+def smooth_idf(document_frequency, documents):
+    """
+    Smoothed inverse document frequency, as scikit-learn computes it.
+
+    Args:
+        document_frequency: Number of documents containing the term
+            (a number or a NumPy array)
+        documents (int): Number of documents in the corpus
+
+    Returns:
+        The IDF value(s)
+    """
+    return np.log((1 + documents) / (1 + document_frequency)) + 1
+
+
+class IDFTable:
+    """
+    Background IDF values for a fixed vocabulary.
+
+    The values live in a memory-mapped float32 array, so every process
+    serving requests shares one copy through the page cache; the term to
+    row map is a plain dict. Terms outside the vocabulary get the IDF of a
+    term seen in no document.
+    """
+
+    def __init__(self, terms, values, documents):
+        """
+        Args:
+            terms (list): Vocabulary, in row order
+            values (numpy.ndarray): IDF per term
+            documents (int): Number of documents the table was built from
+        """
+        self.index = {term: i for i, term in enumerate(terms)}
+        self.values = values
+        self.documents = documents
+        self.default_idf = float(smooth_idf(0, documents))
+
+    @classmethod
+    def empty(cls):
+        """A table without documents, giving every term an IDF of 1."""
+        return cls([], np.zeros(0, dtype=np.float32), 0)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a table written by build_idf_table.
+
+        Args:
+            path (str): Directory holding the table
+
+        Returns:
+            IDFTable: The loaded table
+        """
+        with open(os.path.join(path, VOCAB_FILE), encoding='utf-8') as f:
+            vocab = json.load(f)
+        values = np.load(os.path.join(path, IDF_FILE), mmap_mode='r')
+        if len(values) != len(vocab['terms']):
+            raise ValueError(f"IDF table at {path} is inconsistent: "
+                             f"{len(values)} values for "
+                             f"{len(vocab['terms'])} terms")
+        return cls(vocab['terms'], values, vocab['documents'])
+
+    def __len__(self):
+        return len(self.index)
+
+    def idf(self, term):
+        """
+        Get the IDF of a term.
+
+        Args:
+            term (str): Lowercased term
+
+        Returns:
+            float: The term's IDF
+        """
+        i = self.index.get(term)
+        return self.default_idf if i is None else float(self.values[i])
+
+
+def build_idf_table(documents, path, min_df=2):
+    """
+    Count document frequencies over a corpus and write the IDF table.
+
+    Args:
+        documents (iterable): Documents, each an iterable of words
+        path (str): Directory to write the table to
+        min_df (int): Minimum document frequency for a term to be stored;
+            rarer terms fall back to the table's default IDF
+
+    Returns:
+        IDFTable: The table as written
+    """
+    document_frequency = Counter()
+    count = 0
+    for words in documents:
+        document_frequency.update({word.lower() for word in words
+                                   if word.isalpha()})
+        count += 1
+
+    terms = sorted(term for term, df in document_frequency.items()
+                   if df >= min_df)
+    frequencies = np.array([document_frequency[term] for term in terms],
+                           dtype=np.float64)
+    values = smooth_idf(frequencies, count).astype(np.float32)
+
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, IDF_FILE), values)
+    with open(os.path.join(path, VOCAB_FILE), 'w', encoding='utf-8') as f:
+        json.dump({'documents': count, 'terms': terms}, f)
+
+    logger.info(f"Wrote IDF table of {len(terms)} terms from {count} "
+                f"documents to {path}")
+    return IDFTable(terms, values, count)
+
+
+def iter_corpus_documents(names):
+    """
+    Yield the documents of NLTK corpora, one word list per file.
+
+    Args:
+        names (list): Corpus names in nltk.corpus (e.g. 'brown', 'reuters')
+
+    Yields:
+        list: Words of one document
+    """
+    import nltk.corpus
+    for name in names:
+        corpus = getattr(nltk.corpus, name)
+        for fileid in corpus.fileids():
+            yield corpus.words(fileid)
+
+
+def iter_file_documents(paths):
+    """
+    Yield the documents of plain text files, one word list per file.
+
+    Args:
+        paths (list): Text file paths
+
+    Yields:
+        list: Words of one document
+    """
+    for path in paths:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            yield _WORD.findall(f.read())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Build the background IDF table used for keywords')
+    parser.add_argument('--corpus', action='append', default=[],
+                        help='NLTK corpus to read (repeatable)')
+    parser.add_argument('--files', nargs='*', default=[],
+                        help='plain text files, one document each')
+    parser.add_argument('--output', default=Config.IDF_TABLE_PATH)
+    parser.add_argument('--min-df', type=int, default=2)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    corpora = args.corpus or ([] if args.files else ['brown'])
+
+    def documents():
+        yield from iter_corpus_documents(corpora)
+        yield from iter_file_documents(args.files)
+
+    table = build_idf_table(documents(), args.output, args.min_df)
+    print(f"{len(table)} terms from {table.documents} documents, "
+          f"default IDF {table.default_idf:.3f}")
@@ -0,0 +1,119 @@
+import argparse
+import json
+import os
+
+# Fields of /proc/<pid>/smaps_rollup reported per process (values in kB)
+SMAPS_FIELDS = ('Rss', 'Pss', 'Shared_Clean', 'Shared_Dirty',
+                'Private_Clean', 'Private_Dirty', 'Swap')
+
+
+def read_smaps_rollup(pid):
+    """
+    Read the memory totals of a process from /proc/<pid>/smaps_rollup.
+
+    Args:
+        pid (int): Process id
+
+    Returns:
+        dict: Memory totals in kB keyed by field name
+    """
+    totals = dict.fromkeys(SMAPS_FIELDS, 0)
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            field = parts[0].rstrip(':')
+            if field in totals:
+                totals[field] = int(parts[1])
+    return totals
+
+
+def child_pids(pid):
+    """
+    Get the ids of the direct children of a process.
+
+    Args:
+        pid (int): Parent process id
+
+    Returns:
+        list: Child process ids
+    """
+    children = []
+    for task in os.listdir(f"/proc/{pid}/task"):
+        try:
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                children.extend(int(child) for child in f.read().split())
+        except FileNotFoundError:
+            continue
+    return sorted(children)
+
+
+def memory_report(master_pid):
+    """
+    Report shared and private RSS for a gunicorn master and its workers.
+
+    Shared memory is what workers still share with the master (and each
+    other) copy-on-write; private memory is what each worker has copied or
+    allocated on its own.
+
+    Args:
+        master_pid (int): Process id of the gunicorn master
+
+    Returns:
+        dict: Per-process memory in MB and the worker totals
+    """
+    def to_mb(totals):
+        shared = totals['Shared_Clean'] + totals['Shared_Dirty']
+        private = totals['Private_Clean'] + totals['Private_Dirty']
+        return {
+            'rss_mb': totals['Rss'] / 1024,
+            'pss_mb': totals['Pss'] / 1024,
+            'shared_mb': shared / 1024,
+            'private_mb': private / 1024,
+            'swap_mb': totals['Swap'] / 1024
+        }
+
+    workers = {pid: to_mb(read_smaps_rollup(pid))
+               for pid in child_pids(master_pid)}
+    return {
+        'master': {master_pid: to_mb(read_smaps_rollup(master_pid))},
+        'workers': workers,
+        'worker_totals': {
+            'count': len(workers),
+            'rss_mb': sum(w['rss_mb'] for w in workers.values()),
+            'pss_mb': sum(w['pss_mb'] for w in workers.values()),
+            'private_mb': sum(w['private_mb'] for w in workers.values())
+        }
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Report shared vs private RSS of gunicorn workers')
+    parser.add_argument('pid', nargs='?', type=int,
+                        help='gunicorn master pid')
+    parser.add_argument('--pidfile', help='read the master pid from a file')
+    parser.add_argument('--json', action='store_true',
+                        help='print the report as JSON')
+    args = parser.parse_args()
+
+    if args.pid is None and not args.pidfile:
+        parser.error('a master pid or --pidfile is required')
+    if args.pid is None:
+        with open(args.pidfile) as pid_file:
+            args.pid = int(pid_file.read().strip())
+
+    report = memory_report(args.pid)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{'role':8} {'pid':>8} {'rss':>10} {'pss':>10} "
+              f"{'shared':>10} {'private':>10}")
+        for role in ('master', 'workers'):
+            for pid, mem in report[role].items():
+                print(f"{role[:6]:8} {pid:>8} {mem['rss_mb']:>8.1f}MB "
+                      f"{mem['pss_mb']:>8.1f}MB {mem['shared_mb']:>8.1f}MB "
+                      f"{mem['private_mb']:>8.1f}MB")
+        totals = report['worker_totals']
+        print(f"{totals['count']} workers: {totals['rss_mb']:.1f}MB RSS, "
+              f"{totals['pss_mb']:.1f}MB PSS, "
+              f"{totals['private_mb']:.1f}MB private")
@@ -1,16 +1,36 @@
 import nltk
-nltk.download('maxent_ne_chunker_tab')
-nltk.download('averaged_perceptron_tagger_eng')
 import spacy
+from spacy.pipeline import Sentencizer
+from spacy.tokens import Doc
+import heapq
 import logging
+import os
+import re
 import string
+import threading
+import time
+import zlib
 import numpy as np
 from collections import Counter
+from operator import itemgetter
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property
+from types import MappingProxyType
+from config import Config
+from cache import LRUCache, hash_text
+from idf_table import IDFTable
+from nltk_setup import (
+    configure_nltk_data_path,
+    record_boot_time,
+    get_boot_report
+)
 
 # Set up logging
 logger = logging.getLogger(__name__)
 from nltk.tokenize import word_tokenize as nltk_word_tokenize
 from nltk.tokenize import sent_tokenize as nltk_sent_tokenize
+from nltk.tokenize.punkt import PunktTokenizer
 
 
 # Custom tokenize functions to handle punkt_tab errors
@@ -67,51 +87,522 @@ def sent_tokenize(text):
 
 from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
-from nltk.tag import pos_tag
-from nltk.chunk import ne_chunk
+from nltk.tag import PerceptronTagger
+from nltk.chunk import ne_chunker
 from nltk.sentiment.vader import SentimentIntensityAnalyzer
-from langdetect import detect, detect_langs, DetectorFactory
-from sklearn.feature_extraction.text import TfidfVectorizer
+from langdetect import DetectorFactory
+from langdetect.detector_factory import PROFILES_DIRECTORY as LANGDETECT_PROFILES
+from sklearn.feature_extraction.text import (
+    HashingVectorizer, TfidfTransformer, TfidfVectorizer
+)
 from sklearn.metrics.pairwise import cosine_similarity
+from scipy.sparse import csr_matrix, diags
 
 # Ensure deterministic language detection
 DetectorFactory.seed = 0
 
-# Download necessary NLTK resources with better error handling
-required_resources = [
-    'punkt', 'stopwords', 'wordnet', 'averaged_perceptron_tagger',
-    'maxent_ne_chunker', 'words', 'vader_lexicon', 'omw-1.4'
-]
+# Look for NLTK data in the offline bundle first; nothing is downloaded here
+configure_nltk_data_path()
 
-for resource in required_resources:
-    try:
-        nltk.download(resource, quiet=True)
-    except Exception as e:
-        logger.error(f"Error downloading NLTK resource '{resource}': {str(e)}")
-        logger.info(
-            f"Attempting to download '{resource}' with verbose output...")
-        try:
-            nltk.download(resource, quiet=False)
-        except Exception as e:
-            logger.error(
-                f"Failed to download '{resource}' after retry: {str(e)}")
+# The spaCy model is loaded on first use (or by warm_up), not at import
+_spacy_lock = threading.Lock()
+_nlp_en = None
+_spacy_fingerprint = None
 
-# Load spaCy models
-try:
-    nlp_en = spacy.load('en_core_web_sm')
-except OSError:
+
+def _load_spacy_model():
+    """Load the configured spaCy model from disk, or a blank pipeline."""
+    start = time.perf_counter()
     try:
-        import subprocess
-        logger.info("Downloading spaCy model 'en_core_web_sm'...")
-        subprocess.run(["python", "-m", "spacy", "download", "en_core_web_sm"],
-                       check=True,
-                       capture_output=True)
-        nlp_en = spacy.load('en_core_web_sm')
-    except Exception as e:
-        logger.error(f"Error loading spaCy model: {str(e)}")
+        nlp = spacy.load(Config.SPACY_MODEL)
+        status = 'loaded'
+    except OSError as e:
+        logger.error(f"Error loading spaCy model '{Config.SPACY_MODEL}': "
+                     f"{str(e)}")
         # Fallback to basic spaCy model
-        nlp_en = spacy.blank('en')
+        nlp = spacy.blank('en')
+        status = 'fallback'
         logger.warning("Using blank spaCy model as fallback")
+    record_boot_time(Config.SPACY_MODEL, 'spacy', status,
+                     time.perf_counter() - start, str(nlp.path or ''))
+    return nlp
+
+
+def get_spacy_model():
+    """
+    Get the shared spaCy pipeline, loading it on first use.
+
+    Returns:
+        spacy.Language: The loaded pipeline
+    """
+    global _nlp_en, _spacy_fingerprint
+    if _nlp_en is None:
+        with _spacy_lock:
+            if _nlp_en is None:
+                nlp = _load_spacy_model()
+                _spacy_fingerprint = _spacy_pipeline_fingerprint(nlp)
+                _nlp_en = nlp
+    return _nlp_en
+
+
+# Process-wide NLTK resources. Each is loaded once on first use (or by
+# warm_up) and shared read-only by all requests and threads.
+_resources = {}
+_resources_lock = threading.Lock()
+
+
+def _get_resource(name, loader):
+    """Return a shared resource, loading it once under a lock."""
+    resource = _resources.get(name)
+    if resource is None:
+        with _resources_lock:
+            resource = _resources.get(name)
+            if resource is None:
+                resource = loader()
+                _resources[name] = resource
+    return resource
+
+
+def _load_sentiment_analyzer():
+    """Load VADER with its lexicon frozen against modification."""
+    analyzer = SentimentIntensityAnalyzer()
+    analyzer.lexicon = MappingProxyType(analyzer.lexicon)
+    return analyzer
+
+
+def get_stopwords():
+    """Get the English stopword list as a frozenset."""
+    return _get_resource('stopwords',
+                         lambda: frozenset(stopwords.words('english')))
+
+
+def get_lemmatizer():
+    """Get the shared WordNet lemmatizer."""
+    return _get_resource('lemmatizer', WordNetLemmatizer)
+
+
+def get_sentiment_analyzer():
+    """Get the shared VADER sentiment analyzer."""
+    return _get_resource('sentiment_analyzer', _load_sentiment_analyzer)
+
+
+def get_pos_tagger():
+    """Get the shared averaged perceptron POS tagger."""
+    return _get_resource('pos_tagger', PerceptronTagger)
+
+
+def get_ne_chunker():
+    """Get the shared maxent named entity chunker."""
+    return _get_resource('ne_chunker', ne_chunker)
+
+
+def get_sentence_tokenizer():
+    """Get the shared punkt sentence tokenizer."""
+    return _get_resource('sentence_tokenizer', PunktTokenizer)
+
+
+def _load_idf_table():
+    """Load the background IDF table, or an empty one if none was built."""
+    path = Config.IDF_TABLE_PATH
+    if not os.path.isdir(path):
+        logger.warning(
+            f"No IDF table at {path}; keywords are ranked by frequency. "
+            f"Build one with 'python idf_table.py --output {path}'.")
+        return IDFTable.empty()
+    return IDFTable.load(path)
+
+
+def get_idf_table():
+    """Get the shared background IDF table used for keyword extraction."""
+    return _get_resource('idf_table', _load_idf_table)
+
+
+def _timed_load(name, loader):
+    """Run a resource loader and record how long it took."""
+    start = time.perf_counter()
+    try:
+        loader()
+        status = 'loaded'
+    except LookupError as e:
+        logger.error(f"Error loading {name}: {str(e)}")
+        status = 'missing'
+    record_boot_time(f"{name} (load)", 'nltk', status,
+                     time.perf_counter() - start)
+
+
+def warm_up():
+    """
+    Load models and corpora now instead of on the first request.
+
+    Returns:
+        dict: Boot time per resource
+    """
+    get_spacy_model()
+    _timed_load('stopwords', get_stopwords)
+    _timed_load('wordnet', lambda: get_lemmatizer().lemmatize('warming'))
+    _timed_load('vader_lexicon', get_sentiment_analyzer)
+    _timed_load('averaged_perceptron_tagger_eng', get_pos_tagger)
+    _timed_load('maxent_ne_chunker_tab', get_ne_chunker)
+    _timed_load('idf_table', get_idf_table)
+    _timed_load('langdetect_profiles', get_language_detector_factory)
+    return get_boot_report()
+
+
+# Parsed Docs are cached by content so that running several tasks on the same
+# text only runs the spaCy pipeline once. Cached Docs are shared between
+# requests and must be treated as read-only.
+doc_cache = LRUCache(max_entries=Config.DOC_CACHE_MAX_ENTRIES,
+                     max_bytes=Config.DOC_CACHE_MAX_BYTES)
+
+# Rough per-token footprint of a Doc (TokenC struct plus bookkeeping)
+DOC_BYTES_PER_TOKEN = 128
+
+
+def _spacy_pipeline_fingerprint(nlp):
+    """Identify a spaCy pipeline by model name, version and components."""
+    meta = nlp.meta
+    return (f"{meta.get('lang')}_{meta.get('name')}-{meta.get('version')}:"
+            f"{','.join(nlp.pipe_names)}")
+
+
+def _estimate_doc_size(doc):
+    """Estimate the memory held by a parsed Doc in bytes."""
+    return (len(doc.text.encode('utf-8')) + len(doc) * DOC_BYTES_PER_TOKEN +
+            doc.tensor.nbytes)
+
+
+# spaCy components each task needs. Tokenization takes its sentence
+# boundaries from the rule-based sentencizer and stopword removal only reads
+# lexical attributes, so both run the tokenizer alone.
+SPACY_TASK_COMPONENTS = {
+    'tokenization': (),
+    'stopword_removal': (),
+    'lemmatization': ('tagger', 'attribute_ruler', 'lemmatizer'),
+    'pos_tagging': ('tagger', 'attribute_ruler'),
+    'ner': ('ner',),
+    'keyword_extraction': ()
+}
+
+_sentencizer = Sentencizer()
+
+
+def _resolve_spacy_components(nlp, components):
+    """
+    Expand the requested components to the set that has to run.
+
+    Components the pipeline does not have are ignored, and the shared
+    tok2vec is added when a requested component listens to it.
+
+    Args:
+        nlp (spacy.Language): The pipeline
+        components (iterable): Component names, or None for all of them
+
+    Returns:
+        frozenset: Names of the components to run
+    """
+    if components is None:
+        return frozenset(nlp.pipe_names)
+    needed = set(components) & set(nlp.pipe_names)
+    if 'tok2vec' in nlp.pipe_names:
+        listeners = nlp.get_pipe('tok2vec').listening_components
+        if needed & set(listeners):
+            needed.add('tok2vec')
+    return frozenset(needed)
+
+
+# Boundaries long texts are split at, in order of preference: paragraph
+# breaks, sentence ends, then any whitespace
+_CHUNK_BOUNDARIES = (
+    re.compile(r'\n[ \t]*\n\s*'),
+    re.compile(r'[.!?]["\')\]]*\s+'),
+    re.compile(r'\s+')
+)
+
+
+def _iter_text_chunks(text, max_chars):
+    """
+    Yield consecutive chunks of text of at most max_chars characters.
+
+    Each chunk ends after the last paragraph break in its second half, or
+    failing that the last sentence end or whitespace, so that the chunks
+    joined together give back the original text.
+
+    Args:
+        text (str): The text to split
+        max_chars (int): Maximum chunk length
+
+    Yields:
+        str: Text chunks
+    """
+    start = 0
+    while len(text) - start > max_chars:
+        window_end = start + max_chars
+        cut = None
+        for boundary in _CHUNK_BOUNDARIES:
+            for match in boundary.finditer(text, start + max_chars // 2,
+                                           window_end):
+                cut = match.end()
+            if cut is not None:
+                break
+        if cut is None:
+            cut = window_end
+        yield text[start:cut]
+        start = cut
+    yield text[start:]
+
+
+def _split_for_spacy(text, max_chars):
+    """
+    Split text into consecutive chunks of at most max_chars characters.
+
+    Args:
+        text (str): The text to split
+        max_chars (int): Maximum chunk length
+
+    Returns:
+        list: Text chunks (see _iter_text_chunks)
+    """
+    return list(_iter_text_chunks(text, max_chars))
+
+
+def _parse_spacy_chunked(nlp, text, components):
+    """
+    Parse a long text in chunks and merge them into one Doc.
+
+    Chunks are parsed in parallel when the text is long enough and
+    SPACY_N_PROCESS allows it. Doc.from_docs shifts token, sentence and
+    entity offsets so they refer to the original text.
+    """
+    chunks = _split_for_spacy(text, Config.SPACY_CHUNK_CHARS)
+    n_process = 1
+    if len(text) >= Config.SPACY_PARALLEL_MIN_CHARS:
+        n_process = max(1, min(Config.SPACY_N_PROCESS, len(chunks)))
+
+    if n_process == 1 and not components:
+        docs = [nlp.make_doc(chunk) for chunk in chunks]
+    else:
+        docs = list(nlp.pipe(chunks, batch_size=1, n_process=n_process,
+                             disable=[name for name in nlp.pipe_names
+                                      if name not in components]))
+    # Chunks already carry their separating whitespace
+    return Doc.from_docs(docs, ensure_whitespace=False)
+
+
+def _parse_spacy(nlp, text, components):
+    """Run only the given pipeline components over text."""
+    if len(text) > Config.SPACY_CHUNK_CHARS:
+        return _parse_spacy_chunked(nlp, text, components)
+    if not components:
+        return nlp.make_doc(text)
+    # Disabling per call leaves the shared pipeline untouched, which
+    # select_pipes would not under a threaded server
+    return nlp(text, disable=[name for name in nlp.pipe_names
+                              if name not in components])
+
+
+def _doc_sentences(doc):
+    """
+    Get sentence texts, using sentencizer boundaries if none are set.
+
+    Docs may be shared through doc_cache, so predicted boundaries are used
+    to slice the Doc rather than written into it.
+    """
+    if doc.has_annotation('SENT_START'):
+        return [sent.text for sent in doc.sents]
+    starts = [i for i, start in enumerate(_sentencizer.predict([doc])[0])
+              if start]
+    return [doc[start:end].text
+            for start, end in zip(starts, starts[1:] + [len(doc)])]
+
+
+def get_spacy_doc(text, components=None):
+    """
+    Parse text with spaCy, reusing a cached Doc for previously seen text.
+
+    A cached Doc satisfies any request whose components it already ran.
+    Otherwise the text is parsed again with the union of the cached and
+    requested components, so the cached Doc only ever gets fuller.
+
+    Args:
+        text (str): The text to parse
+        components (iterable, optional): Pipeline components the caller
+            needs (see SPACY_TASK_COMPONENTS); defaults to all of them
+
+    Returns:
+        spacy.tokens.Doc: The parsed document (read-only)
+    """
+    nlp = get_spacy_model()
+    needed = _resolve_spacy_components(nlp, components)
+    key = (hash_text(text), _spacy_fingerprint)
+    entry = doc_cache.get(key, validate=lambda cached: needed <= cached[1])
+    if entry is None:
+        previous = doc_cache.peek(key)
+        if previous is not None:
+            needed |= previous[1]
+        doc = _parse_spacy(nlp, text, needed)
+        entry = (doc, needed)
+        doc_cache.set(key, entry, size=_estimate_doc_size(doc))
+    return entry[0]
+
+
+def evict_spacy_doc(text):
+    """Drop the cached Doc of a text, so the next get_spacy_doc parses it."""
+    doc_cache.pop((hash_text(text), _spacy_fingerprint))
+
+
+def spacy_components_for(tasks):
+    """Get the union of the spaCy components needed by several tasks."""
+    components = set()
+    for task in tasks:
+        components.update(SPACY_TASK_COMPONENTS.get(task, ()))
+    return components
+
+
+# Result builders shared by the single-task functions and perform_analysis.
+# They take already computed intermediates (tokens, tags, Docs) so that one
+# tokenization/tagging pass can feed several tasks.
+def _tokenization_result(words, sentences):
+    """Build the tokenization result from words and sentences."""
+    return {
+        'words': words,
+        'sentences': sentences,
+        'word_count': len(words),
+        'sentence_count': len(sentences)
+    }
+
+
+def _nltk_stopword_result(words, stop_words):
+    """Build the stopword removal result from lowercased NLTK tokens."""
+    filtered_words = [
+        word for word in words
+        if word not in stop_words and word not in string.punctuation
+    ]
+    removed_words = [
+        word for word in words
+        if word in stop_words or word in string.punctuation
+    ]
+    return {
+        'original_words': words,
+        'filtered_words': filtered_words,
+        'removed_words': removed_words,
+        'original_count': len(words),
+        'filtered_count': len(filtered_words)
+    }
+
+
+def _spacy_stopword_result(doc):
+    """Build the stopword removal result from a spaCy Doc."""
+    filtered_words = [
+        token.text for token in doc if not token.is_stop and not token.is_punct
+    ]
+    all_words = [token.text for token in doc]
+    removed_words = [
+        token.text for token in doc if token.is_stop or token.is_punct
+    ]
+    return {
+        'original_words': all_words,
+        'filtered_words': filtered_words,
+        'removed_words': removed_words,
+        'original_count': len(all_words),
+        'filtered_count': len(filtered_words)
+    }
+
+
+def _lemmatization_result(words, lemmatized_words):
+    """Build the lemmatization result from words and their lemmas."""
+    # Create a dict showing original and lemmatized forms
+    lemma_dict = {}
+    for word, lemma in zip(words, lemmatized_words):
+        if word != lemma:
+            lemma_dict[word] = lemma
+
+    return {
+        'original_words': words,
+        'lemmatized_words': lemmatized_words,
+        'lemma_dict': lemma_dict
+    }
+
+
+def _pos_result(pos_tags):
+    """Build the POS tagging result from (word, tag) pairs."""
+    # Group by POS tag
+    pos_groups = {}
+    for word, tag in pos_tags:
+        if tag not in pos_groups:
+            pos_groups[tag] = []
+        pos_groups[tag].append(word)
+
+    return {'pos_tags': pos_tags, 'pos_groups': pos_groups}
+
+
+def _tree_entities(named_entities):
+    """Extract named entities from an NLTK ne_chunk tree."""
+    # Extract named entities in a more usable format
+    entities = []
+    for chunk in named_entities:
+        if hasattr(chunk, 'label'):
+            entity_type = chunk.label()
+            entity_text = ' '.join([c[0] for c in chunk])
+            entities.append({'text': entity_text, 'type': entity_type})
+    return entities
+
+
+def _nltk_entities(pos_tags):
+    """Chunk NLTK POS tags into a list of named entities."""
+    return _tree_entities(get_ne_chunker().parse(pos_tags))
+
+
+def _spacy_entities(doc):
+    """Extract named entities from a spaCy Doc."""
+    return [{'text': ent.text, 'type': ent.label_} for ent in doc.ents]
+
+
+def _ner_result(entities):
+    """Build the NER result from a list of entities."""
+    # Group by entity type
+    entity_groups = {}
+    for entity in entities:
+        if entity['type'] not in entity_groups:
+            entity_groups[entity['type']] = []
+        entity_groups[entity['type']].append(entity['text'])
+
+    return {'entities': entities, 'entity_groups': entity_groups}
+
+
+def _sentiment_label(compound):
+    """Map a VADER compound score to a sentiment label."""
+    if compound >= 0.05:
+        return 'Positive'
+    elif compound <= -0.05:
+        return 'Negative'
+    return 'Neutral'
+
+
+def _sentiment_result(scores, text=None):
+    """
+    Build the sentiment result and chart data from VADER scores.
+
+    The analysed text is echoed back under 'text' unless text is None.
+    """
+    # Prepare visualization data
+    visual_data = [{
+        'name': 'Positive',
+        'value': scores['pos']
+    }, {
+        'name': 'Neutral',
+        'value': scores['neu']
+    }, {
+        'name': 'Negative',
+        'value': scores['neg']
+    }]
+
+    result = {
+        'sentiment': _sentiment_label(scores['compound']),
+        'scores': scores
+    }
+    if text is not None:
+        result['text'] = text
+    return result, visual_data
 
 
 # Task 1: Tokenization
@@ -128,24 +619,12 @@ def perform_tokenization(text, library='nltk'):
     """
     try:
         if library == 'nltk':
-            words = word_tokenize(text)
-            sentences = sent_tokenize(text)
-            return {
-                'words': words,
-                'sentences': sentences,
-                'word_count': len(words),
-                'sentence_count': len(sentences)
-            }
+            return _tokenization_result(word_tokenize(text),
+                                        sent_tokenize(text))
         elif library == 'spacy':
-            doc = nlp_en(text)
-            words = [token.text for token in doc]
-            sentences = [sent.text for sent in doc.sents]
-            return {
-                'words': words,
-                'sentences': sentences,
-                'word_count': len(words),
-                'sentence_count': len(sentences)
-            }
+            doc = get_spacy_doc(text, SPACY_TASK_COMPONENTS['tokenization'])
+            return _tokenization_result([token.text for token in doc],
+                                        _doc_sentences(doc))
         else:
             raise ValueError(f"Unsupported library: {library}")
     except Exception as e:
@@ -153,6 +632,105 @@ def perform_tokenization(text, library='nltk'):
         raise
 
 
+# Sentence-ending punctuation, used to split sentences without punkt
+_SENTENCE_END = re.compile(r'[.!?]+')
+
+
+def _sentence_spans(text):
+    """Get the (start, end) offsets of the sentences in text."""
+    try:
+        return list(get_sentence_tokenizer().span_tokenize(text))
+    except LookupError:
+        spans = []
+        start = 0
+        for match in _SENTENCE_END.finditer(text):
+            spans.append((start, match.end()))
+            start = match.end()
+        if text[start:].strip():
+            spans.append((start, len(text)))
+        return spans
+
+
+def iter_sentences(chunks, max_sentence_chars=None):
+    """
+    Segment a stream of text chunks into sentences.
+
+    Only the text after the last complete sentence is buffered, and the last
+    sentence of the buffer is held back until more text arrives since a
+    chunk may end in the middle of it. Runs of text without any boundary are
+    cut at whitespace once they reach max_sentence_chars.
+
+    Args:
+        chunks (iterable): Text chunks in document order
+        max_sentence_chars (int, optional): Longest sentence to buffer
+
+    Yields:
+        str: Sentences, stripped of surrounding whitespace
+    """
+    max_sentence_chars = max_sentence_chars or Config.STREAM_MAX_SENTENCE_CHARS
+    buffer = ''
+    for chunk in chunks:
+        buffer += chunk
+        spans = _sentence_spans(buffer)
+        if len(spans) > 1:
+            for start, end in spans[:-1]:
+                sentence = buffer[start:end].strip()
+                if sentence:
+                    yield sentence
+            buffer = buffer[spans[-1][0]:]
+
+        while len(buffer) > max_sentence_chars:
+            cut = buffer.rfind(' ', 0, max_sentence_chars)
+            if cut <= 0:
+                cut = max_sentence_chars
+            sentence = buffer[:cut].strip()
+            if sentence:
+                yield sentence
+            buffer = buffer[cut:]
+
+    for start, end in _sentence_spans(buffer):
+        sentence = buffer[start:end].strip()
+        if sentence:
+            yield sentence
+
+
+def stream_tokenization(chunks, library='nltk', batch_size=None):
+    """
+    Tokenize a stream of text sentence by sentence.
+
+    Memory use is bounded by one batch of sentences rather than the whole
+    document.
+
+    Args:
+        chunks (iterable): Text chunks in document order
+        library (str): The library to use ('nltk' or 'spacy')
+        batch_size (int, optional): Number of sentences per yielded batch
+
+    Yields:
+        list: Up to batch_size {'sentence': str, 'tokens': list} dicts
+    """
+    batch_size = batch_size or Config.STREAM_BATCH_SENTENCES
+    if library == 'nltk':
+        def tokenize(sentences):
+            return [word_tokenize(sentence) for sentence in sentences]
+    elif library == 'spacy':
+        tokenizer = get_spacy_model().tokenizer
+
+        def tokenize(sentences):
+            return [[token.text for token in doc]
+                    for doc in tokenizer.pipe(sentences)]
+    else:
+        raise ValueError(f"Unsupported library: {library}")
+
+    sentences = iter_sentences(chunks)
+    while True:
+        batch = list(islice(sentences, batch_size))
+        if not batch:
+            break
+        yield [{'sentence': sentence, 'tokens': tokens}
+               for sentence, tokens in zip(batch, tokenize(batch))]
+
+
 # Task 2: Stopword Removal
 def perform_stopword_removal(text, library='nltk'):
     """
@@ -167,40 +745,11 @@ def perform_stopword_removal(text, library='nltk'):
     """
     try:
         if library == 'nltk':
-            stop_words = set(stopwords.words('english'))
-            words = word_tokenize(text.lower())
-            filtered_words = [
-                word for word in words if word.lower() not in stop_words
-                and word not in string.punctuation
-            ]
-            removed_words = [
-                word for word in words
-                if word.lower() in stop_words or word in string.punctuation
-            ]
-            return {
-                'original_words': words,
-                'filtered_words': filtered_words,
-                'removed_words': removed_words,
-                'original_count': len(words),
-                'filtered_count': len(filtered_words)
-            }
+            return _nltk_stopword_result(word_tokenize(text.lower()),
+                                         get_stopwords())
         elif library == 'spacy':
-            doc = nlp_en(text)
-            filtered_words = [
-                token.text for token in doc
-                if not token.is_stop and not token.is_punct
-            ]
-            all_words = [token.text for token in doc]
-            removed_words = [
-                token.text for token in doc if token.is_stop or token.is_punct
-            ]
-            return {
-                'original_words': all_words,
-                'filtered_words': filtered_words,
-                'removed_words': removed_words,
-                'original_count': len(all_words),
-                'filtered_count': len(filtered_words)
-            }
+            return _spacy_stopword_result(get_spacy_doc(
+                text, SPACY_TASK_COMPONENTS['stopword_removal']))
         else:
             raise ValueError(f"Unsupported library: {library}")
     except Exception as e:
@@ -222,37 +771,14 @@ def perform_lemmatization(text, library='nltk'):
     """
     try:
         if library == 'nltk':
-            lemmatizer = WordNetLemmatizer()
+            lemmatizer = get_lemmatizer()
             words = word_tokenize(text)
-            lemmatized_words = [lemmatizer.lemmatize(word) for word in words]
-
-            # Create a dict showing original and lemmatized forms
-            lemma_dict = {}
-            for i, word in enumerate(words):
-                if word != lemmatized_words[i]:
-                    lemma_dict[word] = lemmatized_words[i]
-
-            return {
-                'original_words': words,
-                'lemmatized_words': lemmatized_words,
-                'lemma_dict': lemma_dict
-            }
+            return _lemmatization_result(
+                words, [lemmatizer.lemmatize(word) for word in words])
         elif library == 'spacy':
-            doc = nlp_en(text)
-            words = [token.text for token in doc]
-            lemmatized_words = [token.lemma_ for token in doc]
-
-            # Create a dict showing original and lemmatized forms
-            lemma_dict = {}
-            for i, token in enumerate(doc):
-                if token.text != token.lemma_:
-                    lemma_dict[token.text] = token.lemma_
-
-            return {
-                'original_words': words,
-                'lemmatized_words': lemmatized_words,
-                'lemma_dict': lemma_dict
-            }
+            doc = get_spacy_doc(text, SPACY_TASK_COMPONENTS['lemmatization'])
+            return _lemmatization_result([token.text for token in doc],
+                                         [token.lemma_ for token in doc])
         else:
             raise ValueError(f"Unsupported library: {library}")
     except Exception as e:
@@ -274,29 +800,10 @@ def perform_pos_tagging(text, library='nltk'):
     """
     try:
         if library == 'nltk':
-            words = word_tokenize(text)
-            pos_tags = pos_tag(words)
-
-            # Group by POS tag
-            pos_groups = {}
-            for word, tag in pos_tags:
-                if tag not in pos_groups:
-                    pos_groups[tag] = []
-                pos_groups[tag].append(word)
-
-            return {'pos_tags': pos_tags, 'pos_groups': pos_groups}
+            return _pos_result(get_pos_tagger().tag(word_tokenize(text)))
         elif library == 'spacy':
-            doc = nlp_en(text)
-            pos_tags = [(token.text, token.pos_) for token in doc]
-
-            # Group by POS tag
-            pos_groups = {}
-            for token in doc:
-                if token.pos_ not in pos_groups:
-                    pos_groups[token.pos_] = []
-                pos_groups[token.pos_].append(token.text)
-
-            return {'pos_tags': pos_tags, 'pos_groups': pos_groups}
+            doc = get_spacy_doc(text, SPACY_TASK_COMPONENTS['pos_tagging'])
+            return _pos_result([(token.text, token.pos_) for token in doc])
         else:
             raise ValueError(f"Unsupported library: {library}")
     except Exception as e:
@@ -318,42 +825,11 @@ def perform_ner(text, library='nltk'):
     """
     try:
         if library == 'nltk':
-            words = word_tokenize(text)
-            pos_tags = pos_tag(words)
-            named_entities = ne_chunk(pos_tags)
-
-            # Extract named entities in a more usable format
-            entities = []
-
-            for chunk in named_entities:
-                if hasattr(chunk, 'label'):
-                    entity_type = chunk.label()
-                    entity_text = ' '.join([c[0] for c in chunk])
-                    entities.append({'text': entity_text, 'type': entity_type})
-
-            # Group by entity type
-            entity_groups = {}
-            for entity in entities:
-                if entity['type'] not in entity_groups:
-                    entity_groups[entity['type']] = []
-                entity_groups[entity['type']].append(entity['text'])
-
-            return {'entities': entities, 'entity_groups': entity_groups}
+            pos_tags = get_pos_tagger().tag(word_tokenize(text))
+            return _ner_result(_nltk_entities(pos_tags))
         elif library == 'spacy':
-            doc = nlp_en(text)
-            entities = [{
-                'text': ent.text,
-                'type': ent.label_
-            } for ent in doc.ents]
-
-            # Group by entity type
-            entity_groups = {}
-            for entity in entities:
-                if entity['type'] not in entity_groups:
-                    entity_groups[entity['type']] = []
-                entity_groups[entity['type']].append(entity['text'])
-
-            return {'entities': entities, 'entity_groups': entity_groups}
+            doc = get_spacy_doc(text, SPACY_TASK_COMPONENTS['ner'])
+            return _ner_result(_spacy_entities(doc))
         else:
             raise ValueError(f"Unsupported library: {library}")
     except Exception as e:
@@ -361,14 +837,359 @@ def perform_ner(text, library='nltk'):
         raise
 
 
+# Sentiment engines selectable with the 'engine' option
+SENTIMENT_ENGINES = ('vader', 'vectorized')
+
+
+class VectorizedSentimentAnalyzer:
+    """
+    NumPy implementation of VADER's polarity_scores for batches of texts.
+
+    Tokens of all texts in a batch are mapped to rows of a vocabulary index
+    built once from the VADER lexicon and rule word lists. Lexicon valence,
+    capitalisation, booster, negation, "least" and "but" rules are then
+    applied with array operations over every token of the batch at once,
+    and scores are summed per text with np.bincount. The rare tokens where
+    an idiom or a multi-word booster may apply are handed to the stock
+    analyzer's own rule, so scores match stock VADER, including its quirk
+    of taking a repeated word's context from its first occurrence.
+    """
+
+    # Texts scored per array pass, bounding the size of the token arrays
+    CHUNK_SIZE = 10000
+
+    def __init__(self, analyzer):
+        """
+        Args:
+            analyzer (SentimentIntensityAnalyzer): Stock analyzer whose
+                lexicon and constants are used
+        """
+        self.analyzer = analyzer
+        constants = analyzer.constants
+        self.constants = constants
+        self.punctuation_chars = frozenset(string.punctuation)
+        self.punc_list = constants.PUNC_LIST
+
+        idiom_words = set()
+        for phrase in list(constants.SPECIAL_CASE_IDIOMS) + [
+                key for key in constants.BOOSTER_DICT if ' ' in key]:
+            idiom_words.update(phrase.split())
+
+        lexicon = analyzer.lexicon
+        words = (set(lexicon) | set(constants.BOOSTER_DICT) |
+                 set(constants.NEGATE) | idiom_words |
+                 {'least', 'at', 'very', 'but', 'kind', 'of'})
+        self.vocab = {word: index for index, word in enumerate(sorted(words))}
+        # The last row stands for words outside the vocabulary
+        size = len(self.vocab) + 1
+
+        self.valence = np.zeros(size)
+        self.in_lexicon = np.zeros(size, dtype=bool)
+        self.booster = np.zeros(size)
+        self.is_booster = np.zeros(size, dtype=bool)
+        self.negation = np.zeros(size, dtype=bool)
+        self.idiom_word = np.zeros(size, dtype=bool)
+        for word, index in self.vocab.items():
+            if word in lexicon:
+                self.valence[index] = lexicon[word]
+                self.in_lexicon[index] = True
+            if word in constants.BOOSTER_DICT:
+                self.booster[index] = constants.BOOSTER_DICT[word]
+                self.is_booster[index] = True
+            self.negation[index] = (word in constants.NEGATE or
+                                    "n't" in word)
+            self.idiom_word[index] = word in idiom_words
+        self.least = self.vocab['least']
+        self.at, self.very = self.vocab['at'], self.vocab['very']
+        self.but = self.vocab['but']
+        self.kind, self.of = self.vocab['kind'], self.vocab['of']
+        self.oov = size - 1
+
+    def tokenize(self, text):
+        """Split text into words and emoticons exactly like VADER's SentiText."""
+        punctuation_chars = self.punctuation_chars
+        no_punc_words = None
+        tokens = []
+        for token in text.split():
+            if len(token) < 2:
+                continue
+            if token[0] in punctuation_chars or token[-1] in punctuation_chars:
+                if no_punc_words is None:
+                    no_punc_words = {
+                        word for word in
+                        self.constants.REGEX_REMOVE_PUNCTUATION.sub(
+                            '', text).split()
+                        if len(word) > 1
+                    }
+                token = self._strip_punctuation(token, no_punc_words)
+            tokens.append(token)
+        return tokens
+
+    def _strip_punctuation(self, token, no_punc_words):
+        """Drop one PUNC_LIST entry before or after a known word."""
+        for punc in self.punc_list:
+            if token.startswith(punc) and token[len(punc):] in no_punc_words:
+                return token[len(punc):]
+            if token.endswith(punc) and token[:-len(punc)] in no_punc_words:
+                return token[:-len(punc)]
+        return token
+
+    def polarity_scores(self, text):
+        """Score a single text (see polarity_scores_batch)."""
+        return self.polarity_scores_batch([text])[0]
+
+    def polarity_scores_batch(self, texts):
+        """
+        Score many texts.
+
+        Args:
+            texts (list): Texts to score
+
+        Returns:
+            list: VADER score dictionaries ('neg', 'neu', 'pos', 'compound')
+        """
+        scores = []
+        for start in range(0, len(texts), self.CHUNK_SIZE):
+            scores.extend(self._score_chunk(texts[start:start + self.CHUNK_SIZE]))
+        return scores
+
+    def _score_chunk(self, texts):
+        """Score one chunk of texts with array operations."""
+        constants = self.constants
+        doc_tokens = [self.tokenize(text) for text in texts]
+        lengths = np.fromiter((len(tokens) for tokens in doc_tokens),
+                              dtype=np.int64, count=len(texts))
+        tokens = [token for doc in doc_tokens for token in doc]
+        n_docs = len(texts)
+        n_tokens = len(tokens)
+        if n_tokens == 0:
+            return [self._round_scores(0.0, 0.0, 0.0, 0.0)
+                    for _ in texts]
+
+        doc_ids = np.repeat(np.arange(n_docs), lengths)
+        doc_starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        token_starts = doc_starts[doc_ids]
+        positions = np.arange(n_tokens) - token_starts
+        doc_ends = token_starts + lengths[doc_ids]
+
+        # Word features are computed once per distinct token of the chunk
+        distinct = {}
+        token_ids = np.fromiter(
+            (distinct.setdefault(token, len(distinct)) for token in tokens),
+            dtype=np.int64, count=n_tokens)
+        lowered = [token.lower() for token in distinct]
+        ids = np.fromiter((self.vocab.get(word, self.oov) for word in lowered),
+                          dtype=np.int64, count=len(distinct))
+        negation = self.negation[ids] | np.fromiter(
+            ("n't" in word for word in lowered), dtype=bool,
+            count=len(distinct))
+        upper = np.fromiter((token.isupper() for token in distinct),
+                            dtype=bool, count=len(distinct))
+        is_never = np.fromiter((token == 'never' for token in distinct),
+                               dtype=bool, count=len(distinct))
+        is_so_this = np.fromiter((token in ('so', 'this') for token in distinct),
+                                 dtype=bool, count=len(distinct))
+        ids = ids[token_ids]
+        negation = negation[token_ids]
+        upper = upper[token_ids]
+        is_never = is_never[token_ids]
+        is_so_this = is_so_this[token_ids]
+
+        # VADER looks a word's context up at its first occurrence in the text
+        _, first, inverse = np.unique(doc_ids * len(distinct) + token_ids,
+                                      return_index=True, return_inverse=True)
+        at = first[inverse.ravel()]
+        context = at - token_starts
+
+        # Some but not all words of the text are in caps
+        caps = np.bincount(doc_ids, weights=upper, minlength=n_docs)
+        cap_diff = ((caps > 0) & (caps < lengths))[doc_ids]
+
+        def shifted(offset):
+            """Flat index of the word offset from each context, and validity."""
+            index = at + offset
+            valid = (index >= token_starts) & (index < doc_ends)
+            return np.where(valid, index, 0), valid
+
+        word_ids = ids[at]
+        next_index, has_next = shifted(1)
+        skip = self.is_booster[word_ids] | (
+            (word_ids == self.kind) & has_next & (ids[next_index] == self.of))
+        active = self.in_lexicon[word_ids] & ~skip
+
+        valence = np.where(active, self.valence[word_ids], 0.0)
+        capped = active & upper[at] & cap_diff
+        valence += np.where(capped, np.where(valence > 0, constants.C_INCR,
+                                             -constants.C_INCR), 0.0)
+
+        previous = {}
+        for distance, damping in ((1, 1.0), (2, 0.95), (3, 0.9)):
+            previous[distance] = shifted(-distance)
+            index, valid = previous[distance]
+            applies = active & valid & ~self.in_lexicon[ids[index]]
+
+            # Booster/dampener words before the sentiment word
+            scalar = self.booster[ids[index]]
+            scalar = np.where(valence < 0, -scalar, scalar)
+            scalar += np.where(
+                self.is_booster[ids[index]] & upper[index] & cap_diff,
+                np.where(valence > 0, constants.C_INCR, -constants.C_INCR),
+                0.0)
+            valence = np.where(applies, valence + scalar * damping, valence)
+
+            # Negation ("never so"/"never this" intensify instead)
+            negated = applies & negation[index]
+            if distance == 1:
+                valence = np.where(negated, valence * constants.N_SCALAR,
+                                   valence)
+            elif distance == 2:
+                prev1 = previous[1][0]
+                intensified = applies & is_never[index] & is_so_this[prev1]
+                valence = np.where(intensified, valence * 1.5,
+                                   np.where(negated & ~intensified,
+                                            valence * constants.N_SCALAR,
+                                            valence))
+            else:
+                prev1, prev2 = previous[1][0], previous[2][0]
+                intensified = applies & ((is_never[index] & is_so_this[prev2])
+                                         | is_so_this[prev1])
+                valence = np.where(intensified, valence * 1.25,
+                                   np.where(negated & ~intensified,
+                                            valence * constants.N_SCALAR,
+                                            valence))
+                valence = self._apply_idioms(valence, applies, ids, at,
+                                             shifted, doc_tokens, doc_ids,
+                                             context)
+
+        # "least" before the word negates it, unless "at least"/"very least"
+        index1, valid1 = previous[1]
+        index2, valid2 = previous[2]
+        least = (active & valid1 & (ids[index1] == self.least) &
+                 ~self.in_lexicon[ids[index1]])
+        excused = valid2 & ((ids[index2] == self.at) |
+                            (ids[index2] == self.very))
+        valence = np.where(least & ~excused, valence * constants.N_SCALAR,
+                           valence)
+
+        # Words before the first "but" count half, words after it 1.5 times
+        but_positions = np.where(ids == self.but, positions, n_tokens)
+        first_but = np.full(n_docs, n_tokens)
+        np.minimum.at(first_but, doc_ids, but_positions)
+        first_but = first_but[doc_ids]
+        has_but = first_but < n_tokens
+        valence = np.where(has_but & (positions < first_but), valence * 0.5,
+                           np.where(has_but & (positions > first_but),
+                                    valence * 1.5, valence))
+
+        sums = np.bincount(doc_ids, weights=valence, minlength=n_docs)
+        pos_sums = np.bincount(doc_ids, weights=np.where(valence > 0,
+                                                         valence + 1, 0.0),
+                               minlength=n_docs)
+        neg_sums = np.bincount(doc_ids, weights=np.where(valence < 0,
+                                                         valence - 1, 0.0),
+                               minlength=n_docs)
+        neutral = np.bincount(doc_ids, weights=valence == 0, minlength=n_docs)
+        return self._document_scores(sums, pos_sums, neg_sums, neutral,
+                                     lengths, texts)
+
+    def _apply_idioms(self, valence, applies, ids, at, shifted, doc_tokens,
+                      doc_ids, context):
+        """Run VADER's idiom rule on the few words where it may apply."""
+        near_idiom = np.zeros(len(ids), dtype=bool)
+        for offset in range(-3, 3):
+            index, valid = shifted(offset)
+            near_idiom |= valid & self.idiom_word[ids[index]]
+        candidates = np.flatnonzero(applies & near_idiom)
+        if len(candidates):
+            valence = valence.copy()
+            for token in candidates:
+                valence[token] = self.analyzer._idioms_check(
+                    valence[token], doc_tokens[doc_ids[token]],
+                    int(context[token]))
+        return valence
+
+    def _document_scores(self, sums, pos_sums, neg_sums, neutral, lengths,
+                         texts):
+        """Turn the per-text valence sums into VADER scores."""
+        # Emphasis from up to 4 exclamation marks and 2 or more question marks
+        exclamations = np.fromiter((text.count('!') for text in texts),
+                                   dtype=np.int64, count=len(texts))
+        questions = np.fromiter((text.count('?') for text in texts),
+                                dtype=np.int64, count=len(texts))
+        amplifier = np.minimum(exclamations, 4) * 0.292 + np.where(
+            questions > 3, 0.96,
+            np.where(questions > 1, questions * 0.18, 0.0))
+
+        sums = sums + np.sign(sums) * amplifier
+        compound = sums / np.sqrt(sums * sums + 15)
+
+        pos_larger = pos_sums > np.abs(neg_sums)
+        neg_larger = pos_sums < np.abs(neg_sums)
+        pos_sums = np.where(pos_larger, pos_sums + amplifier, pos_sums)
+        neg_sums = np.where(neg_larger, neg_sums - amplifier, neg_sums)
+        total = pos_sums + np.abs(neg_sums) + neutral
+        total[lengths == 0] = 1
+
+        return [
+            self._round_scores(neg, neu, pos, comp) if length else
+            self._round_scores(0.0, 0.0, 0.0, 0.0)
+            for neg, neu, pos, comp, length in zip(
+                np.abs(neg_sums / total).tolist(),
+                np.abs(neutral / total).tolist(),
+                np.abs(pos_sums / total).tolist(),
+                compound.tolist(), lengths.tolist())
+        ]
+
+    @staticmethod
+    def _round_scores(neg, neu, pos, compound):
+        """Round scores the way polarity_scores does."""
+        return {
+            'neg': round(neg, 3),
+            'neu': round(neu, 3),
+            'pos': round(pos, 3),
+            'compound': round(compound, 4)
+        }
+
+
+def get_vectorized_sentiment_analyzer():
+    """Get the shared vectorized VADER engine."""
+    # Resolved outside the registry lock, which is not reentrant
+    analyzer = get_sentiment_analyzer()
+    return _get_resource('vectorized_sentiment_analyzer',
+                         lambda: VectorizedSentimentAnalyzer(analyzer))
+
+
+def score_sentiments(texts, engine='vader'):
+    """
+    Score many texts with the selected sentiment engine.
+
+    Args:
+        texts (list): Texts to score
+        engine (str): 'vader' (stock NLTK) or 'vectorized'
+
+    Returns:
+        list: VADER score dictionaries, one per text
+    """
+    if engine == 'vectorized':
+        return get_vectorized_sentiment_analyzer().polarity_scores_batch(texts)
+    elif engine == 'vader':
+        analyzer = get_sentiment_analyzer()
+        return [analyzer.polarity_scores(text) for text in texts]
+    raise ValueError(f"Unsupported sentiment engine: {engine}")
+
+
 # Task 6: Sentiment Analysis
-def perform_sentiment_analysis(text, library='nltk'):
+def perform_sentiment_analysis(text, library='nltk', timeline=False,
+                               include_text=True, engine='vader'):
     """
     Analyze the sentiment of text (positive, negative, neutral).
 
     Args:
         text (str): The text to analyze
         library (str): The library to use ('nltk' or other)
+        timeline (bool): Also score every sentence (see sentiment_timeline)
+        include_text (bool): Whether to echo the text back in the result
+        engine (str): Sentiment engine ('vader' or 'vectorized')
 
     Returns:
         tuple: (result_dict, visualization_data)
@@ -376,34 +1197,12 @@ def perform_sentiment_analysis(text, library='nltk'):
     try:
         # NLTK's VADER sentiment analyzer
         if library == 'nltk' or library == 'spacy':  # spaCy doesn't have built-in sentiment, use NLTK
-            analyzer = SentimentIntensityAnalyzer()
-            scores = analyzer.polarity_scores(text)
-
-            # Determine sentiment label
-            if scores['compound'] >= 0.05:
-                sentiment = 'Positive'
-            elif scores['compound'] <= -0.05:
-                sentiment = 'Negative'
-            else:
-                sentiment = 'Neutral'
+            if timeline:
+                return sentiment_timeline(text, include_text, engine)
 
-            # Prepare visualization data
-            visual_data = [{
-                'name': 'Positive',
-                'value': scores['pos']
-            }, {
-                'name': 'Neutral',
-                'value': scores['neu']
-            }, {
-                'name': 'Negative',
-                'value': scores['neg']
-            }]
+            scores = score_sentiments([text], engine)[0]
 
-            return {
-                'sentiment': sentiment,
-                'scores': scores,
-                'text': text
-            }, visual_data
+            return _sentiment_result(scores, text if include_text else None)
         else:
             raise ValueError(f"Unsupported library: {library}")
     except Exception as e:
@@ -412,68 +1211,265 @@ def perform_sentiment_analysis(text, library='nltk'):
 
 
 # Task 7: Text Summarization
-def perform_text_summarization(text, library='nltk'):
+def _summary_size(sentence_count, ratio=None, num_sentences=None):
+    """
+    Work out how many sentences a summary keeps.
+
+    Args:
+        sentence_count (int): Number of sentences in the text
+        ratio (float, optional): Fraction of sentences to keep
+        num_sentences (int, optional): Exact number of sentences to keep,
+            taking precedence over ratio
+
+    Returns:
+        int: Number of sentences to select
+
+    Raises:
+        ValueError: If ratio or num_sentences is out of range
+    """
+    if num_sentences is not None:
+        if (isinstance(num_sentences, bool) or
+                not isinstance(num_sentences, int) or num_sentences < 1):
+            raise ValueError("num_sentences must be a positive integer")
+        return min(num_sentences, sentence_count)
+
+    if ratio is None:
+        ratio = Config.SUMMARY_RATIO
+    if (isinstance(ratio, bool) or not isinstance(ratio, (int, float)) or
+            not 0 < ratio <= 1):
+        raise ValueError("ratio must be a number in (0, 1]")
+    return max(1, round(sentence_count * ratio))
+
+
+def _sentence_term_matrix(sentences, stop_words):
+    """
+    Build a sparse sentence-term count matrix, tokenizing every sentence once.
+
+    Args:
+        sentences (list): Sentences of the text
+        stop_words (frozenset): Words to leave out
+
+    Returns:
+        scipy.sparse.csr_matrix: Counts with one row per sentence
+    """
+    vocabulary = {}
+    indices = []
+    indptr = [0]
+    for sentence in sentences:
+        for word in word_tokenize(sentence.lower()):
+            if word not in stop_words and word not in string.punctuation:
+                indices.append(vocabulary.setdefault(word, len(vocabulary)))
+        indptr.append(len(indices))
+
+    data = np.ones(len(indices), dtype=np.int64)
+    # Repeated (row, column) pairs are summed into counts
+    matrix = csr_matrix((data, np.asarray(indices, dtype=np.int64), indptr),
+                        shape=(len(sentences), len(vocabulary)))
+    matrix.sum_duplicates()
+    return matrix
+
+
+def _top_indices(scores, size):
+    """
+    Select the indices of the highest scores, in index order.
+
+    Entries tied at the cut-off are taken in index order, so the
+    selection is deterministic.
+
+    Args:
+        scores (numpy.ndarray): Score per entry
+        size (int): Number of entries to select
+
+    Returns:
+        numpy.ndarray: Sorted indices of the selected entries
+    """
+    if size >= len(scores):
+        return np.arange(len(scores))
+    cutoff = np.partition(scores, len(scores) - size)[len(scores) - size]
+    above = np.flatnonzero(scores > cutoff)
+    tied = np.flatnonzero(scores == cutoff)[:size - len(above)]
+    return np.sort(np.concatenate([above, tied]))
+
+
+def _frequency_scores(matrix):
+    """
+    Score sentences by the summed normalised frequency of their words.
+
+    Integer term counts are summed before normalising, so sentences of
+    equal weight tie exactly and are picked in text order.
+
+    Args:
+        matrix (scipy.sparse.csr_matrix): Sentence-term counts
+
+    Returns:
+        numpy.ndarray: Score per sentence
+    """
+    term_counts = np.asarray(matrix.sum(axis=0)).ravel()
+    max_count = term_counts.max() if term_counts.size else 1
+    return (matrix @ term_counts) / max_count
+
+
+# Similarity cells computed at once when building the TextRank graph
+TEXTRANK_BLOCK_CELLS = 4_000_000
+
+
+def _textrank_graph(vectors, neighbours):
+    """
+    Build a sparse sentence-similarity graph from L2-normalised vectors.
+
+    Similarities are computed a block of rows at a time and each sentence
+    keeps only its most similar neighbours, so the graph stays sparse and
+    memory stays bounded on long inputs. An edge kept by either end is
+    kept in both directions.
+
+    Args:
+        vectors (scipy.sparse.csr_matrix): TF-IDF row per sentence
+        neighbours (int): Edges kept per sentence
+
+    Returns:
+        scipy.sparse.csr_matrix: Symmetric weighted adjacency matrix
+    """
+    count = vectors.shape[0]
+    neighbours = min(neighbours, count - 1)
+    block_size = max(1, TEXTRANK_BLOCK_CELLS // count)
+    transposed = vectors.T.tocsc()
+
+    rows, columns, weights = [], [], []
+    for start in range(0, count, block_size):
+        stop = min(start + block_size, count)
+        similarity = (vectors[start:stop] @ transposed).toarray()
+        similarity[np.arange(stop - start), np.arange(start, stop)] = 0
+        nearest = np.argpartition(similarity, -neighbours,
+                                  axis=1)[:, -neighbours:]
+        values = np.take_along_axis(similarity, nearest, axis=1)
+        keep = values > 0
+        rows.append(np.nonzero(keep)[0] + start)
+        columns.append(nearest[keep])
+        weights.append(values[keep])
+
+    graph = csr_matrix((np.concatenate(weights),
+                        (np.concatenate(rows), np.concatenate(columns))),
+                       shape=(count, count))
+    return graph.maximum(graph.T).tocsr()
+
+
+def _pagerank(graph, damping, tolerance, max_iterations):
+    """
+    Rank the nodes of a weighted graph by power iteration.
+
+    Nodes without edges spread their rank evenly over all nodes.
+
+    Args:
+        graph (scipy.sparse.csr_matrix): Weighted adjacency matrix
+        damping (float): Probability of following an edge
+        tolerance (float): L1 change below which iteration stops
+        max_iterations (int): Upper bound on the number of iterations
+
+    Returns:
+        tuple: (rank per node, iterations run)
+    """
+    count = graph.shape[0]
+    degree = np.asarray(graph.sum(axis=1)).ravel()
+    dangling = degree == 0
+    inverse_degree = np.divide(1.0, degree, out=np.zeros_like(degree),
+                               where=~dangling)
+    # Column-stochastic transition matrix: rank flows along weighted edges
+    transition = (diags(inverse_degree) @ graph).T.tocsr()
+
+    rank = np.full(count, 1.0 / count)
+    for iteration in range(1, max_iterations + 1):
+        spread = (1 - damping + damping * rank[dangling].sum()) / count
+        updated = damping * (transition @ rank) + spread
+        change = np.abs(updated - rank).sum()
+        rank = updated
+        if change < tolerance:
+            break
+    return rank, iteration
+
+
+def _textrank_scores(matrix):
+    """
+    Score sentences by TextRank over their TF-IDF cosine similarity graph.
+
+    Args:
+        matrix (scipy.sparse.csr_matrix): Sentence-term counts
+
+    Returns:
+        numpy.ndarray: Score per sentence
+    """
+    if not matrix.nnz:
+        return np.zeros(matrix.shape[0])
+    vectors = TfidfTransformer().fit_transform(matrix).tocsr()
+    graph = _textrank_graph(vectors, Config.TEXTRANK_NEIGHBOURS)
+    scores, iterations = _pagerank(graph, Config.TEXTRANK_DAMPING,
+                                   Config.TEXTRANK_TOLERANCE,
+                                   Config.TEXTRANK_MAX_ITERATIONS)
+    logger.debug(f"TextRank converged after {iterations} iterations over "
+                 f"{graph.nnz} edges")
+    return scores
+
+
+# Sentence scoring methods for extractive summarization
+SUMMARY_METHODS = {
+    'frequency': _frequency_scores,
+    'textrank': _textrank_scores
+}
+
+
+def perform_text_summarization(text, library='nltk', ratio=None,
+                               num_sentences=None, method='frequency'):
     """
     Generate a summary of a longer text.
 
+    Sentences are tokenized once into a sparse sentence-term matrix and
+    scored by the selected method (see SUMMARY_METHODS): 'frequency' sums
+    the normalised frequency of their words, 'textrank' ranks them on a
+    TF-IDF similarity graph.
+
     Args:
         text (str): The text to summarize
         library (str): The library to use ('nltk' or other)
+        ratio (float, optional): Fraction of sentences to keep (defaults
+            to Config.SUMMARY_RATIO)
+        num_sentences (int, optional): Exact number of sentences to keep
+        method (str): Sentence scoring method ('frequency' or 'textrank')
 
     Returns:
-        dict: Dictionary with summary results
+        dict: Dictionary with summary results and per-sentence scores
     """
     try:
         # Simple extractive summarization based on sentence scoring
         if library == 'nltk' or library == 'spacy':  # Use same algorithm for both
+            if method not in SUMMARY_METHODS:
+                raise ValueError(f"Unsupported summarization method: {method}")
+
             # Split into sentences
             sentences = sent_tokenize(text)
+            size = _summary_size(len(sentences), ratio, num_sentences)
 
             if len(sentences) <= 2:
                 return {
                     'summary': text,
                     'summary_sentences': sentences,
+                    'method': method,
+                    'sentence_scores': [{
+                        'index': i,
+                        'sentence': sentence,
+                        'score': 0.0,
+                        'selected': True
+                    } for i, sentence in enumerate(sentences)],
                     'original_length': len(text),
                     'summary_length': len(text),
                     'compression_ratio': 1.0
                 }
 
-            # Calculate word frequencies
-            stop_words = set(stopwords.words('english'))
-            word_frequencies = {}
-
-            for sentence in sentences:
-                for word in word_tokenize(sentence.lower()):
-                    if word not in stop_words and word not in string.punctuation:
-                        if word not in word_frequencies:
-                            word_frequencies[word] = 1
-                        else:
-                            word_frequencies[word] += 1
-
-            # Normalize frequencies
-            max_frequency = max(
-                word_frequencies.values()) if word_frequencies else 1
-            normalized_frequencies = {
-                word: freq / max_frequency
-                for word, freq in word_frequencies.items()
-            }
+            matrix = _sentence_term_matrix(sentences, get_stopwords())
+            scores = SUMMARY_METHODS[method](matrix)
 
-            # Score sentences
-            sentence_scores = {}
-            for i, sentence in enumerate(sentences):
-                for word in word_tokenize(sentence.lower()):
-                    if word in normalized_frequencies:
-                        if i not in sentence_scores:
-                            sentence_scores[i] = normalized_frequencies[word]
-                        else:
-                            sentence_scores[i] += normalized_frequencies[word]
-
-            # Get top sentences (about 30% of original)
-            summary_size = max(1, round(len(sentences) * 0.3))
-            top_indices = sorted(sentence_scores,
-                                 key=sentence_scores.get,
-                                 reverse=True)[:summary_size]
-            top_indices = sorted(top_indices)  # Sort by original order
+            # Sentences without a scored word are never selected
+            candidates = np.flatnonzero(matrix.getnnz(axis=1))
+            top_indices = candidates[_top_indices(scores[candidates], size)]
+            selected = set(top_indices.tolist())
 
             summary_sentences = [sentences[i] for i in top_indices]
             summary = ' '.join(summary_sentences)
@@ -483,6 +1479,14 @@ def perform_text_summarization(text, library='nltk'):
                 summary,
                 'summary_sentences':
                 summary_sentences,
+                'method':
+                method,
+                'sentence_scores': [{
+                    'index': i,
+                    'sentence': sentence,
+                    'score': float(scores[i]),
+                    'selected': i in selected
+                } for i, sentence in enumerate(sentences)],
                 'original_length':
                 len(text),
                 'summary_length':
@@ -497,67 +1501,612 @@ def perform_text_summarization(text, library='nltk'):
         raise
 
 
-# Task 8: Keyword Extraction
-def perform_keyword_extraction(text, library='nltk'):
-    """
-    Extract the most important keywords from text.
+# Sections keep this many times the requested share of their sentences,
+# leaving the final level candidates to choose from
+SUMMARY_SECTION_OVERSAMPLE = 2
 
-    Args:
-        text (str): The text to analyze
-        library (str): The library to use ('nltk' or 'spacy')
 
-    Returns:
-        tuple: (result_dict, visualization_data)
+def _summarize_section(section, ratio, method):
     """
-    try:
-        # Use TF-IDF for keyword extraction
-        if library == 'nltk' or library == 'spacy':  # Same approach for both
-            # Tokenize and remove stopwords
-            stop_words = set(stopwords.words('english'))
-            words = word_tokenize(text.lower())
-            filtered_words = [
-                word for word in words if word not in stop_words
-                and word not in string.punctuation and word.isalpha()
-            ]
-
-            # Use word frequencies as a simple keyword metric
-            word_freq = Counter(filtered_words)
-            total_words = len(filtered_words)
-
-            # Calculate scores (normalized frequency)
-            keyword_scores = {
-                word: count / total_words
-                for word, count in word_freq.items()
-            }
+    Summarize one section of a long text (run in worker processes).
 
-            # Get top 10 keywords
-            top_keywords = sorted(keyword_scores.items(),
-                                  key=lambda x: x[1],
-                                  reverse=True)[:10]
+    Returns:
+        tuple: (section length, section sentence count, section summary)
+    """
+    result = perform_text_summarization(section, ratio=ratio, method=method)
+    return len(section), len(result['sentence_scores']), result['summary']
 
-            # Prepare visualization data
-            visual_data = [{
-                'name': word,
-                'value': score
-            } for word, score in top_keywords]
 
-            return {
-                'keywords':
-                dict(top_keywords),
-                'keyword_list': [{
-                    'word': word,
-                    'score': score
-                } for word, score in top_keywords]
-            }, visual_data
+def perform_hierarchical_summarization(text, library='nltk', ratio=None,
+                                       num_sentences=None, method='frequency',
+                                       section_chars=None, n_process=None):
+    """
+    Summarize a long text in two levels with bounded memory.
+
+    The text is cut into sections of about section_chars characters, which
+    are summarized one window at a time (in worker processes when
+    n_process > 1), so only the section summaries are kept rather than
+    every sentence and score of the whole text. The joined section
+    summaries are then summarized again into the final summary.
+
+    The ratio applies once, to the whole text: sections keep
+    SUMMARY_SECTION_OVERSAMPLE times ratio of their sentences, and the
+    final level selects ratio of the text's sentences from those.
+
+    Args:
+        text (str): The text to summarize
+        library (str): The library to use ('nltk' or 'spacy')
+        ratio (float, optional): Fraction of the text's sentences to keep
+            (defaults to Config.SUMMARY_RATIO)
+        num_sentences (int, optional): Number of sentences in the final
+            summary, taking precedence over ratio
+        method (str): Sentence scoring method (see SUMMARY_METHODS)
+        section_chars (int, optional): Section length (defaults to
+            Config.SUMMARY_SECTION_CHARS)
+        n_process (int, optional): Worker processes for the sections
+            (defaults to Config.SUMMARY_N_PROCESS)
+
+    Returns:
+        dict: The final summary result with the section summaries and the
+            time spent per level
+    """
+    try:
+        if library not in ('nltk', 'spacy'):
+            raise ValueError(f"Unsupported library: {library}")
+        if method not in SUMMARY_METHODS:
+            raise ValueError(f"Unsupported summarization method: {method}")
+        _summary_size(1, ratio)
+        if ratio is None:
+            ratio = Config.SUMMARY_RATIO
+        section_ratio = min(1, ratio * SUMMARY_SECTION_OVERSAMPLE)
+        section_chars = section_chars or Config.SUMMARY_SECTION_CHARS
+        n_process = n_process or Config.SUMMARY_N_PROCESS
+
+        start = time.perf_counter()
+        sections = _iter_text_chunks(text, section_chars)
+        if n_process > 1:
+            outputs = []
+            with ProcessPoolExecutor(max_workers=n_process) as executor:
+                # Only a window of sections is in flight at any time
+                while True:
+                    window = list(islice(sections, n_process * 2))
+                    if not window:
+                        break
+                    outputs.extend(executor.map(
+                        _summarize_section, window,
+                        [section_ratio] * len(window),
+                        [method] * len(window)))
         else:
+            outputs = [_summarize_section(section, section_ratio, method)
+                       for section in sections]
+        section_seconds = time.perf_counter() - start
+
+        section_results = []
+        offset = 0
+        for index, (length, _, summary) in enumerate(outputs):
+            section_results.append({
+                'index': index,
+                'start': offset,
+                'end': offset + length,
+                'summary': summary
+            })
+            offset += length
+
+        if num_sentences is None:
+            num_sentences = _summary_size(
+                sum(count for _, count, _ in outputs), ratio)
+
+        start = time.perf_counter()
+        result = perform_text_summarization(
+            ' '.join(summary for _, _, summary in outputs if summary),
+            library, num_sentences=num_sentences, method=method)
+        final_seconds = time.perf_counter() - start
+
+        result.update({
+            'original_length': len(text),
+            'compression_ratio':
+            result['summary_length'] / len(text) if len(text) > 0 else 1,
+            'sections': section_results,
+            'levels': [{
+                'level': 1,
+                'sections': len(section_results),
+                'seconds': section_seconds
+            }, {
+                'level': 2,
+                'sections': 1,
+                'seconds': final_seconds
+            }]
+        })
+        return result
+    except Exception as e:
+        logger.error(
+            f"Error in hierarchical summarization with {library}: {str(e)}")
+        raise
+
+
+def _keyword_result(words, stop_words):
+    """
+    Build the keyword extraction result from lowercased tokens.
+
+    Words are scored by TF-IDF: their frequency in the text times their
+    IDF in the background table (see get_idf_table).
+
+    Returns:
+        tuple: (result_dict, visualization_data)
+    """
+    filtered_words = [
+        word for word in words if word not in stop_words
+        and word not in string.punctuation and word.isalpha()
+    ]
+
+    word_freq = Counter(filtered_words)
+    total_words = len(filtered_words)
+
+    # Calculate scores (normalized frequency times background IDF)
+    idf = get_idf_table().idf
+    keyword_scores = {
+        word: count / total_words * idf(word)
+        for word, count in word_freq.items()
+    }
+
+    # Get top 10 keywords
+    top_keywords = heapq.nlargest(10, keyword_scores.items(),
+                                  key=itemgetter(1))
+
+    # Prepare visualization data
+    visual_data = [{
+        'name': word,
+        'value': score
+    } for word, score in top_keywords]
+
+    return {
+        'keywords':
+        dict(top_keywords),
+        'keyword_list': [{
+            'word': word,
+            'score': score
+        } for word, score in top_keywords]
+    }, visual_data
+
+
+# Longest keyphrase the phrase methods return, in words
+KEYPHRASE_MAX_WORDS = 3
+
+# Keyphrases returned by the phrase methods
+KEYPHRASE_TOP_N = 10
+
+# spaCy components noun chunks are read from
+NOUN_CHUNK_COMPONENTS = ('tagger', 'attribute_ruler', 'parser')
+
+
+def _phrase_result(phrases, scores, top_n=KEYPHRASE_TOP_N):
+    """
+    Build the keyword extraction result from scored keyphrases.
+
+    Args:
+        phrases (list): Keyphrases, in first-seen order
+        scores (numpy.ndarray): Score per keyphrase (higher is better)
+        top_n (int): Number of keyphrases to return
+
+    Returns:
+        tuple: (result_dict, visualization_data)
+    """
+    top = _top_indices(scores, top_n)
+    top = top[np.argsort(-scores[top], kind='stable')]
+    top_keywords = [(phrases[i], float(scores[i])) for i in top]
+
+    visual_data = [{
+        'name': phrase,
+        'value': score
+    } for phrase, score in top_keywords]
+
+    return {
+        'keywords':
+        dict(top_keywords),
+        'keyword_list': [{
+            'word': phrase,
+            'score': score
+        } for phrase, score in top_keywords]
+    }, visual_data
+
+
+class _PhraseCandidates:
+    """
+    Keyphrase candidates of a text, collected in one pass over its tokens.
+
+    Candidates are runs of up to KEYPHRASE_MAX_WORDS consecutive content
+    words, delimited by stopwords, punctuation and sentence ends. Words
+    and distinct phrases are numbered as they are first seen, and every
+    occurrence is recorded in flat arrays for the array-based scorers.
+    """
+
+    def __init__(self, sentences, stop_words, ngrams=False):
+        """
+        Args:
+            sentences (list): Tokenized sentences, in original case
+            stop_words (frozenset): Lowercase words delimiting candidates
+            ngrams (bool): Take every n-gram of a run as a candidate
+                rather than the run as a whole
+        """
+        self.vocabulary = {}
+        self.phrase_index = {}
+        # Every alphabetic word, stopwords included, for co-occurrence
+        neighbours = {}
+        # One entry per content word occurrence
+        word_ids, sentence_ids, cased, left, right = [], [], [], [], []
+        # One entry per phrase occurrence, and per word of each
+        phrase_ids, occurrence_words, occurrence_lengths = [], [], []
+        self.sentence_count = len(sentences)
+
+        for sentence_id, tokens in enumerate(sentences):
+            lowered = [token.lower() for token in tokens]
+            neighbour_ids = [neighbours.setdefault(word, len(neighbours))
+                             if word.isalpha() else -1 for word in lowered]
+            run = []
+            for position, word in enumerate(lowered + ['.']):
+                if word.isalpha() and word not in stop_words:
+                    token = tokens[position]
+                    word_id = self.vocabulary.setdefault(word,
+                                                         len(self.vocabulary))
+                    run.append(word_id)
+                    word_ids.append(word_id)
+                    sentence_ids.append(sentence_id)
+                    # Capitalised away from the sentence start, or an acronym
+                    cased.append((position > 0 and token[0].isupper()) or
+                                 (len(token) > 1 and token.isupper()))
+                    left.append(neighbour_ids[position - 1]
+                                if position > 0 else -1)
+                    right.append(neighbour_ids[position + 1]
+                                 if position + 1 < len(tokens) else -1)
+                    continue
+                for phrase in self._run_phrases(run, ngrams):
+                    phrase_ids.append(self.phrase_index.setdefault(
+                        phrase, len(self.phrase_index)))
+                    occurrence_words.extend(phrase)
+                    occurrence_lengths.extend([len(phrase)] * len(phrase))
+                run = []
+
+        self.neighbour_count = len(neighbours)
+        self.word_ids = np.asarray(word_ids, dtype=np.int64)
+        self.sentence_ids = np.asarray(sentence_ids, dtype=np.int64)
+        self.cased = np.asarray(cased, dtype=bool)
+        self.left = np.asarray(left, dtype=np.int64)
+        self.right = np.asarray(right, dtype=np.int64)
+        self.phrase_ids = np.asarray(phrase_ids, dtype=np.int64)
+        self.occurrence_words = np.asarray(occurrence_words, dtype=np.int64)
+        self.occurrence_lengths = np.asarray(occurrence_lengths,
+                                             dtype=np.float64)
+
+        # Words of every distinct phrase, flattened, with their phrase id
+        phrases = list(self.phrase_index)
+        self.phrase_words = np.fromiter(
+            (word for phrase in phrases for word in phrase), dtype=np.int64)
+        self.phrase_of_word = np.repeat(
+            np.arange(len(phrases)), [len(phrase) for phrase in phrases])
+
+        words = list(self.vocabulary)
+        self.phrases = [' '.join(words[word] for word in phrase)
+                        for phrase in phrases]
+
+    @staticmethod
+    def _run_phrases(run, ngrams):
+        """Yield the candidate phrases of one run of content words."""
+        if ngrams:
+            for length in range(1, min(len(run), KEYPHRASE_MAX_WORDS) + 1):
+                for start in range(len(run) - length + 1):
+                    yield tuple(run[start:start + length])
+        elif 0 < len(run) <= KEYPHRASE_MAX_WORDS:
+            yield tuple(run)
+
+    def per_word(self, values=None):
+        """Sum values (or count occurrences) per word."""
+        return np.bincount(self.word_ids, weights=values,
+                           minlength=len(self.vocabulary))
+
+    def per_phrase(self, word_values):
+        """Sum word values over the words of every distinct phrase."""
+        return np.bincount(self.phrase_of_word,
+                           weights=word_values[self.phrase_words],
+                           minlength=len(self.phrases))
+
+    def phrase_frequencies(self):
+        """Count the occurrences of every distinct phrase."""
+        return np.bincount(self.phrase_ids, minlength=len(self.phrases))
+
+    def distinct_neighbours(self, neighbours):
+        """
+        Get the share of a word's neighbour occurrences that are distinct.
+
+        Args:
+            neighbours (numpy.ndarray): Neighbour id per word occurrence,
+                -1 where there is none
+
+        Returns:
+            numpy.ndarray: Distinct over total neighbours per word
+        """
+        present = neighbours >= 0
+        words = self.word_ids[present]
+        pairs = np.unique(words * self.neighbour_count + neighbours[present])
+        distinct = np.bincount(pairs // self.neighbour_count,
+                               minlength=len(self.vocabulary))
+        total = np.bincount(words, minlength=len(self.vocabulary))
+        return np.divide(distinct, total, out=np.zeros(len(total)),
+                         where=total > 0)
+
+
+# Tokens that end a sentence in word_tokenize output
+_SENTENCE_END_TOKENS = frozenset('.!?')
+
+
+def _keyword_sentences(text):
+    """
+    Tokenize text once and group the tokens into sentences.
+
+    word_tokenize splits sentence-final punctuation off as its own token,
+    so sentences end at those tokens. Case is kept.
+
+    Returns:
+        list: Sentences as lists of tokens
+    """
+    sentences = [[]]
+    for token in word_tokenize(text):
+        sentences[-1].append(token)
+        if token in _SENTENCE_END_TOKENS:
+            sentences.append([])
+    return [sentence for sentence in sentences if sentence]
+
+
+def _rake_keywords(text, library):
+    """
+    Score keyphrases with RAKE (Rapid Automatic Keyword Extraction).
+
+    A word scores its degree (the summed length of the candidate phrases
+    it occurs in) over its frequency in them, and a phrase the sum of its
+    word scores.
+
+    Returns:
+        tuple: (result_dict, visualization_data)
+    """
+    candidates = _PhraseCandidates(_keyword_sentences(text), get_stopwords())
+    size = len(candidates.vocabulary)
+    frequency = np.bincount(candidates.occurrence_words, minlength=size)
+    degree = np.bincount(candidates.occurrence_words,
+                         weights=candidates.occurrence_lengths,
+                         minlength=size)
+    word_scores = degree / np.maximum(frequency, 1)
+    return _phrase_result(candidates.phrases,
+                          candidates.per_phrase(word_scores))
+
+
+def _yake_keywords(text, library):
+    """
+    Score keyphrases with YAKE-style statistical features.
+
+    Each word gets YAKE's casing, position, frequency, relatedness and
+    sentence spread features, computed over arrays of its occurrences.
+    Candidate n-grams then score prod(S) / (tf * (1 + sum(S))) over their
+    word scores S, where lower is better; reported scores are the best
+    score divided by each phrase's score, so the top phrase scores 1.
+
+    Returns:
+        tuple: (result_dict, visualization_data)
+    """
+    candidates = _PhraseCandidates(_keyword_sentences(text), get_stopwords(),
+                                   ngrams=True)
+    if not candidates.phrases:
+        return _phrase_result([], np.zeros(0))
+
+    term_frequency = candidates.per_word()
+    casing = (candidates.per_word(candidates.cased.astype(np.float64)) /
+              (1 + np.log(term_frequency)))
+
+    # Median index of the sentences each word occurs in
+    order = np.lexsort((candidates.sentence_ids, candidates.word_ids))
+    sentence_ids = candidates.sentence_ids[order]
+    starts = np.cumsum(term_frequency) - term_frequency
+    median = (sentence_ids[starts + (term_frequency - 1) // 2] +
+              sentence_ids[starts + term_frequency // 2]) / 2
+    position = np.log(np.log(3 + median))
+
+    frequency = term_frequency / (term_frequency.mean() +
+                                  term_frequency.std())
+    relatedness = 1 + ((candidates.distinct_neighbours(candidates.left) +
+                        candidates.distinct_neighbours(candidates.right)) *
+                       term_frequency / term_frequency.max())
+    sentence_pairs = np.unique(candidates.word_ids *
+                               candidates.sentence_count +
+                               candidates.sentence_ids)
+    spread = (np.bincount(sentence_pairs // candidates.sentence_count,
+                          minlength=len(term_frequency)) /
+              candidates.sentence_count)
+
+    word_scores = (relatedness * position /
+                   (casing + (frequency + spread) / relatedness))
+    phrase_scores = (np.exp(candidates.per_phrase(np.log(word_scores))) /
+                     (candidates.phrase_frequencies() *
+                      (1 + candidates.per_phrase(word_scores))))
+    return _phrase_result(candidates.phrases,
+                          phrase_scores.min() / phrase_scores)
+
+
+def _noun_chunk_keywords(text, library):
+    """
+    Score spaCy noun chunks as keyphrases.
+
+    Chunks are reduced to their content words; a phrase scores its share
+    of all chunks times the mean background IDF of its words.
+
+    Returns:
+        tuple: (result_dict, visualization_data)
+    """
+    if library != 'spacy':
+        raise ValueError("Noun chunk keywords require the spacy library")
+    doc = get_spacy_doc(text, NOUN_CHUNK_COMPONENTS)
+    if not doc.has_annotation('DEP'):
+        raise ValueError(
+            "Noun chunk keywords need a spaCy model with a parser")
+
+    counts = Counter()
+    for chunk in doc.noun_chunks:
+        words = tuple(token.lower_ for token in chunk
+                      if token.is_alpha and not token.is_stop)
+        if 0 < len(words) <= KEYPHRASE_MAX_WORDS:
+            counts[words] += 1
+    if not counts:
+        return _phrase_result([], np.zeros(0))
+
+    idf = get_idf_table().idf
+    phrases = list(counts)
+    lengths = np.array([len(phrase) for phrase in phrases])
+    word_idf = np.fromiter((idf(word) for phrase in phrases
+                            for word in phrase), dtype=np.float64)
+    mean_idf = (np.bincount(np.repeat(np.arange(len(phrases)), lengths),
+                            weights=word_idf) / lengths)
+    shares = np.fromiter(counts.values(), dtype=np.float64) / sum(
+        counts.values())
+    return _phrase_result([' '.join(phrase) for phrase in phrases],
+                          shares * mean_idf)
+
+
+def _tfidf_keywords(text, library):
+    """Score single words by TF-IDF against the background IDF table."""
+    return _keyword_result(word_tokenize(text.lower()), get_stopwords())
+
+
+# Keyword extraction methods: single words by TF-IDF, or keyphrases
+KEYWORD_METHODS = {
+    'tfidf': _tfidf_keywords,
+    'rake': _rake_keywords,
+    'yake': _yake_keywords,
+    'noun_chunks': _noun_chunk_keywords
+}
+
+
+# Task 8: Keyword Extraction
+def perform_keyword_extraction(text, library='nltk', method='tfidf'):
+    """
+    Extract the most important keywords from text.
+
+    Args:
+        text (str): The text to analyze
+        library (str): The library to use ('nltk' or 'spacy')
+        method (str): Scoring method (see KEYWORD_METHODS); 'noun_chunks'
+            needs the spacy library
+
+    Returns:
+        tuple: (result_dict, visualization_data)
+    """
+    try:
+        if library not in ('nltk', 'spacy'):
             raise ValueError(f"Unsupported library: {library}")
+        if method not in KEYWORD_METHODS:
+            raise ValueError(f"Unsupported keyword method: {method}")
+        return KEYWORD_METHODS[method](text, library)
     except Exception as e:
         logger.error(f"Error in keyword extraction with {library}: {str(e)}")
         raise
 
 
 # Task 9: Text Similarity
-def perform_text_similarity(text1, text2, library='nltk'):
+# Similarity vectorizers: 'tfidf' fits TF-IDF on each pair of texts,
+# 'hashing' compares cached hashed term counts of each text
+SIMILARITY_VECTORIZERS = ('tfidf', 'hashing')
+
+# Per-text hashed term counts and token sets, keyed by content hash
+vector_cache = LRUCache(max_entries=Config.VECTOR_CACHE_MAX_ENTRIES,
+                        max_bytes=Config.VECTOR_CACHE_MAX_BYTES)
+
+# Smoothed IDF of a term in one of two documents (in both it is 1)
+_PAIR_IDF = np.log(3 / 2) + 1
+
+
+def get_hashing_vectorizer():
+    """Get the shared hashing vectorizer (fixed feature space, no fit)."""
+    return _get_resource('hashing_vectorizer', lambda: HashingVectorizer(
+        n_features=Config.HASHING_FEATURES, stop_words='english',
+        alternate_sign=False, norm=None))
+
+
+def _similarity_features(text):
+    """
+    Get a text's hashed term counts and its token set.
+
+    Both are computed once per distinct text and cached by content hash,
+    so a text can be compared with any number of others without being
+    tokenized again.
+
+    Returns:
+        tuple: (sorted feature indices, counts, token set)
+    """
+    key = hash_text(text)
+    entry = vector_cache.get(key)
+    if entry is None:
+        vector = get_hashing_vectorizer().transform([text])
+        vector.sort_indices()
+        tokens = frozenset(word_tokenize(text.lower()))
+        entry = (vector.indices, vector.data, tokens)
+        vector_cache.set(key, entry, size=(
+            vector.indices.nbytes + vector.data.nbytes +
+            sum(len(token) + 50 for token in tokens)))
+    return entry
+
+
+def _pair_tfidf_cosine(indices1, counts1, indices2, counts2):
+    """
+    Cosine similarity of two texts' TF-IDF vectors fit on the pair alone.
+
+    With two documents a term's smoothed IDF is 1 when both contain it and
+    ln(3/2) + 1 otherwise, so the score TfidfVectorizer gives the pair
+    follows from the term counts without fitting anything.
+
+    Returns:
+        float: The cosine similarity
+    """
+    _, shared1, shared2 = np.intersect1d(indices1, indices2,
+                                         assume_unique=True,
+                                         return_indices=True)
+    dot = np.dot(counts1[shared1], counts2[shared2])
+    norms = []
+    for counts, shared in ((counts1, shared1), (counts2, shared2)):
+        shared_square = np.dot(counts[shared], counts[shared])
+        total_square = np.dot(counts, counts)
+        norms.append(np.sqrt(shared_square + _PAIR_IDF ** 2 *
+                             (total_square - shared_square)))
+    if not norms[0] or not norms[1]:
+        return 0.0
+    return float(dot / (norms[0] * norms[1]))
+
+
+def _similarity_result(similarity, text1_tokens, text2_tokens):
+    """
+    Build the text similarity result from a score and two token sets.
+
+    Returns:
+        tuple: (result_dict, visualization_data)
+    """
+    # Get common and unique terms
+    common_terms = text1_tokens.intersection(text2_tokens)
+    text1_unique = text1_tokens - text2_tokens
+    text2_unique = text2_tokens - text1_tokens
+
+    # Visualization data
+    visual_data = {
+        'similarity_score': similarity,
+        'text1_unique_count': len(text1_unique),
+        'text2_unique_count': len(text2_unique),
+        'common_terms_count': len(common_terms)
+    }
+
+    return {
+        'similarity_score': similarity,
+        'common_terms': list(common_terms),
+        'text1_unique': list(text1_unique),
+        'text2_unique': list(text2_unique)
+    }, visual_data
+
+
+def perform_text_similarity(text1, text2, library='nltk',
+                            vectorizer='tfidf'):
     """
     Calculate similarity between two texts.
 
@@ -565,42 +2114,36 @@ def perform_text_similarity(text1, text2, library='nltk'):
         text1 (str): First text to compare
         text2 (str): Second text to compare
         library (str): The library to use ('nltk' or 'spacy')
+        vectorizer (str): 'tfidf' fits TF-IDF on the two texts; 'hashing'
+            gives the same score from cached hashed term counts
 
     Returns:
         tuple: (result_dict, visualization_data)
     """
     try:
         if library == 'nltk' or library == 'spacy':  # Use same algorithm for both
+            if vectorizer == 'hashing':
+                indices1, counts1, text1_tokens = _similarity_features(text1)
+                indices2, counts2, text2_tokens = _similarity_features(text2)
+                similarity = _pair_tfidf_cosine(indices1, counts1,
+                                                indices2, counts2)
+                return _similarity_result(similarity, text1_tokens,
+                                          text2_tokens)
+            elif vectorizer != 'tfidf':
+                raise ValueError(
+                    f"Unsupported similarity vectorizer: {vectorizer}")
+
             # Vectorize texts using TF-IDF
-            vectorizer = TfidfVectorizer(stop_words='english')
-            tfidf_matrix = vectorizer.fit_transform([text1, text2])
+            tfidf = TfidfVectorizer(stop_words='english')
+            tfidf_matrix = tfidf.fit_transform([text1, text2])
 
             # Calculate cosine similarity
             similarity = cosine_similarity(tfidf_matrix[0:1],
                                            tfidf_matrix[1:2])[0][0]
 
-            # Get common and unique terms
-            text1_tokens = set(word_tokenize(text1.lower()))
-            text2_tokens = set(word_tokenize(text2.lower()))
-
-            common_terms = text1_tokens.intersection(text2_tokens)
-            text1_unique = text1_tokens - text2_tokens
-            text2_unique = text2_tokens - text1_tokens
-
-            # Visualization data
-            visual_data = {
-                'similarity_score': similarity,
-                'text1_unique_count': len(text1_unique),
-                'text2_unique_count': len(text2_unique),
-                'common_terms_count': len(common_terms)
-            }
-
-            return {
-                'similarity_score': similarity,
-                'common_terms': list(common_terms),
-                'text1_unique': list(text1_unique),
-                'text2_unique': list(text2_unique)
-            }, visual_data
+            return _similarity_result(similarity,
+                                      set(word_tokenize(text1.lower())),
+                                      set(word_tokenize(text2.lower())))
         else:
             raise ValueError(f"Unsupported library: {library}")
     except Exception as e:
@@ -608,11 +2151,465 @@ def perform_text_similarity(text1, text2, library='nltk'):
         raise
 
 
+def _similarity_blocks(vectors, block_cells):
+    """
+    Yield the upper triangle of a cosine similarity matrix in row blocks.
+
+    Each block compares a run of rows with themselves and every later row
+    only, so a block holds at most block_cells scores however many rows
+    there are.
+
+    Args:
+        vectors (scipy.sparse.csr_matrix): L2-normalised row per document
+        block_cells (int): Upper bound on the scores held per block
+
+    Yields:
+        tuple: (first row, dense block of rows x later columns)
+    """
+    count = vectors.shape[0]
+    block_size = max(1, block_cells // count)
+    transposed = vectors.T.tocsc()
+    for start in range(0, count, block_size):
+        stop = min(start + block_size, count)
+        yield start, (vectors[start:stop] @ transposed[:, start:]).toarray()
+
+
+def perform_similarity_matrix(texts, threshold=None):
+    """
+    Compute the pairwise cosine similarity of many texts.
+
+    The texts share one TF-IDF fit, so a pair's score is weighted by the
+    whole collection rather than by the pair alone. Without a threshold
+    the full symmetric matrix is returned; with one, only the pairs
+    scoring at least the threshold, which keeps the response (and the
+    memory used to build it) proportional to the number of matches.
+
+    Args:
+        texts (list): Texts to compare
+        threshold (float, optional): Minimum score of a returned pair
+
+    Returns:
+        dict: 'matrix' (list of rows) or 'pairs' ({'a', 'b', 'score'} with
+            a < b, highest score first)
+
+    Raises:
+        ValueError: If the pairs above the threshold exceed
+            Config.SIMILARITY_MATRIX_MAX_PAIRS
+    """
+    try:
+        count = len(texts)
+        try:
+            vectors = TfidfVectorizer(stop_words='english').fit_transform(texts)
+        except ValueError:
+            # Only stop words: every pair scores 0
+            vectors = csr_matrix((count, 1))
+        blocks = _similarity_blocks(vectors, Config.SIMILARITY_BLOCK_CELLS)
+
+        if threshold is None:
+            matrix = np.zeros((count, count))
+            for start, block in blocks:
+                matrix[start:start + len(block), start:] = block
+            matrix = np.triu(matrix, 1)
+            matrix += matrix.T
+            np.fill_diagonal(matrix, 1.0)
+            return {'documents': count, 'matrix': matrix.tolist()}
+
+        firsts, seconds, scores = [], [], []
+        pair_count = 0
+        for start, block in blocks:
+            # Column j of the block is document start + j, so the upper
+            # triangle of the block is the upper triangle of the matrix
+            rows, columns = np.nonzero(np.triu(block >= threshold, 1))
+            pair_count += len(rows)
+            if pair_count > Config.SIMILARITY_MATRIX_MAX_PAIRS:
+                raise ValueError(
+                    f"More than {Config.SIMILARITY_MATRIX_MAX_PAIRS} pairs "
+                    f"score at least {threshold}; raise the threshold")
+            firsts.append(rows + start)
+            seconds.append(columns + start)
+            scores.append(block[rows, columns])
+
+        firsts = np.concatenate(firsts)
+        seconds = np.concatenate(seconds)
+        scores = np.concatenate(scores)
+        order = np.lexsort((seconds, firsts, -scores))
+        return {
+            'documents': count,
+            'threshold': threshold,
+            'pairs': [{'a': int(a), 'b': int(b), 'score': float(score)}
+                      for a, b, score in zip(firsts[order], seconds[order],
+                                             scores[order])]
+        }
+    except Exception as e:
+        logger.error(f"Error in similarity matrix: {str(e)}")
+        raise
+
+
+# Near-duplicate detection: MinHash signatures of word shingles, bucketed
+# by locality-sensitive hashing over bands of the signature. The hash
+# parameters are fixed so signatures saved in the corpus index stay valid.
+MINHASH_PERMUTATIONS = 128
+MINHASH_BANDS = 32
+MINHASH_SHINGLE_WORDS = 3
+# Shingles hashed per step, bounding the (permutations x shingles) array
+MINHASH_CHUNK = 4096
+
+_MINHASH_PRIME = np.uint64((1 << 31) - 1)
+# Signature value of a text without words; never bucketed
+MINHASH_EMPTY = np.uint32(_MINHASH_PRIME)
+_minhash_rng = np.random.default_rng(1_000_003)
+_MINHASH_A = _minhash_rng.integers(1, _MINHASH_PRIME, MINHASH_PERMUTATIONS,
+                                   dtype=np.uint64)[:, None]
+_MINHASH_B = _minhash_rng.integers(0, _MINHASH_PRIME, MINHASH_PERMUTATIONS,
+                                   dtype=np.uint64)[:, None]
+# Multipliers combining word hashes into a shingle hash and signature
+# rows into a band key
+_SHINGLE_MULTIPLIERS = _minhash_rng.integers(
+    1, 1 << 63, MINHASH_SHINGLE_WORDS, dtype=np.uint64)
+_BAND_MULTIPLIERS = _minhash_rng.integers(
+    1, 1 << 63, MINHASH_PERMUTATIONS // MINHASH_BANDS, dtype=np.uint64)
+
+_MINHASH_WORD = re.compile(r'\w+')
+
+
+def _shingle_hashes(text):
+    """
+    Hash the distinct word shingles of a text into [0, 2**31 - 1).
+
+    Words are hashed with CRC32, which unlike hash() is the same in every
+    process, and combined position by position into a shingle hash.
+    Texts shorter than a shingle form one shingle of all their words.
+
+    Returns:
+        numpy.ndarray: Distinct shingle hashes (uint64)
+    """
+    words = _MINHASH_WORD.findall(text.lower())
+    if not words:
+        return np.zeros(0, dtype=np.uint64)
+    crc = {word: zlib.crc32(word.encode('utf-8')) for word in set(words)}
+    hashes = np.fromiter((crc[word] for word in words), dtype=np.uint64,
+                         count=len(words))
+    size = min(MINHASH_SHINGLE_WORDS, len(words))
+    count = len(words) - size + 1
+    shingles = np.zeros(count, dtype=np.uint64)
+    for offset in range(size):
+        shingles += hashes[offset:offset + count] * _SHINGLE_MULTIPLIERS[offset]
+    return np.unique((shingles ^ (shingles >> np.uint64(31))) % _MINHASH_PRIME)
+
+
+def minhash_signature(text):
+    """
+    Compute the MinHash signature of a text's word shingles.
+
+    Each of the MINHASH_PERMUTATIONS hash functions (a * x + b) mod p is
+    applied to all shingles at once; the signature keeps the minimum of
+    each. The share of equal positions in two signatures estimates the
+    Jaccard similarity of the texts' shingle sets.
+
+    Args:
+        text (str): The text
+
+    Returns:
+        numpy.ndarray: The signature (uint32, MINHASH_PERMUTATIONS values)
+    """
+    signature = np.full(MINHASH_PERMUTATIONS, MINHASH_EMPTY, dtype=np.uint64)
+    shingles = _shingle_hashes(text)
+    for start in range(0, len(shingles), MINHASH_CHUNK):
+        chunk = shingles[start:start + MINHASH_CHUNK]
+        hashed = (_MINHASH_A * chunk + _MINHASH_B) % _MINHASH_PRIME
+        np.minimum(signature, hashed.min(axis=1), out=signature)
+    return signature.astype(np.uint32)
+
+
+def minhash_signatures(texts):
+    """
+    Compute the MinHash signatures of several texts.
+
+    Returns:
+        numpy.ndarray: One signature row per text
+    """
+    signatures = np.empty((len(texts), MINHASH_PERMUTATIONS), dtype=np.uint32)
+    for row, text in enumerate(texts):
+        signatures[row] = minhash_signature(text)
+    return signatures
+
+
+def minhash_band_keys(signatures):
+    """
+    Hash each band of each signature into one bucket key.
+
+    Texts without words have keys too, but are left out of the mask so
+    they are never bucketed.
+
+    Args:
+        signatures (numpy.ndarray): Signature rows
+
+    Returns:
+        tuple: (keys of shape (texts, MINHASH_BANDS), mask of texts with
+            words)
+    """
+    rows = MINHASH_PERMUTATIONS // MINHASH_BANDS
+    bands = signatures.astype(np.uint64).reshape(len(signatures),
+                                                 MINHASH_BANDS, rows)
+    keys = (bands * _BAND_MULTIPLIERS).sum(axis=2, dtype=np.uint64)
+    return keys, signatures[:, 0] != MINHASH_EMPTY
+
+
+def estimate_jaccard(signature, signatures):
+    """
+    Estimate the Jaccard similarity of one signature with others.
+
+    Returns:
+        numpy.ndarray: Share of equal signature positions per row
+    """
+    return (signatures == signature).mean(axis=-1)
+
+
+class MinHashLSH:
+    """
+    Banded LSH buckets over MinHash signatures.
+
+    Two texts become candidates when any band of their signatures is
+    equal, which with b bands of r rows happens with probability
+    1 - (1 - s**r)**b at Jaccard similarity s: candidates are found by
+    dictionary lookups, without comparing a query with every text.
+    """
+
+    def __init__(self):
+        self.buckets = [{} for _ in range(MINHASH_BANDS)]
+
+    def add(self, keys, mask, first_row=0):
+        """
+        Add texts' band keys to the buckets.
+
+        Args:
+            keys (numpy.ndarray): Band keys per text
+            mask (numpy.ndarray): Texts to add (those with words)
+            first_row (int): Row number of the first text
+        """
+        for offset in np.flatnonzero(mask):
+            row = first_row + int(offset)
+            for buckets, key in zip(self.buckets, keys[offset].tolist()):
+                buckets.setdefault(key, []).append(row)
+
+    def candidates(self, keys):
+        """
+        Get the rows sharing a bucket with a text.
+
+        Args:
+            keys (numpy.ndarray): The text's band keys
+
+        Returns:
+            list: Candidate rows, ascending
+        """
+        rows = set()
+        for buckets, key in zip(self.buckets, keys.tolist()):
+            rows.update(buckets.get(key, ()))
+        return sorted(rows)
+
+
+def perform_near_duplicate_detection(texts, threshold=None):
+    """
+    Group texts that are near-duplicates of each other.
+
+    Candidate pairs come from shared LSH buckets and are kept when their
+    estimated Jaccard similarity reaches the threshold; groups are the
+    connected components of the kept pairs.
+
+    Args:
+        texts (list): Texts to compare
+        threshold (float, optional): Minimum estimated Jaccard similarity
+            (defaults to Config.NEAR_DUPLICATE_THRESHOLD)
+
+    Returns:
+        dict: 'groups' of text positions, each with the lowest similarity
+            among the pairs that joined it, largest group first
+    """
+    try:
+        if threshold is None:
+            threshold = Config.NEAR_DUPLICATE_THRESHOLD
+        signatures = minhash_signatures(texts)
+        keys, mask = minhash_band_keys(signatures)
+        lsh = MinHashLSH()
+        parent = list(range(len(texts)))
+
+        def find(row):
+            while parent[row] != row:
+                parent[row] = parent[parent[row]]
+                row = parent[row]
+            return row
+
+        links = []
+        for row in np.flatnonzero(mask).tolist():
+            candidates = lsh.candidates(keys[row])
+            exact = False
+            if candidates:
+                similarity = estimate_jaccard(signatures[row],
+                                              signatures[candidates])
+                for other, score in zip(candidates, similarity.tolist()):
+                    if score >= threshold:
+                        links.append((other, row, score))
+                        parent[find(row)] = find(other)
+                        exact = exact or score == 1.0
+            # A copy of a bucketed text would land in the same buckets;
+            # leaving it out keeps buckets of repeated texts small
+            if not exact:
+                lsh.add(keys[row:row + 1], mask[row:row + 1], row)
+
+        groups = {}
+        for row in range(len(texts)):
+            groups.setdefault(find(row), []).append(row)
+        lowest = {}
+        for row, _, score in links:
+            root = find(row)
+            lowest[root] = min(lowest.get(root, 1.0), score)
+
+        result = [{'documents': members, 'similarity': lowest[root]}
+                  for root, members in groups.items() if len(members) > 1]
+        result.sort(key=lambda group: (-len(group['documents']),
+                                       group['documents'][0]))
+        return {'documents': len(texts), 'threshold': threshold,
+                'groups': result}
+    except Exception as e:
+        logger.error(f"Error in near-duplicate detection: {str(e)}")
+        raise
+
+
 # Task 10: Language Detection
+# Names of the languages langdetect reports; other codes are shown as
+# 'Unknown (<code>)'
+LANGUAGE_NAMES = MappingProxyType({
+    'en': 'English',
+    'es': 'Spanish',
+    'fr': 'French',
+    'de': 'German',
+    'it': 'Italian',
+    'pt': 'Portuguese',
+    'ru': 'Russian',
+    'ar': 'Arabic',
+    'zh-cn': 'Chinese (Simplified)',
+    'zh-tw': 'Chinese (Traditional)',
+    'ja': 'Japanese',
+    'ko': 'Korean',
+    'hi': 'Hindi',
+    'nl': 'Dutch',
+    'sv': 'Swedish',
+    'el': 'Greek',
+    'he': 'Hebrew',
+    'th': 'Thai',
+    'bn': 'Bengali',
+    'pa': 'Punjabi',
+    'gu': 'Gujarati',
+    'ta': 'Tamil',
+    'te': 'Telugu',
+    'kn': 'Kannada',
+    'ml': 'Malayalam'
+})
+
+# Scripts written by exactly one of langdetect's languages. Cyrillic,
+# Arabic, Devanagari and Han are each shared by several of them, so texts
+# in those scripts still go to the detector.
+_SCRIPT_LANGUAGES = tuple((code, re.compile(pattern)) for code, pattern in (
+    ('ko', '[\uac00-\ud7af\u1100-\u11ff\u3130-\u318f]'),
+    ('el', '[\u0370-\u03ff\u1f00-\u1fff]'),
+    ('he', '[\u0590-\u05ff]'),
+    ('th', '[\u0e00-\u0e7f]'),
+    ('bn', '[\u0980-\u09ff]'),
+    ('pa', '[\u0a00-\u0a7f]'),
+    ('gu', '[\u0a80-\u0aff]'),
+    ('ta', '[\u0b80-\u0bff]'),
+    ('te', '[\u0c00-\u0c7f]'),
+    ('kn', '[\u0c80-\u0cff]'),
+    ('ml', '[\u0d00-\u0d7f]')
+))
+# Japanese mixes kana with Han characters; kana mark it as not Chinese
+_KANA = re.compile('[\u3040-\u30ff]')
+_HAN = re.compile('[\u3400-\u4dbf\u4e00-\u9fff]')
+_LETTER = re.compile(r'[^\W\d_]')
+_ASCII_LETTER = re.compile('[A-Za-z]')
+# Share of a text's letters that must be in one script for the shortcut
+LANGUAGE_SCRIPT_SHARE = 0.9
+
+
+def get_language_detector_factory():
+    """Get the shared langdetect factory with its language profiles loaded."""
+    def load():
+        factory = DetectorFactory()
+        factory.load_profile(LANGDETECT_PROFILES)
+        return factory
+    return _get_resource('language_detector_factory', load)
+
+
+def _script_language(text):
+    """
+    Identify a text's language from its script, without the detector.
+
+    Returns:
+        str: The language code, 'unknown' for texts without letters, or
+            None when the detector is needed
+    """
+    # No shortcut for ASCII or short texts with letters: Latin script is
+    # shared by most of the supported languages, and plain ASCII ("Hola
+    # amigo", "Guten Tag") doesn't tell English from Spanish or German
+    if text.isascii():
+        return None if _ASCII_LETTER.search(text) else 'unknown'
+    letters = len(_LETTER.findall(text))
+    if not letters:
+        return 'unknown'
+    minimum = LANGUAGE_SCRIPT_SHARE * letters
+    kana = len(_KANA.findall(text))
+    if kana and kana + len(_HAN.findall(text)) >= minimum:
+        return 'ja'
+    for code, script in _SCRIPT_LANGUAGES:
+        if len(script.findall(text)) >= minimum:
+            return code
+    return None
+
+
+def _detect_language(text, factory):
+    """
+    Detect the language of a text with one run of the detector.
+
+    langdetect's detect() and detect_langs() each sample the text's
+    n-grams; the top language is simply the first of the probabilities,
+    so one run gives both.
+
+    Returns:
+        tuple: (result_dict, None)
+    """
+    code = _script_language(text)
+    if code is not None:
+        method = 'script'
+        probabilities = [] if code == 'unknown' else [
+            {'lang': code, 'prob': 1.0}]
+    else:
+        method = 'langdetect'
+        detector = factory.create()
+        detector.append(text)
+        probabilities = [{'lang': prob.lang, 'prob': prob.prob}
+                         for prob in detector.get_probabilities()]
+        code = probabilities[0]['lang'] if probabilities else 'unknown'
+
+    name = 'Unknown' if code == 'unknown' else LANGUAGE_NAMES.get(
+        code, f'Unknown ({code})')
+    return {
+        'language_code': code,
+        'language_name': name,
+        'probabilities': probabilities,
+        'method': method,
+        'text': text
+    }, None
+
+
 def perform_language_detection(text, library='langdetect'):
     """
     Detect the language of a text.
 
+    Texts without letters, or whose letters are almost all in a script
+    used by a single language (Korean, Greek, Thai, Japanese kana, ...),
+    are answered without running the detector; 'method' says which way
+    the result was found.
+
     Args:
         text (str): The text to analyze
         library (str): The library to use (only 'langdetect' supported currently)
@@ -621,48 +2618,549 @@ def perform_language_detection(text, library='langdetect'):
         dict: Dictionary with language detection results
     """
     try:
-        # Language detection using langdetect
-        language_code = detect(text)
-
-        # Get probability scores for different languages
-        language_probabilities = detect_langs(text)
-
-        # Language name mapping (limited set)
-        language_names = {
-            'en': 'English',
-            'es': 'Spanish',
-            'fr': 'French',
-            'de': 'German',
-            'it': 'Italian',
-            'pt': 'Portuguese',
-            'ru': 'Russian',
-            'ar': 'Arabic',
-            'zh-cn': 'Chinese (Simplified)',
-            'zh-tw': 'Chinese (Traditional)',
-            'ja': 'Japanese',
-            'ko': 'Korean',
-            'hi': 'Hindi',
-            'nl': 'Dutch',
-            'sv': 'Swedish'
+        return _detect_language(text, get_language_detector_factory())[0]
+    except Exception as e:
+        logger.error(f"Error in language detection: {str(e)}")
+        raise
+
+
+def _language_batch(items):
+    """
+    Detect the language of all batch items with one detector factory.
+
+    Returns:
+        list: (id, output) tuples
+    """
+    factory = get_language_detector_factory()
+    return [(item_id, _batch_item_output(_detect_language, text, factory))
+            for item_id, text, _ in items]
+
+
+# Multi-task analysis
+ANALYSIS_TASKS = ('tokenization', 'stopword_removal', 'lemmatization',
+                  'pos_tagging', 'ner', 'sentiment_analysis',
+                  'text_summarization', 'keyword_extraction',
+                  'text_similarity', 'language_detection')
+
+
+class _NltkIntermediates:
+    """Lazily computed NLTK intermediates shared by several tasks."""
+
+    def __init__(self, text):
+        self.text = text
+
+    @cached_property
+    def words(self):
+        return word_tokenize(self.text)
+
+    @cached_property
+    def sentences(self):
+        return sent_tokenize(self.text)
+
+    @cached_property
+    def lower_words(self):
+        return [word.lower() for word in self.words]
+
+    @cached_property
+    def pos_tags(self):
+        return get_pos_tagger().tag(self.words)
+
+    @cached_property
+    def stop_words(self):
+        return get_stopwords()
+
+
+def _analyze_with_nltk(task, shared):
+    """Derive a task result from shared NLTK intermediates."""
+    if task == 'tokenization':
+        return _tokenization_result(shared.words, shared.sentences), None
+    elif task == 'stopword_removal':
+        return _nltk_stopword_result(shared.lower_words,
+                                     shared.stop_words), None
+    elif task == 'lemmatization':
+        lemmatizer = get_lemmatizer()
+        return _lemmatization_result(
+            shared.words,
+            [lemmatizer.lemmatize(word) for word in shared.words]), None
+    elif task == 'pos_tagging':
+        return _pos_result(shared.pos_tags), None
+    elif task == 'ner':
+        # The same POS tags feed both POS grouping and NE chunking
+        return _ner_result(_nltk_entities(shared.pos_tags)), None
+    return None
+
+
+def _analyze_with_spacy(task, doc):
+    """Derive a task result from a single parsed spaCy Doc."""
+    if task == 'tokenization':
+        return _tokenization_result([token.text for token in doc],
+                                    _doc_sentences(doc)), None
+    elif task == 'stopword_removal':
+        return _spacy_stopword_result(doc), None
+    elif task == 'lemmatization':
+        return _lemmatization_result([token.text for token in doc],
+                                     [token.lemma_ for token in doc]), None
+    elif task == 'pos_tagging':
+        return _pos_result([(token.text, token.pos_) for token in doc]), None
+    elif task == 'ner':
+        return _ner_result(_spacy_entities(doc)), None
+    return None
+
+
+# Per-sentence results of incremental analysis, shared between requests so
+# that re-running a task on an edited text only processes changed sentences
+sentence_cache = LRUCache(max_entries=Config.SENTENCE_CACHE_MAX_ENTRIES,
+                          max_bytes=Config.SENTENCE_CACHE_MAX_BYTES,
+                          sizeof=lambda part: len(repr(part)))
+
+INCREMENTAL_TASKS = ('tokenization', 'lemmatization', 'pos_tagging', 'ner',
+                     'sentiment_analysis')
+
+SENTIMENT_SCORE_KEYS = ('neg', 'neu', 'pos', 'compound')
+
+
+def _stripped_sentence_spans(text):
+    """Get (start, end) offsets of the non-empty sentences, whitespace trimmed."""
+    spans = []
+    for start, end in _sentence_spans(text):
+        sentence = text[start:end]
+        stripped = sentence.strip()
+        if stripped:
+            start += len(sentence) - len(sentence.lstrip())
+            spans.append((start, start + len(stripped)))
+    return spans
+
+
+def _split_sentences(text):
+    """Split text into stripped, non-empty sentences."""
+    return [text[start:end] for start, end in _stripped_sentence_spans(text)]
+
+
+def _sentence_parts(task, sentences, library, engine='vader'):
+    """
+    Compute the per-sentence parts a task result is merged from.
+
+    Returns:
+        list: One part dictionary per sentence
+    """
+    if task == 'sentiment_analysis':
+        # Both libraries use VADER for sentiment
+        return [{'scores': scores, 'weight': len(sentence.split())}
+                for sentence, scores in zip(
+                    sentences, score_sentiments(sentences, engine))]
+
+    if library == 'nltk':
+        words = [word_tokenize(sentence) for sentence in sentences]
+        if task == 'tokenization':
+            return [{'words': sentence_words} for sentence_words in words]
+        if task == 'lemmatization':
+            lemmatizer = get_lemmatizer()
+            return [{'words': sentence_words,
+                     'lemmas': [lemmatizer.lemmatize(word)
+                                for word in sentence_words]}
+                    for sentence_words in words]
+        tagged = get_pos_tagger().tag_sents(words)
+        if task == 'pos_tagging':
+            return [{'pos_tags': pos_tags} for pos_tags in tagged]
+        return [{'entities': _nltk_entities(pos_tags)} for pos_tags in tagged]
+
+    if library != 'spacy':
+        raise ValueError(f"Unsupported library: {library}")
+    nlp = get_spacy_model()
+    components = _resolve_spacy_components(nlp, SPACY_TASK_COMPONENTS[task])
+    docs = nlp.pipe(sentences, disable=[name for name in nlp.pipe_names
+                                        if name not in components])
+    if task == 'tokenization':
+        return [{'words': [token.text for token in doc]} for doc in docs]
+    if task == 'lemmatization':
+        return [{'words': [token.text for token in doc],
+                 'lemmas': [token.lemma_ for token in doc]} for doc in docs]
+    if task == 'pos_tagging':
+        return [{'pos_tags': [(token.text, token.pos_) for token in doc]}
+                for doc in docs]
+    return [{'entities': _spacy_entities(doc)} for doc in docs]
+
+
+def _merge_sentence_parts(task, text, sentences, parts):
+    """
+    Build a document result from per-sentence parts.
+
+    Returns:
+        tuple: (result_dict, visualization_data)
+    """
+    if task == 'tokenization':
+        return _tokenization_result(
+            [word for part in parts for word in part['words']],
+            sentences), None
+    elif task == 'lemmatization':
+        return _lemmatization_result(
+            [word for part in parts for word in part['words']],
+            [lemma for part in parts for lemma in part['lemmas']]), None
+    elif task == 'pos_tagging':
+        return _pos_result(
+            [tag for part in parts for tag in part['pos_tags']]), None
+    elif task == 'ner':
+        return _ner_result(
+            [entity for part in parts for entity in part['entities']]), None
+
+    return _sentiment_result(_aggregate_sentiment(parts), text)
+
+
+def _aggregate_sentiment(parts):
+    """Average sentence VADER scores, weighting each by its word count."""
+    total_weight = sum(part['weight'] for part in parts) or 1
+    return {
+        key: round(sum(part['scores'][key] * part['weight']
+                       for part in parts) / total_weight, 4)
+        for key in SENTIMENT_SCORE_KEYS
+    }
+
+
+def _cached_sentence_parts(task, sentences, library, engine='vader'):
+    """
+    Get the per-sentence parts of a task, computing only uncached ones.
+
+    Returns:
+        tuple: (parts, number of sentences served from the cache)
+    """
+    if task == 'sentiment_analysis':
+        namespace = (task, engine, None)
+    elif library == 'spacy':
+        get_spacy_model()
+        namespace = (task, library, _spacy_fingerprint)
+    else:
+        namespace = (task, library, None)
+
+    keys = [namespace + (hash_text(sentence),) for sentence in sentences]
+    parts = [sentence_cache.get(key) for key in keys]
+
+    missing = [i for i, part in enumerate(parts) if part is None]
+    if missing:
+        computed = _sentence_parts(task, [sentences[i] for i in missing],
+                                   library, engine)
+        for i, part in zip(missing, computed):
+            parts[i] = part
+            sentence_cache.set(keys[i], part)
+    return parts, len(sentences) - len(missing)
+
+
+def sentiment_timeline(text, include_text=True, engine='vader'):
+    """
+    Score every sentence of a text and aggregate the document sentiment.
+
+    Sentences are scored once with the shared VADER analyzer (scores of
+    sentences seen before come from the sentence cache) and the document
+    scores are the word-weighted mean of the sentence scores, so the text
+    is not scored a second time as a whole.
+
+    Args:
+        text (str): The text to analyze
+        include_text (bool): Whether to echo the text and each sentence
+            back; sentences always carry their character offsets
+        engine (str): Sentiment engine ('vader' or 'vectorized')
+
+    Returns:
+        tuple: (result_dict, visualization_data) where the result has a
+            'timeline' entry per sentence and the visualization holds the
+            score distribution and the compound score series
+    """
+    spans = _stripped_sentence_spans(text)
+    sentences = [text[start:end] for start, end in spans]
+    parts, _ = _cached_sentence_parts('sentiment_analysis', sentences, 'nltk',
+                                      engine)
+
+    result, distribution = _sentiment_result(
+        _aggregate_sentiment(parts), text if include_text else None)
+
+    timeline = []
+    for index, ((start, end), part) in enumerate(zip(spans, parts)):
+        entry = {
+            'index': index,
+            'start': start,
+            'end': end,
+            'sentiment': _sentiment_label(part['scores']['compound']),
+            'scores': part['scores']
         }
+        if include_text:
+            entry['sentence'] = sentences[index]
+        timeline.append(entry)
+    result['timeline'] = timeline
+
+    return result, {
+        'distribution': distribution,
+        'timeline': [part['scores']['compound'] for part in parts]
+    }
 
-        language_name = language_names.get(language_code,
-                                           f'Unknown ({language_code})')
 
-        return {
-            'language_code':
-            language_code,
-            'language_name':
-            language_name,
-            'probabilities': [{
-                'lang': prob.lang,
-                'prob': prob.prob
-            } for prob in language_probabilities],
-            'text':
-            text
+def perform_incremental(task, text, library='nltk', engine='vader'):
+    """
+    Run a task sentence by sentence, reusing results of unchanged sentences.
+
+    Each sentence is hashed and its part of the result (tokens, lemmas, POS
+    tags, entities or VADER scores) is cached, so re-running a task on an
+    edited text only processes the sentences that changed. Groups and
+    counts are rebuilt from the merged parts. Because every sentence is
+    processed on its own, results can differ slightly from a single pass
+    where context crosses sentence boundaries; document sentiment is the
+    word-weighted mean of the sentence scores.
+
+    Args:
+        task (str): One of INCREMENTAL_TASKS
+        text (str): The text to process
+        library (str): The library to use ('nltk' or 'spacy')
+        engine (str): Sentiment engine ('vader' or 'vectorized')
+
+    Returns:
+        tuple: (result_dict, visualization_data); the result also reports
+            how many sentences were reused under 'incremental'
+    """
+    try:
+        if task not in INCREMENTAL_TASKS:
+            raise ValueError(f"Incremental mode is not supported for task: {task}")
+        if library not in ('nltk', 'spacy'):
+            raise ValueError(f"Unsupported library: {library}")
+
+        sentences = _split_sentences(text)
+        parts, reused = _cached_sentence_parts(task, sentences, library,
+                                               engine)
+
+        result, visual_data = _merge_sentence_parts(task, text, sentences,
+                                                    parts)
+        result['incremental'] = {
+            'sentences': len(sentences),
+            'reused': reused
         }
+        return result, visual_data
     except Exception as e:
-        logger.error(f"Error in language detection: {str(e)}")
+        logger.error(f"Error in incremental {task} with {library}: {str(e)}")
+        raise
+
+
+def perform_analysis(text, tasks, library='nltk', comparison_text=None,
+                     keyword_method='tfidf'):
+    """
+    Run several NLP tasks on one text, sharing intermediate results.
+
+    Tokens, sentences, POS tags and lowercased tokens (NLTK) or one parsed
+    Doc (spaCy) are computed once and every requested result is derived
+    from them. Tasks that do not use these intermediates run as usual;
+    keyword extraction runs perform_keyword_extraction so its keywords
+    match /api/process.
+
+    Args:
+        text (str): The text to analyze
+        tasks (list): The NLP tasks to perform
+        library (str): The library to use ('nltk' or 'spacy')
+        comparison_text (str, optional): Secondary text for text similarity
+        keyword_method (str): Keyword scoring method (see KEYWORD_METHODS)
+
+    Returns:
+        dict: {'result', 'visualization'} dictionaries keyed by task
+    """
+    try:
+        if library == 'nltk':
+            shared = _NltkIntermediates(text)
+            analyze = _analyze_with_nltk
+        elif library == 'spacy':
+            shared = get_spacy_doc(text, spacy_components_for(tasks))
+            analyze = _analyze_with_spacy
+        else:
+            raise ValueError(f"Unsupported library: {library}")
+
+        results = {}
+        for task in tasks:
+            output = analyze(task, shared)
+            if output is None:
+                if task == 'sentiment_analysis':
+                    output = perform_sentiment_analysis(text, library)
+                elif task == 'text_summarization':
+                    output = perform_text_summarization(text, library), None
+                elif task == 'keyword_extraction':
+                    output = perform_keyword_extraction(text, library,
+                                                        keyword_method)
+                elif task == 'text_similarity':
+                    output = perform_text_similarity(text, comparison_text,
+                                                     library)
+                elif task == 'language_detection':
+                    output = perform_language_detection(text), None
+                else:
+                    raise ValueError(f"Unsupported task: {task}")
+
+            result, visual_data = output
+            results[task] = {'result': result, 'visualization': visual_data}
+
+        return results
+    except Exception as e:
+        logger.error(f"Error in analysis with {library}: {str(e)}")
+        raise
+
+
+# Batch processing
+# Tasks whose spaCy results can be derived from a Doc produced by nlp.pipe
+SPACY_DOC_TASKS = ('tokenization', 'stopword_removal', 'lemmatization',
+                   'pos_tagging', 'ner')
+
+
+def _run_task(task, text, library, comparison_text=None):
+    """Run a single task and return its (result, visualization) pair."""
+    output = perform_analysis(text, [task], library, comparison_text)[task]
+    return output['result'], output['visualization']
+
+
+def _batch_item_output(func, *args):
+    """Run one batch item, turning an exception into an error entry."""
+    try:
+        result, visual_data = func(*args)
+        return {'success': True, 'result': result,
+                'visualization': visual_data}
+    except Exception as e:
+        logger.error(f"Error in batch item: {str(e)}")
+        return {'success': False, 'error': str(e)}
+
+
+def _nltk_batch_chunk(task, items):
+    """
+    Process a chunk of batch items with NLTK.
+
+    POS tagging and NER tag every item with one pos_tag_sents call (and
+    chunk with one ne_chunk_sents call) so the tagger and chunker models
+    are loaded once per chunk instead of once per item. If the batched
+    call fails, items are processed one by one so that a single bad item
+    only fails itself.
+
+    Args:
+        task (str): The NLP task to perform
+        items (list): (id, text, comparison_text) tuples
+
+    Returns:
+        list: (id, output) tuples
+    """
+    if task in ('pos_tagging', 'ner'):
+        try:
+            tagged = get_pos_tagger().tag_sents(
+                [word_tokenize(text) for _, text, _ in items])
+            if task == 'pos_tagging':
+                outputs = [(_pos_result(tags), None) for tags in tagged]
+            else:
+                outputs = [(_ner_result(_tree_entities(tree)), None)
+                           for tree in get_ne_chunker().parse_sents(tagged)]
+            return [(item_id, {'success': True, 'result': result,
+                               'visualization': visual_data})
+                    for (item_id, _, _), (result, visual_data)
+                    in zip(items, outputs)]
+        except Exception as e:
+            logger.warning(f"Batched {task} failed, processing items one by "
+                           f"one: {str(e)}")
+
+    return [(item_id, _batch_item_output(_run_task, task, text, 'nltk',
+                                         comparison_text))
+            for item_id, text, comparison_text in items]
+
+
+def _spacy_batch(task, items, batch_size, n_process):
+    """
+    Process batch items with spaCy, parsing all texts through nlp.pipe.
+
+    Returns:
+        list: (id, output) tuples
+    """
+    if task not in SPACY_DOC_TASKS:
+        return [(item_id, _batch_item_output(_run_task, task, text, 'spacy',
+                                             comparison_text))
+                for item_id, text, comparison_text in items]
+
+    try:
+        nlp = get_spacy_model()
+        components = _resolve_spacy_components(nlp,
+                                                SPACY_TASK_COMPONENTS[task])
+        docs = nlp.pipe((text for _, text, _ in items),
+                        batch_size=batch_size,
+                        n_process=n_process,
+                        disable=[name for name in nlp.pipe_names
+                                 if name not in components])
+        return [(item_id, _batch_item_output(_analyze_with_spacy, task, doc))
+                for (item_id, _, _), doc in zip(items, docs)]
+    except Exception as e:
+        logger.warning(f"nlp.pipe failed, processing items one by one: "
+                       f"{str(e)}")
+        return [(item_id, _batch_item_output(_run_task, task, text, 'spacy'))
+                for item_id, text, _ in items]
+
+
+def _sentiment_batch(items, engine):
+    """
+    Score all batch items with one call to the sentiment engine.
+
+    Returns:
+        list: (id, output) tuples
+    """
+    texts = [text for _, text, _ in items]
+    try:
+        all_scores = score_sentiments(texts, engine)
+    except Exception as e:
+        logger.warning(f"Batched sentiment scoring failed, scoring items "
+                       f"one by one: {str(e)}")
+        return [(item_id, _batch_item_output(perform_sentiment_analysis,
+                                             text, 'nltk', False, True,
+                                             engine))
+                for item_id, text, _ in items]
+
+    outputs = []
+    for (item_id, text, _), scores in zip(items, all_scores):
+        result, visual_data = _sentiment_result(scores, text)
+        outputs.append((item_id, {'success': True, 'result': result,
+                                  'visualization': visual_data}))
+    return outputs
+
+
+def perform_batch(task, items, library='nltk', batch_size=64, n_process=1,
+                  engine='vader'):
+    """
+    Run one NLP task over many texts.
+
+    spaCy parses all texts with nlp.pipe; NLTK processes chunks of
+    batch_size items, in a process pool when n_process is above 1. Errors
+    are reported per item and do not fail the whole batch. Language
+    detection needs neither library and runs all items on one detector
+    factory.
+
+    Args:
+        task (str): The NLP task to perform
+        items (list): (id, text, comparison_text) tuples
+        library (str): The library to use ('nltk' or 'spacy')
+        batch_size (int): Number of texts per batch/chunk
+        n_process (int): Number of worker processes
+        engine (str): Sentiment engine; with 'vectorized' all sentiment
+            items are scored in one array pass
+
+    Returns:
+        dict: Per-item outputs keyed by id, each with 'success' and either
+            'result'/'visualization' or 'error'
+    """
+    try:
+        if task == 'language_detection':
+            outputs = _language_batch(items)
+        elif task == 'sentiment_analysis' and engine != 'vader':
+            outputs = _sentiment_batch(items, engine)
+        elif library == 'spacy':
+            outputs = _spacy_batch(task, items, batch_size, n_process)
+        elif library == 'nltk':
+            chunks = [items[i:i + batch_size]
+                      for i in range(0, len(items), batch_size)]
+            if n_process > 1 and len(chunks) > 1:
+                with ProcessPoolExecutor(max_workers=n_process) as executor:
+                    chunk_outputs = list(executor.map(
+                        _nltk_batch_chunk, [task] * len(chunks), chunks))
+            else:
+                chunk_outputs = [_nltk_batch_chunk(task, chunk)
+                                 for chunk in chunks]
+            outputs = [output for chunk in chunk_outputs for output in chunk]
+        else:
+            raise ValueError(f"Unsupported library: {library}")
+
+        return dict(outputs)
+    except Exception as e:
+        logger.error(f"Error in batch {task} with {library}: {str(e)}")
         raise
 
 
@@ -1,39 +1,163 @@
+import argparse
 import nltk
 import os
 import logging
+import threading
+import time
+
+from config import Config
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
-def initialize_nltk():
-    """Initialize NLTK by downloading required resources"""
-    # Create NLTK data directory
-    nltk_data_dir = os.path.expanduser('~/nltk_data')
-    os.makedirs(nltk_data_dir, exist_ok=True)
-    
-    # Add the data directory to NLTK's search path
-    nltk.data.path.insert(0, nltk_data_dir)
-    
-    # Define resources to download
-    resources = [
-        'punkt',  # Important: use 'punkt' not 'punkt_tab'
-        'stopwords',
-        'wordnet',
-        'averaged_perceptron_tagger',
-        'maxent_ne_chunker',
-        'words',
-        'vader_lexicon',
-        'omw-1.4'
-    ]
-    
-    # Download each resource
-    for resource in resources:
+# NLTK resources used by nlp_utils, mapped to the path nltk.data.find
+# looks them up by (zipped resources are found under the same path)
+NLTK_RESOURCES = {
+    'punkt_tab': 'tokenizers/punkt_tab/english/',
+    'stopwords': 'corpora/stopwords',
+    'wordnet': 'corpora/wordnet',
+    'omw-1.4': 'corpora/omw-1.4',
+    'averaged_perceptron_tagger_eng': 'taggers/averaged_perceptron_tagger_eng/',
+    'maxent_ne_chunker_tab': 'chunkers/maxent_ne_chunker_tab/english_ace_multiclass/',
+    'words': 'corpora/words',
+    'vader_lexicon': 'sentiment/vader_lexicon.zip'
+}
+
+# Boot time per resource, filled in as resources are checked and loaded
+_boot_report = {}
+_boot_report_lock = threading.Lock()
+
+
+def record_boot_time(name, kind, status, seconds, path=None):
+    """
+    Record how long a resource took to check or load at startup.
+
+    Args:
+        name (str): Resource name
+        kind (str): Resource kind ('nltk', 'spacy', ...)
+        status (str): Outcome ('available', 'missing', 'loaded', ...)
+        seconds (float): Time spent
+        path (str, optional): Where the resource was found
+    """
+    with _boot_report_lock:
+        _boot_report[name] = {
+            'kind': kind,
+            'status': status,
+            'seconds': seconds,
+            'path': path
+        }
+
+
+def get_boot_report():
+    """
+    Get the boot time report for all recorded resources.
+
+    Returns:
+        dict: Per-resource status and timing, plus the total time
+    """
+    with _boot_report_lock:
+        resources = {name: dict(entry) for name, entry in _boot_report.items()}
+    return {
+        'resources': resources,
+        'total_seconds': sum(entry['seconds'] for entry in resources.values()),
+        'missing': sorted(name for name, entry in resources.items()
+                          if entry['status'] == 'missing')
+    }
+
+
+def configure_nltk_data_path():
+    """Put the offline NLTK data bundle (if configured) first on the path."""
+    bundle_path = Config.NLTK_DATA_PATH
+    if bundle_path and bundle_path not in nltk.data.path:
+        nltk.data.path.insert(0, bundle_path)
+
+
+def check_nltk_resources(resources=None):
+    """
+    Check which NLTK resources are available locally.
+
+    Only the local data path is searched; the network is never used.
+
+    Args:
+        resources (list, optional): Resource names (defaults to all)
+
+    Returns:
+        list: Names of the missing resources
+    """
+    missing = []
+    for name in resources or NLTK_RESOURCES:
+        start = time.perf_counter()
         try:
-            logger.info(f"Downloading NLTK resource: {resource}")
-            nltk.download(resource, download_dir=nltk_data_dir)
-            logger.info(f"Successfully downloaded: {resource}")
-        except Exception as e:
-            logger.error(f"Failed to download {resource}: {str(e)}")
-    
-    # Log NLTK data path
-    logger.info(f"NLTK data path: {nltk.data.path}")
\ No newline at end of file
+            path = str(nltk.data.find(NLTK_RESOURCES[name]))
+            status = 'available'
+        except LookupError:
+            path = None
+            status = 'missing'
+            missing.append(name)
+        record_boot_time(name, 'nltk', status, time.perf_counter() - start,
+                         path)
+    return missing
+
+
+def download_nltk_resources(download_dir, resources=None):
+    """
+    Download NLTK resources into a directory, e.g. to build the offline bundle.
+
+    Args:
+        download_dir (str): Directory to download into
+        resources (list, optional): Resource names (defaults to all)
+
+    Returns:
+        list: Names of the resources that failed to download
+    """
+    os.makedirs(download_dir, exist_ok=True)
+    failed = []
+    for resource in resources or NLTK_RESOURCES:
+        logger.info(f"Downloading NLTK resource: {resource}")
+        if not nltk.download(resource, download_dir=download_dir, quiet=True):
+            logger.error(f"Failed to download {resource}")
+            failed.append(resource)
+    return failed
+
+
+def initialize_nltk():
+    """
+    Initialize NLTK from local data without touching the network.
+
+    Missing resources are logged; they are only downloaded when
+    NLTK_AUTO_DOWNLOAD is enabled.
+
+    Returns:
+        list: Names of the resources that are still missing
+    """
+    configure_nltk_data_path()
+    missing = check_nltk_resources()
+
+    if missing and Config.NLTK_AUTO_DOWNLOAD:
+        download_dir = Config.NLTK_DATA_PATH or os.path.expanduser('~/nltk_data')
+        download_nltk_resources(download_dir, missing)
+        missing = check_nltk_resources(missing)
+
+    if missing:
+        logger.warning(
+            f"Missing NLTK resources: {', '.join(missing)}. Build the data "
+            f"bundle with 'python nltk_setup.py --download-dir <path>' and "
+            f"point NLTK_DATA_PATH at it.")
+
+    return missing
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description='Check NLTK resources or download them into a bundle')
+    parser.add_argument('--download-dir',
+                        help='download missing resources into this directory')
+    args = parser.parse_args()
+
+    if args.download_dir:
+        download_nltk_resources(args.download_dir)
+        Config.NLTK_DATA_PATH = args.download_dir
+
+    initialize_nltk()
+    for name, entry in sorted(get_boot_report()['resources'].items()):
+        print(f"{name:32} {entry['status']:10} {entry['seconds'] * 1000:8.2f} ms")
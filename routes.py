@@ -1,6 +1,7 @@
 import json
 from flask import (
-    render_template, request, jsonify, Blueprint, current_app
+    render_template, request, jsonify, Blueprint, current_app, Response,
+    stream_with_context
 )
 from flask_cors import CORS
 
@@ -10,15 +11,28 @@ CORS(routes)
 from config import Config
 from utils import (
     validate_text_input,
-    process_nlp_task,
+    process_nlp_task_cached,
+    process_nlp_tasks,
+    process_nlp_batch,
+    read_text_chunks,
+    stream_nlp_task,
+    index_documents,
+    search_similar_documents,
+    compute_similarity_matrix,
+    find_near_duplicates,
+    check_near_duplicates,
+    get_cache_stats,
     get_code_samples
 )
 from gemini_utils import (
     ask_gemini,
     explain_code_with_gemini,
-    compare_libraries_with_gemini
+    compare_libraries_with_gemini,
+    gemini_cache
 )
 from nlp_utils import get_task_explanation
+from nltk_setup import get_boot_report
+from benchmark import run_benchmark
 
 # Create blueprint
 routes = Blueprint('routes', __name__)
@@ -62,27 +76,251 @@ def process():
         text = data.get('text', '')
         library = data.get('library', Config.DEFAULT_LIBRARY)
         comparison_text = data.get('comparison_text', '')
+        options = data.get('options') or {}
+        if not isinstance(options, dict):
+            return jsonify({'error': 'Options must be an object'}), 400
 
         # Validate input
         error = validate_text_input(text, task, comparison_text)
         if error:
             return jsonify({'error': error}), 400
 
-        # Process the task
-        result, visualization_data = process_nlp_task(task, library, text, comparison_text)
+        # Process the task (repeated requests are served from the cache)
+        result, visualization_data, cache_hit = process_nlp_task_cached(
+            task, library, text, comparison_text, options)
 
         # Return result
-        return jsonify({
+        response = jsonify({
             'success': True,
             'result': result,
             'visualization': visualization_data
         })
+        response.headers['X-Cache'] = 'HIT' if cache_hit else 'MISS'
+        return response
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'An error occurred: {str(e)}'}), 500
+
+@routes.route('/api/process/batch', methods=['POST'])
+def process_batch():
+    """Process one NLP task over a batch of {id, text} items."""
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'Invalid request data'}), 400
+
+        task = data.get('task')
+        items = data.get('items', [])
+        library = data.get('library', Config.DEFAULT_LIBRARY)
+        try:
+            batch_size = int(data.get('batch_size') or 0) or None
+            n_process = int(data.get('n_process') or 1)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'batch_size and n_process must be '
+                                     'integers'}), 400
+
+        options = data.get('options') or {}
+        if not isinstance(options, dict):
+            return jsonify({'error': 'Options must be an object'}), 400
+
+        results = process_nlp_batch(task, library, items, batch_size,
+                                    n_process, options)
+        failed = sum(1 for output in results.values()
+                     if not output['success'])
+
+        return jsonify({
+            'success': True,
+            'results': results,
+            'processed': len(results) - failed,
+            'failed': failed
+        })
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'An error occurred: {str(e)}'}), 500
+
+@routes.route('/api/process/stream', methods=['POST'])
+def process_stream():
+    """Tokenize a plain-text body of any size, streaming NDJSON back."""
+    task = request.args.get('task', 'tokenization')
+    library = request.args.get('library', Config.DEFAULT_LIBRARY)
+    if task != 'tokenization':
+        return jsonify({'error': f'Streaming is not supported for task: {task}'}), 400
+
+    lines = stream_nlp_task(task, library, read_text_chunks(request.stream))
+    return Response(stream_with_context(lines),
+                    mimetype='application/x-ndjson',
+                    headers={'X-Accel-Buffering': 'no'})
+
+@routes.route('/api/similarity/index', methods=['POST'])
+def similarity_index():
+    """Add {id, text} reference documents to the similarity search index."""
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'Invalid request data'}), 400
+
+        count = index_documents(data.get('documents'))
+        return jsonify({
+            'success': True,
+            'added': len(data['documents']),
+            'documents': count
+        })
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'An error occurred: {str(e)}'}), 500
+
+@routes.route('/api/similarity/search', methods=['POST'])
+def similarity_search():
+    """Find the indexed documents most similar to a query text."""
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'Invalid request data'}), 400
+
+        results, count = search_similar_documents(
+            data.get('text', ''), int(data.get('top_k', 10)))
+        return jsonify({
+            'success': True,
+            'results': results,
+            'documents': count
+        })
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'An error occurred: {str(e)}'}), 500
+
+@routes.route('/api/similarity/matrix', methods=['POST'])
+def similarity_matrix():
+    """Compute the pairwise similarity matrix of {id, text} documents."""
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'Invalid request data'}), 400
+
+        threshold = data.get('threshold')
+        result = compute_similarity_matrix(
+            data.get('documents'),
+            None if threshold is None else float(threshold))
+        return jsonify({'success': True, **result})
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'An error occurred: {str(e)}'}), 500
+
+@routes.route('/api/similarity/near_duplicates', methods=['POST'])
+def near_duplicates():
+    """
+    Find near-duplicates: groups within 'documents', or the indexed
+    documents that nearly duplicate 'text'.
+    """
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'Invalid request data'}), 400
+
+        threshold = data.get('threshold')
+        threshold = None if threshold is None else float(threshold)
+        if 'documents' in data:
+            result = find_near_duplicates(data['documents'], threshold)
+            return jsonify({'success': True, **result})
+
+        results, count = check_near_duplicates(data.get('text', ''),
+                                               threshold)
+        return jsonify({
+            'success': True,
+            'results': results,
+            'documents': count
+        })
 
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': f'An error occurred: {str(e)}'}), 500
 
+@routes.route('/api/analyze', methods=['POST'])
+def analyze():
+    """Run several NLP tasks on one text, sharing tokenization and tagging."""
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'Invalid request data'}), 400
+
+        tasks = data.get('tasks', [])
+        text = data.get('text', '')
+        library = data.get('library', Config.DEFAULT_LIBRARY)
+        comparison_text = data.get('comparison_text', '')
+        options = data.get('options') or {}
+        if not isinstance(options, dict):
+            return jsonify({'error': 'Options must be an object'}), 400
+
+        results = process_nlp_tasks(tasks, library, text, comparison_text,
+                                    options)
+
+        return jsonify({
+            'success': True,
+            'results': results
+        })
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'An error occurred: {str(e)}'}), 500
+
+@routes.route('/api/benchmark', methods=['POST'])
+def benchmark():
+    """Benchmark an NLP task with both libraries on this server."""
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'Invalid request data'}), 400
+
+        task = data.get('task', 'tokenization')
+        text_size = data.get('text_size', 'medium')
+        try:
+            repetitions = int(data.get('repetitions', 5))
+            warmup = int(data.get('warmup', 1))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'repetitions and warmup must be '
+                                     'integers'}), 400
+
+        result = run_benchmark(task, text_size, repetitions, warmup)
+
+        return jsonify({
+            'success': True,
+            'benchmark': result
+        })
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'An error occurred: {str(e)}'}), 500
+
+@routes.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Get hit/miss/eviction statistics for the NLP and Gemini caches."""
+    stats = get_cache_stats()
+    stats['gemini_cache'] = gemini_cache.stats()
+    return jsonify({
+        'success': True,
+        'stats': stats
+    })
+
+@routes.route('/api/resources', methods=['GET'])
+def resources():
+    """Get the availability and boot time of NLP models and corpora."""
+    return jsonify({
+        'success': True,
+        'boot': get_boot_report()
+    })
+
 @routes.route('/api/sample-text', methods=['GET'])
 def get_sample_text():
     """Get sample text for the specified task."""
@@ -2,6 +2,11 @@
  * Main JavaScript for NLP Tools application
  */
 
+// Tasks whose results are merged from per-sentence parts on the server, so
+// that edits only reprocess the sentences that changed. Sentiment is left
+// out because its incremental score averages the sentence scores.
+const INCREMENTAL_TASKS = ['tokenization', 'lemmatization', 'pos_tagging', 'ner'];
+
 document.addEventListener('DOMContentLoaded', function() {
     // DOM Elements
     const taskSelect = document.getElementById('task-select');
@@ -126,7 +131,15 @@ document.addEventListener('DOMContentLoaded', function() {
                 task: task,
                 text: text,
                 library: library,
-                comparison_text: comparison
+                comparison_text: comparison,
+                // Re-runs on an edited text only reprocess changed sentences
+                options: {
+                    incremental: INCREMENTAL_TASKS.includes(task),
+                    // Per-sentence sentiment series for the chart; the text
+                    // is already on the page, so don't echo it back
+                    timeline: task === 'sentiment_analysis',
+                    include_text: task !== 'sentiment_analysis'
+                }
             })
         })
         .then(response => response.json())
@@ -276,6 +289,19 @@ document.addEventListener('DOMContentLoaded', function() {
                 sentence.textContent = item;
                 element.appendChild(sentence);
             });
+        } else if (element.classList.contains('sentence-score-display')) {
+            array.forEach(item => {
+                const sentence = document.createElement('div');
+                sentence.className = item.selected ? 'sentence selected' : 'sentence';
+                sentence.textContent = item.sentence;
+
+                const score = document.createElement('span');
+                score.className = 'sentence-score';
+                score.textContent = item.score.toFixed(2);
+
+                sentence.appendChild(score);
+                element.appendChild(sentence);
+            });
         } else if (element.classList.contains('pos-display')) {
             array.forEach(item => {
                 const posTag = document.createElement('div');
@@ -525,6 +551,14 @@ document.addEventListener('DOMContentLoaded', function() {
 
     // Create sentiment analysis chart
     function createSentimentChart(data, ctx) {
+        // With a sentiment timeline, plot the compound score per sentence
+        if (data.timeline && data.timeline.length > 1) {
+            return createSentimentTimelineChart(data.timeline, ctx);
+        }
+        if (data.distribution) {
+            data = data.distribution;
+        }
+
         return new Chart(ctx, {
             type: 'bar',
             data: {
@@ -570,6 +604,45 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
+    // Create per-sentence sentiment chart
+    function createSentimentTimelineChart(timeline, ctx) {
+        return new Chart(ctx, {
+            type: 'line',
+            data: {
+                labels: timeline.map((_, index) => 'S' + (index + 1)),
+                datasets: [{
+                    label: 'Compound Score',
+                    data: timeline,
+                    borderColor: 'rgba(13, 110, 253, 1)',
+                    backgroundColor: 'rgba(13, 110, 253, 0.2)',
+                    pointBackgroundColor: timeline.map(value =>
+                        value >= 0.05 ? 'rgba(40, 167, 69, 1)' :
+                        value <= -0.05 ? 'rgba(220, 53, 69, 1)' :
+                        'rgba(108, 117, 125, 1)'),
+                    fill: true,
+                    tension: 0.3
+                }]
+            },
+            options: {
+                scales: {
+                    y: {
+                        min: -1,
+                        max: 1
+                    }
+                },
+                plugins: {
+                    title: {
+                        display: true,
+                        text: 'Sentiment by Sentence',
+                        font: {
+                            size: 16
+                        }
+                    }
+                }
+            }
+        });
+    }
+
     // Create keyword extraction chart
     function createKeywordChart(data, ctx) {
         // Sort data by value in descending order
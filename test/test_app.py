@@ -1,12 +1,19 @@
+import os
+import shutil
+import tempfile
 import unittest
 import json
 from app import app
 from unittest.mock import patch
+from utils import result_cache
+from benchmark import run_benchmark
+from nlp_utils import doc_cache
 
 class TestNLPApp(unittest.TestCase):
     def setUp(self):
         app.config['TESTING'] = True
         self.client = app.test_client()
+        result_cache.clear()
         
     def test_index_route(self):
         """Test the index route returns successful response"""
@@ -84,6 +91,216 @@ class TestNLPApp(unittest.TestCase):
         self.assertTrue(data['success'])
         self.assertEqual(data['result']['word_count'], 2)
         
+    @patch('nlp_utils.word_tokenize',
+           side_effect=lambda text: text.replace('.', ' .').split())
+    def test_analyze_keywords_match_process(self, mock_tokenize):
+        """Test /api/analyze and /api/process give the same keywords"""
+        text = ("Linear constraints matter. Systems of linear constraints "
+                "need compatibility checks. Linear systems scale.")
+        for library in ('nltk', 'spacy'):
+            for method in ('tfidf', 'rake'):
+                request_data = {'text': text, 'library': library,
+                                'options': {'method': method}}
+                analyzed = self.client.post('/api/analyze', json={
+                    'tasks': ['tokenization', 'keyword_extraction'],
+                    **request_data}).get_json()
+                processed = self.client.post('/api/process', json={
+                    'task': 'keyword_extraction', **request_data}).get_json()
+                self.assertEqual(
+                    analyzed['results']['keyword_extraction']['result'],
+                    processed['result'])
+
+    @patch('utils.perform_analysis')
+    def test_analyze_multiple_tasks(self, mock_perform_analysis):
+        """Test the analyze endpoint runs several tasks in one call"""
+        mock_perform_analysis.return_value = {
+            'tokenization': {'result': {'word_count': 2}, 'visualization': None},
+            'pos_tagging': {'result': {'pos_tags': []}, 'visualization': None}
+        }
+
+        response = self.client.post('/api/analyze',
+                                   json={
+                                       'tasks': ['tokenization', 'pos_tagging',
+                                                 'tokenization'],
+                                       'library': 'nltk',
+                                       'text': 'hello world'
+                                   },
+                                   content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertTrue(data['success'])
+        self.assertEqual(data['results']['tokenization']['result']['word_count'], 2)
+        mock_perform_analysis.assert_called_once_with(
+            'hello world', ['tokenization', 'pos_tagging'], 'nltk', '',
+            keyword_method='tfidf')
+
+        # Test unsupported task
+        response = self.client.post('/api/analyze',
+                                   json={
+                                       'tasks': ['tokenization', 'translation'],
+                                       'text': 'hello world'
+                                   },
+                                   content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        data = json.loads(response.data)
+        self.assertIn('translation', data['error'])
+
+    @patch('utils.perform_batch')
+    def test_process_batch(self, mock_perform_batch):
+        """Test the batch endpoint reports per-item errors without failing"""
+        mock_perform_batch.return_value = {
+            '1': {'success': True, 'result': {'word_count': 2},
+                  'visualization': None}
+        }
+
+        response = self.client.post('/api/process/batch',
+                                   json={
+                                       'task': 'tokenization',
+                                       'library': 'nltk',
+                                       'items': [
+                                           {'id': 1, 'text': 'hello world'},
+                                           {'id': 2, 'text': 'hi'},
+                                           {'id': 3, 'text': 123}
+                                       ]
+                                   },
+                                   content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual(data['processed'], 1)
+        self.assertEqual(data['failed'], 2)
+        self.assertTrue(data['results']['1']['success'])
+        self.assertIn('3 characters', data['results']['2']['error'])
+        self.assertIn('string', data['results']['3']['error'])
+
+        # Only the valid item is sent for processing
+        items = mock_perform_batch.call_args[0][1]
+        self.assertEqual(items, [('1', 'hello world', '')])
+
+    def test_process_batch_invalid_n_process(self):
+        """Test a non-numeric n_process is rejected with a 400"""
+        response = self.client.post('/api/process/batch', json={
+            'task': 'tokenization',
+            'items': [{'id': 1, 'text': 'hello world'}],
+            'n_process': 'many'
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('n_process', response.get_json()['error'])
+
+    def test_process_stream(self):
+        """Test the streaming endpoint emits one NDJSON line per sentence"""
+        text = 'The first sentence. The second one! ' * 100
+        response = self.client.post('/api/process/stream?library=spacy',
+                                    data=text.encode('utf-8'),
+                                    content_type='text/plain')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+
+        lines = [json.loads(line) for line in response.data.splitlines()]
+        self.assertEqual(len(lines), 201)
+        self.assertEqual(lines[0], {'sentence': 'The first sentence.',
+                                    'tokens': ['The', 'first', 'sentence',
+                                               '.']})
+        self.assertEqual(lines[-1]['summary']['sentence_count'], 200)
+
+    def test_similarity_search(self):
+        """Test documents can be indexed and searched"""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        with patch('corpus_index.Config.CORPUS_INDEX_PATH',
+                   os.path.join(directory, 'index.npz')):
+            response = self.client.post('/api/similarity/index', json={
+                'documents': [
+                    {'id': 'a', 'text': 'Cats chase mice all day long.'},
+                    {'id': 'b', 'text': 'Rockets carry satellites to orbit.'}
+                ]
+            })
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.get_json()['documents'], 2)
+
+            response = self.client.post('/api/similarity/search', json={
+                'text': 'Which cats chase mice?', 'top_k': 1
+            })
+            data = response.get_json()
+            self.assertEqual(data['documents'], 2)
+            self.assertEqual([result['id'] for result in data['results']],
+                             ['a'])
+
+            response = self.client.post('/api/similarity/index', json={
+                'documents': [{'id': 'a', 'text': 'Again'}]
+            })
+            self.assertEqual(response.status_code, 400)
+
+    def test_similarity_matrix(self):
+        """Test the similarity matrix, full and thresholded"""
+        documents = [
+            {'id': 'a', 'text': 'Cats chase mice all day long.'},
+            {'id': 'b', 'text': 'Rockets carry satellites to orbit.'},
+            {'id': 'c', 'text': 'Mice hide when cats chase them.'}
+        ]
+        response = self.client.post('/api/similarity/matrix',
+                                    json={'documents': documents})
+        data = response.get_json()
+        self.assertEqual(data['ids'], ['a', 'b', 'c'])
+        matrix = data['matrix']
+        self.assertEqual([row[i] for i, row in enumerate(matrix)], [1.0] * 3)
+        self.assertEqual(matrix[0][1], 0.0)
+        self.assertEqual(matrix[0][2], matrix[2][0])
+        self.assertGreater(matrix[0][2], 0.3)
+
+        response = self.client.post('/api/similarity/matrix', json={
+            'documents': documents, 'threshold': 0.3
+        })
+        pairs = response.get_json()['pairs']
+        self.assertEqual(pairs, [{'a': 0, 'b': 2, 'score': matrix[0][2]}])
+
+        with patch('utils.Config.SIMILARITY_MATRIX_MAX_DENSE', 2):
+            response = self.client.post('/api/similarity/matrix',
+                                        json={'documents': documents})
+            self.assertEqual(response.status_code, 400)
+
+    @patch('utils.perform_incremental')
+    def test_incremental_requests_bypass_result_cache(self,
+                                                      mock_incremental):
+        """Test incremental results, with per-call reuse counts, aren't cached"""
+        mock_incremental.side_effect = [
+            ({'incremental': {'reused': 0}}, None),
+            ({'incremental': {'reused': 2}}, None)
+        ]
+        request_data = {
+            'task': 'tokenization',
+            'text': 'One sentence. Another sentence.',
+            'options': {'incremental': True}
+        }
+        for reused in (0, 2):
+            response = self.client.post('/api/process', json=request_data)
+            self.assertEqual(response.headers['X-Cache'], 'MISS')
+            self.assertEqual(
+                response.get_json()['result']['incremental']['reused'],
+                reused)
+        self.assertEqual(mock_incremental.call_count, 2)
+
+    @patch('utils.perform_tokenization')
+    def test_process_result_cache(self, mock_perform_tokenization):
+        """Test repeated process requests are served from the result cache"""
+        mock_perform_tokenization.return_value = {'word_count': 2}
+        request_data = {
+            'task': 'tokenization',
+            'library': 'nltk',
+            'text': 'hello cached world'
+        }
+
+        response = self.client.post('/api/process', json=request_data)
+        self.assertEqual(response.headers['X-Cache'], 'MISS')
+        response = self.client.post('/api/process', json=request_data)
+        self.assertEqual(response.headers['X-Cache'], 'HIT')
+        self.assertEqual(json.loads(response.data)['result']['word_count'], 2)
+        mock_perform_tokenization.assert_called_once()
+
+        # A different library is a different cache entry
+        request_data['library'] = 'spacy'
+        response = self.client.post('/api/process', json=request_data)
+        self.assertEqual(response.headers['X-Cache'], 'MISS')
+
     def test_process_validation_error(self):
         """Test validation errors in process endpoint"""
         # Test empty text
@@ -125,6 +342,19 @@ class TestNLPApp(unittest.TestCase):
         data = json.loads(response.data)
         self.assertIn('error', data)
         self.assertIn('comparison text', data['error'].lower())
+
+        # Test summarization input over the upper bound
+        with patch('utils.Config.SUMMARY_MAX_CHARS', 300):
+            response = self.client.post('/api/process',
+                                       json={
+                                           'task': 'text_summarization',
+                                           'library': 'nltk',
+                                           'text': 'Long sentence here. ' * 20
+                                       },
+                                       content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        data = json.loads(response.data)
+        self.assertIn('at most 300', data['error'])
         
     @patch('gemini_utils.ask_gemini')
     def test_chat_endpoint(self, mock_ask_gemini):
@@ -154,6 +384,60 @@ class TestNLPApp(unittest.TestCase):
         self.assertIn('error', data)
         self.assertIn('empty', data['error'].lower())
         
+    @patch.dict('benchmark.BENCHMARK_TASKS',
+                {'tokenization': lambda text, library: text.split()})
+    def test_benchmark_endpoint(self):
+        """Test the benchmark endpoint returns timings for both libraries"""
+        response = self.client.post('/api/benchmark',
+                                   json={
+                                       'task': 'tokenization',
+                                       'text_size': 'small',
+                                       'repetitions': 3,
+                                       'warmup': 1
+                                   },
+                                   content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertTrue(data['success'])
+        for library in ('nltk', 'spacy'):
+            stats = data['benchmark']['results'][library]
+            self.assertEqual(stats['repetitions'], 3)
+            self.assertLessEqual(stats['median_ms'], stats['p95_ms'])
+            self.assertIn('peak_memory_mb', stats)
+
+        # Test non-integer run counts
+        for repetitions in (None, [3], {'n': 3}):
+            response = self.client.post('/api/benchmark', json={
+                'task': 'tokenization', 'repetitions': repetitions
+            })
+            self.assertEqual(response.status_code, 400)
+
+        # Test invalid text size
+        response = self.client.post('/api/benchmark',
+                                   json={
+                                       'task': 'tokenization',
+                                       'text_size': 'huge'
+                                   },
+                                   content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_benchmark_parses_every_run(self):
+        """Test spaCy benchmark runs parse instead of hitting the Doc cache"""
+        misses = doc_cache.stats()['misses']
+        run_benchmark('tokenization', 'small', repetitions=3, warmup=1,
+                      libraries=('spacy',))
+        # One warm-up, three timed runs and one traced run
+        self.assertEqual(doc_cache.stats()['misses'] - misses, 5)
+
+    def test_cache_stats_endpoint(self):
+        """Test the cache stats endpoint reports the spaCy Doc cache"""
+        response = self.client.get('/api/cache/stats')
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertTrue(data['success'])
+        for counter in ('hits', 'misses', 'evictions', 'bytes'):
+            self.assertIn(counter, data['stats']['doc_cache'])
+
     def test_error_pages(self):
         """Test error pages are handled correctly"""
         # Test 404 error
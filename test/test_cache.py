@@ -0,0 +1,168 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+from cache import LRUCache, SQLiteCache, TieredCache, hash_text
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_evicts_least_recently_used_entry(self):
+        """Test the oldest entry is evicted when the entry bound is hit"""
+        cache = LRUCache(max_entries=2, max_bytes=1000)
+        cache.set('a', 1, size=1)
+        cache.set('b', 2, size=1)
+        self.assertEqual(cache.get('a'), 1)
+        cache.set('c', 3, size=1)
+
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_byte_bound(self):
+        """Test entries are evicted to stay within the byte bound"""
+        cache = LRUCache(max_entries=10, max_bytes=100)
+        cache.set('a', 'x', size=60)
+        cache.set('b', 'y', size=60)
+        self.assertNotIn('a', cache)
+        self.assertEqual(cache.stats()['bytes'], 60)
+
+        # Values larger than the whole cache are not stored
+        cache.set('c', 'z', size=500)
+        self.assertNotIn('c', cache)
+
+    def test_hit_and_miss_counters(self):
+        """Test hit and miss counters"""
+        cache = LRUCache()
+        key = hash_text('hello world')
+        self.assertIsNone(cache.get(key))
+        cache.set(key, 'parsed')
+        self.assertEqual(cache.get(key), 'parsed')
+
+        stats = cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+
+    @patch('cache.time.monotonic')
+    def test_entries_expire_after_ttl(self, mock_monotonic):
+        """Test entries are dropped once their TTL has passed"""
+        mock_monotonic.return_value = 100.0
+        cache = LRUCache(ttl=10)
+        cache.set('a', 1, size=1)
+
+        mock_monotonic.return_value = 105.0
+        self.assertEqual(cache.get('a'), 1)
+
+        mock_monotonic.return_value = 111.0
+        self.assertIsNone(cache.get('a'))
+        stats = cache.stats()
+        self.assertEqual(stats['expirations'], 1)
+        self.assertEqual(stats['bytes'], 0)
+
+
+class TestSQLiteCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'cache.sqlite3')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def make_cache(self, namespace='results', **kwargs):
+        kwargs.setdefault('maintenance_interval', 0)
+        return SQLiteCache(self.path, namespace, **kwargs)
+
+    def test_values_round_trip_between_instances(self):
+        """Test entries written by one instance are read by another"""
+        value = ({'tokens': ['a'] * 1000}, {'type': 'token_list'})
+        self.make_cache().set(('tokenization', 'nltk', 'abc'), value)
+
+        other = self.make_cache()
+        self.assertEqual(other.get(('tokenization', 'nltk', 'abc')), value)
+        self.assertIsNone(self.make_cache('gemini').get(
+            ('tokenization', 'nltk', 'abc')))
+
+    @patch('cache.time.time')
+    def test_expired_entries_are_purged(self, mock_time):
+        """Test entries expire after the TTL and are purged"""
+        mock_time.return_value = 1000.0
+        cache = self.make_cache(ttl=10)
+        cache.set('a', 1)
+        mock_time.return_value = 1011.0
+
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.purge_expired(), 1)
+        self.assertEqual(cache.stats()['entries'], 0)
+
+    @patch('cache.time.time')
+    def test_compaction_evicts_least_recently_used(self, mock_time):
+        """Test compaction drops the oldest entries until under max_bytes"""
+        cache = self.make_cache(max_bytes=250)
+        for i, key in enumerate(['a', 'b', 'c']):
+            mock_time.return_value = 1000.0 + i * 100
+            cache.set(key, 'x' * 50)
+        mock_time.return_value = 1400.0
+        self.assertIsNotNone(cache.get('a'))
+
+        cache.max_bytes = cache.stats()['bytes'] - 1
+        self.assertEqual(cache.compact(), 1)
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+
+    def test_pop_is_not_a_lookup(self):
+        """Test removing entries leaves the hit and miss counters alone"""
+        cache = self.make_cache()
+        cache.set('a', 1)
+        self.assertEqual(cache.pop('a'), 1)
+        self.assertIsNone(cache.pop('a'))
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['entries']),
+                         (0, 0, 0))
+
+
+class TestTieredCache(unittest.TestCase):
+    def test_l2_hits_are_promoted_to_l1(self):
+        """Test values found only in the shared cache are copied into L1"""
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        shared = SQLiteCache(os.path.join(tmpdir, 'cache.sqlite3'),
+                             'results', maintenance_interval=0)
+        shared.set('a', [1, 2, 3])
+
+        cache = TieredCache(LRUCache(), shared)
+        self.assertEqual(cache.get('a'), [1, 2, 3])
+        self.assertIn('a', cache.l1)
+        self.assertEqual(cache.stats()['l2']['hits'], 1)
+
+    @patch('cache.time.monotonic')
+    @patch('cache.time.time')
+    def test_promoted_entries_keep_l2_expiry(self, mock_time, mock_monotonic):
+        """Test an L2 hit promoted to L1 expires when its L2 entry does"""
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        shared = SQLiteCache(os.path.join(tmpdir, 'cache.sqlite3'),
+                             'results', ttl=10, maintenance_interval=0)
+        mock_time.return_value = 1000.0
+        shared.set('a', 1)
+
+        cache = TieredCache(LRUCache(ttl=10), shared)
+        mock_time.return_value = 1008.0
+        mock_monotonic.return_value = 500.0
+        self.assertEqual(cache.get('a'), 1)
+        mock_monotonic.return_value = 502.5
+        self.assertIsNone(cache.l1.get('a'))
+
+    def test_pop_survives_shared_cache_errors(self):
+        """Test an unavailable shared cache does not fail removals"""
+        cache = TieredCache(LRUCache(), SQLiteCache(
+            '/nonexistent', 'results', maintenance_interval=0))
+        cache.l1.set('a', 1)
+        with patch.object(cache.l2, 'pop',
+                          side_effect=sqlite3.OperationalError('locked')):
+            self.assertEqual(cache.pop('a'), 1)
+        self.assertNotIn('a', cache.l1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from corpus_index import (
+    CorpusIndex,
+    add_to_corpus_index,
+    get_corpus_index
+)
+
+
+class TestCorpusIndex(unittest.TestCase):
+    documents = [
+        ('cats', 'Cats chase mice and cats sleep all day.'),
+        ('dogs', 'Dogs chase cats and bark at the mail carrier.'),
+        ('space', 'Rockets carry satellites into orbit around the earth.'),
+        ('pets', 'Cats and dogs are the most popular pets.')
+    ]
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_matches_tfidf_vectorizer(self):
+        """Test incremental adds score like a vectorizer fit on the corpus"""
+        index = CorpusIndex()
+        index.add(self.documents[:2])
+        index.search('cats')
+        index.add(self.documents[2:])
+
+        query = 'Do cats chase dogs?'
+        results = index.search(query, top_k=3)
+
+        vectorizer = TfidfVectorizer(stop_words='english')
+        matrix = vectorizer.fit_transform(text for _, text in self.documents)
+        expected = (matrix @ vectorizer.transform([query]).T).toarray().ravel()
+        order = np.argsort(-expected, kind='stable')[:3]
+        self.assertEqual([result['id'] for result in results],
+                         [self.documents[i][0] for i in order])
+        for result, i in zip(results, order):
+            self.assertAlmostEqual(result['score'], expected[i])
+
+    def test_save_and_load(self):
+        """Test a saved index answers searches like the original"""
+        index = CorpusIndex()
+        index.add(self.documents)
+        path = os.path.join(self.directory, 'index.npz')
+        index.save(path)
+
+        loaded = CorpusIndex.load(path)
+        self.assertEqual(loaded.search('popular pets'),
+                         index.search('popular pets'))
+        loaded.add([('birds', 'Birds are popular pets too.')])
+        self.assertEqual(loaded.search('birds')[0]['id'], 'birds')
+
+    def test_rejects_duplicate_ids(self):
+        """Test an id can only be indexed once"""
+        index = CorpusIndex()
+        index.add(self.documents[:1])
+        with self.assertRaises(ValueError):
+            index.add([('new', 'text'), self.documents[0]])
+        self.assertEqual(len(index), 1)
+
+    def test_unknown_query_terms(self):
+        """Test a query sharing no terms with the corpus finds nothing"""
+        index = CorpusIndex()
+        index.add(self.documents)
+        self.assertEqual(index.search('zebra xylophone'), [])
+
+    def test_failed_save_is_not_kept(self):
+        """Test documents whose save failed are dropped from memory"""
+        path = os.path.join(self.directory, 'index.npz')
+        with patch('corpus_index.Config.CORPUS_INDEX_PATH', path):
+            add_to_corpus_index(self.documents[:1])
+            with patch.object(CorpusIndex, 'save', side_effect=OSError):
+                with self.assertRaises(OSError):
+                    add_to_corpus_index(self.documents[1:2])
+            self.assertEqual(add_to_corpus_index(self.documents[1:2]), 2)
+            self.assertEqual(len(get_corpus_index()), 2)
+
+    def test_near_duplicates(self):
+        """Test near-duplicate checks before and after saving"""
+        text = ('The committee approved the budget for the new library '
+                'after a long debate about parking and opening hours.')
+        index = CorpusIndex()
+        index.add(self.documents + [('budget', text)])
+        near = text.replace('long', 'lengthy')
+        results = index.near_duplicates(near, 0.5)
+        self.assertEqual([result['id'] for result in results], ['budget'])
+        self.assertGreater(results[0]['similarity'], 0.5)
+        self.assertEqual(index.near_duplicates(text, 1.0)[0]['id'], 'budget')
+        self.assertEqual(index.near_duplicates('Orbit rockets', 0.5), [])
+
+        # Documents added after the buckets were built are found too
+        index.add([('copy', near)])
+        path = os.path.join(self.directory, 'index.npz')
+        index.save(path)
+        loaded = CorpusIndex.load(path)
+        self.assertEqual(
+            [result['id'] for result in loaded.near_duplicates(near, 1.0)],
+            ['copy'])
+        self.assertEqual(
+            [result['id'] for result in index.near_duplicates(near, 0.5)],
+            ['copy', 'budget'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import math
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+from idf_table import IDFTable, build_idf_table
+from nlp_utils import perform_keyword_extraction
+
+
+class TestIDFTable(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.documents = [['The', 'cat', 'sat'], ['the', 'dog', 'sat'],
+                          ['the', 'cat', 'ran'], ['a', 'bird', '42']]
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_build_and_load(self):
+        """Test the table round trips through its memory-mapped files"""
+        build_idf_table(self.documents, self.directory, min_df=2)
+        table = IDFTable.load(self.directory)
+
+        self.assertIsInstance(table.values, np.memmap)
+        self.assertEqual(sorted(table.index), ['cat', 'sat', 'the'])
+        self.assertAlmostEqual(table.idf('the'), math.log(5 / 4) + 1,
+                               places=6)
+        self.assertAlmostEqual(table.idf('cat'), math.log(5 / 3) + 1,
+                               places=6)
+        # Terms below min_df share the IDF of an unseen term
+        self.assertEqual(table.idf('dog'), math.log(5) + 1)
+
+    def test_empty_table_is_neutral(self):
+        """Test an empty table leaves frequency scores unchanged"""
+        self.assertEqual(IDFTable.empty().idf('anything'), 1.0)
+
+    @patch('nlp_utils.get_stopwords', return_value=frozenset())
+    @patch('nlp_utils.get_idf_table')
+    def test_keywords_weighted_by_idf(self, mock_table, mock_stopwords):
+        """Test common background words rank below rarer ones"""
+        build_idf_table(self.documents * 5 + [['the', 'zebra']],
+                        self.directory, min_df=1)
+        mock_table.return_value = IDFTable.load(self.directory)
+
+        result, _ = perform_keyword_extraction('the the zebra')
+        self.assertEqual(list(result['keywords']), ['zebra', 'the'])
+
+
+if __name__ == '__main__':
+    unittest.main()
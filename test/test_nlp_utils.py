@@ -0,0 +1,411 @@
+import unittest
+from unittest.mock import patch
+from nltk.sentiment.vader import SentimentIntensityAnalyzer, VaderConstants
+from config import Config
+from nlp_utils import (
+    VectorizedSentimentAnalyzer,
+    _split_for_spacy,
+    _parse_spacy,
+    _doc_sentences,
+    get_spacy_model,
+    perform_incremental,
+    perform_sentiment_analysis,
+    perform_text_summarization,
+    perform_keyword_extraction,
+    perform_hierarchical_summarization,
+    perform_text_similarity,
+    perform_similarity_matrix,
+    perform_near_duplicate_detection,
+    perform_language_detection,
+    perform_batch,
+    get_language_detector_factory,
+    minhash_signature,
+    estimate_jaccard,
+    sentence_cache,
+    vector_cache
+)
+
+
+class TestChunkedSpacy(unittest.TestCase):
+    text = ("First paragraph here. It has two sentences.\n\n"
+            "Second paragraph! With a question? And an end. ") * 50
+
+    def test_split_preserves_text(self):
+        """Test chunks stay within the limit and join back to the text"""
+        chunks = _split_for_spacy(self.text, 500)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(''.join(chunks), self.text)
+        self.assertTrue(all(len(chunk) <= 500 for chunk in chunks))
+        # Paragraph breaks are preferred over sentence ends
+        self.assertTrue(all(chunk.endswith('\n\n') for chunk in chunks[:-1]))
+
+    def test_sentences_leave_doc_unchanged(self):
+        """Test sentence splitting does not annotate a (shared) Doc"""
+        doc = _parse_spacy(get_spacy_model(), "One here. Two there!",
+                           frozenset())
+        self.assertEqual(_doc_sentences(doc), ['One here.', 'Two there!'])
+        self.assertFalse(doc.has_annotation('SENT_START'))
+
+    def test_chunked_parse_matches_single_pass(self):
+        """Test a chunked parse has the same tokens and offsets"""
+        nlp = get_spacy_model()
+        single = _parse_spacy(nlp, self.text, frozenset())
+        with patch.object(Config, 'SPACY_CHUNK_CHARS', 500):
+            chunked = _parse_spacy(nlp, self.text, frozenset())
+
+        self.assertEqual(chunked.text, self.text)
+        self.assertEqual([(token.text, token.idx) for token in chunked],
+                         [(token.text, token.idx) for token in single])
+
+
+class TestIncrementalAnalysis(unittest.TestCase):
+    def setUp(self):
+        sentence_cache.clear()
+
+    def test_only_changed_sentences_are_processed(self):
+        """Test an edit re-runs only the sentence that changed"""
+        text = 'The cat sat. The dog ran. The bird flew.'
+        first, _ = perform_incremental('tokenization', text, 'spacy')
+        self.assertEqual(first['incremental'], {'sentences': 3, 'reused': 0})
+
+        edited, _ = perform_incremental('tokenization',
+                                        text.replace('dog', 'fox'), 'spacy')
+        self.assertEqual(edited['incremental'],
+                         {'sentences': 3, 'reused': 2})
+        self.assertEqual(edited['words'][5], 'fox')
+        self.assertEqual(edited['word_count'], 12)
+        self.assertEqual(edited['sentence_count'], 3)
+
+    def test_unsupported_task(self):
+        """Test tasks without per-sentence results are rejected"""
+        with self.assertRaises(ValueError):
+            perform_incremental('text_summarization', 'Some text here.')
+
+
+class TestSentimentTimeline(unittest.TestCase):
+    def setUp(self):
+        sentence_cache.clear()
+
+    @patch('nlp_utils.get_sentiment_analyzer')
+    def test_timeline_aggregates_sentence_scores(self, mock_analyzer):
+        """Test every sentence is scored once and the document is their mean"""
+        scores = {
+            'Good one here.': {'neg': 0.0, 'neu': 0.4, 'pos': 0.6,
+                               'compound': 0.5},
+            'Bad.': {'neg': 1.0, 'neu': 0.0, 'pos': 0.0, 'compound': -0.5}
+        }
+        mock_analyzer.return_value.polarity_scores.side_effect = scores.get
+
+        text = 'Good one here.  Bad.'
+        result, visualization = perform_sentiment_analysis(
+            text, timeline=True, include_text=False)
+
+        self.assertEqual(mock_analyzer.return_value.polarity_scores.call_count,
+                         2)
+        self.assertNotIn('text', result)
+        self.assertEqual([(entry['start'], entry['end'])
+                          for entry in result['timeline']],
+                         [(0, 14), (16, 20)])
+        # Weighted by word count: (3 * 0.5 + 1 * -0.5) / 4
+        self.assertEqual(result['scores']['compound'], 0.25)
+        self.assertEqual(visualization['timeline'], [0.5, -0.5])
+
+
+class TestVectorizedSentiment(unittest.TestCase):
+    texts = [
+        'The food was good.',
+        'The food was not very good!!',
+        'The food was GREAT, but the service was horrible.',
+        'It was kind of bad, at least the view was nice :)',
+        'Never so good. The least good thing. Good good bad',
+        'Yeah right, it was the bomb and a hard pressed win.',
+        'no',
+        '',
+        'Bad bad BAD?!?'
+    ]
+
+    def setUp(self):
+        # A small lexicon stands in for the VADER data file
+        self.analyzer = SentimentIntensityAnalyzer.__new__(
+            SentimentIntensityAnalyzer)
+        self.analyzer.constants = VaderConstants()
+        self.analyzer.lexicon = {'good': 1.9, 'great': 3.1, 'bad': -2.5,
+                                 'horrible': -2.5, 'nice': 1.8, ':)': 2.0,
+                                 'win': 2.8, 'no': -1.2, 'yeah': 1.2}
+
+    def test_matches_stock_vader(self):
+        """Test the vectorized engine reproduces the stock scores"""
+        engine = VectorizedSentimentAnalyzer(self.analyzer)
+        expected = [self.analyzer.polarity_scores(text) for text in self.texts]
+        self.assertEqual(engine.polarity_scores_batch(self.texts), expected)
+        self.assertEqual(engine.polarity_scores(self.texts[2]), expected[2])
+
+
+@patch('nlp_utils.get_stopwords', return_value=frozenset({'the', 'a', 'is'}))
+class TestTextSummarization(unittest.TestCase):
+    text = ('Cats like fish. The dog is loud. Cats and fish and cats. '
+            'A bird sings. Fish swim near cats. Rain falls.')
+
+    def test_scores_and_selection(self, mock_stopwords):
+        """Test sentences are scored by normalised term frequency"""
+        result = perform_text_summarization(self.text, num_sentences=2)
+
+        scores = [entry['score'] for entry in result['sentence_scores']]
+        # Weights are count / 4 (cats: 4, fish: 3, and: 2, like: 1)
+        self.assertEqual(scores[0], (4 + 1 + 3) / 4)
+        self.assertEqual(scores[2], (4 + 2 + 3 + 2 + 4) / 4)
+        self.assertEqual(result['summary_sentences'],
+                         ['Cats and fish and cats.',
+                          'Fish swim near cats.'])
+        self.assertEqual([entry['index'] for entry in result['sentence_scores']
+                          if entry['selected']], [2, 4])
+
+    def test_ties_keep_text_order(self, mock_stopwords):
+        """Test equally scored sentences are selected in text order"""
+        text = 'Red sky. Blue sea. Green hill. Red sky again.'
+        result = perform_text_summarization(text, ratio=0.5)
+        self.assertEqual(result['summary_sentences'],
+                         ['Red sky.', 'Red sky again.'])
+
+    def test_textrank_prefers_central_sentences(self, mock_stopwords):
+        """Test TextRank ranks the sentence most like the others highest"""
+        text = ('Cats chase mice. Dogs chase cats. Cats, dogs chase mice. '
+                'Dogs eat mice. Stars shine bright.')
+        result = perform_text_summarization(text, num_sentences=1,
+                                            method='textrank')
+
+        scores = [entry['score'] for entry in result['sentence_scores']]
+        self.assertEqual(result['method'], 'textrank')
+        self.assertEqual(result['summary_sentences'],
+                         ['Cats, dogs chase mice.'])
+        self.assertAlmostEqual(sum(scores), 1.0)
+        # An unconnected sentence keeps only the teleport share
+        self.assertEqual(scores[4], min(scores))
+
+    def test_hierarchical_sections(self, mock_stopwords):
+        """Test sections are summarized first and cover the whole text"""
+        text = ' '.join([self.text] * 6)
+        result = perform_hierarchical_summarization(text, num_sentences=2,
+                                                    section_chars=250)
+
+        sections = result['sections']
+        self.assertGreater(len(sections), 1)
+        self.assertEqual(sections[0]['start'], 0)
+        self.assertEqual(sections[-1]['end'], len(text))
+        self.assertTrue(all(a['end'] == b['start']
+                            for a, b in zip(sections, sections[1:])))
+        self.assertEqual(len(result['summary_sentences']), 2)
+        self.assertEqual(result['original_length'], len(text))
+        self.assertEqual([level['level'] for level in result['levels']],
+                         [1, 2])
+
+    def test_hierarchical_ratio_applies_once(self, mock_stopwords):
+        """Test the ratio is a share of the whole text, not of each level"""
+        text = ' '.join([self.text] * 6)
+        sentences = len(perform_text_summarization(text)['sentence_scores'])
+        result = perform_hierarchical_summarization(text, ratio=0.3,
+                                                    section_chars=250)
+        self.assertEqual(len(result['summary_sentences']),
+                         round(sentences * 0.3))
+
+    def test_invalid_options(self, mock_stopwords):
+        """Test out of range summary sizes are rejected"""
+        with self.assertRaises(ValueError):
+            perform_text_summarization(self.text, ratio=1.5)
+        with self.assertRaises(ValueError):
+            perform_text_summarization(self.text, num_sentences=0)
+        with self.assertRaises(ValueError):
+            perform_text_summarization(self.text, method='lsa')
+
+
+@patch('nlp_utils.get_stopwords', return_value=frozenset({'of', 'the'}))
+class TestKeyphraseMethods(unittest.TestCase):
+    text = ('Compatibility of systems of linear constraints. '
+            'Linear constraints matter.')
+
+    def test_rake_scores(self, mock_stopwords):
+        """Test RAKE scores phrases by word degree over frequency"""
+        result, _ = perform_keyword_extraction(self.text, method='rake')
+        # linear, constraints: degree 5 / frequency 2; matter: 3 / 1
+        self.assertEqual(result['keywords'], {
+            'linear constraints matter': 8.0,
+            'linear constraints': 5.0,
+            'compatibility': 1.0,
+            'systems': 1.0
+        })
+
+    def test_yake_ranks_phrases(self, mock_stopwords):
+        """Test YAKE-style scores are normalised so the best phrase is 1"""
+        result, _ = perform_keyword_extraction(self.text, method='yake')
+        scores = list(result['keywords'].values())
+        self.assertEqual(scores[0], 1.0)
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertIn('linear constraints', result['keywords'])
+
+    def test_unsupported_methods(self, mock_stopwords):
+        """Test noun chunks need spaCy and unknown methods are rejected"""
+        with self.assertRaises(ValueError):
+            perform_keyword_extraction(self.text, 'nltk', 'noun_chunks')
+        with self.assertRaises(ValueError):
+            perform_keyword_extraction(self.text, method='textrank')
+
+
+@patch('nlp_utils.word_tokenize', side_effect=str.split)
+class TestHashingSimilarity(unittest.TestCase):
+    """Test cases for the hashing similarity vectorizer"""
+
+    pairs = [
+        ("Cats chase mice in the barn", "The barn cats sleep all day"),
+        ("Stock prices rose sharply", "Prices of stock fell sharply today"),
+        ("Completely unrelated words", "Nothing shared whatsoever here"),
+        ("Repeat repeat repeat word", "Repeat word once")
+    ]
+
+    def setUp(self):
+        vector_cache.clear()
+
+    def test_matches_pairwise_tfidf(self, mock_tokenize):
+        """Test hashing scores equal the per-pair TF-IDF scores"""
+        for text1, text2 in self.pairs:
+            tfidf, _ = perform_text_similarity(text1, text2)
+            hashing, _ = perform_text_similarity(text1, text2,
+                                                 vectorizer='hashing')
+            self.assertAlmostEqual(hashing['similarity_score'],
+                                   tfidf['similarity_score'], places=9)
+            self.assertEqual(sorted(hashing['common_terms']),
+                             sorted(tfidf['common_terms']))
+
+    def test_vectors_cached_per_text(self, mock_tokenize):
+        """Test each text is vectorized once however often it is compared"""
+        query = "Cats chase mice in the barn"
+        hits = vector_cache.stats()['hits']
+        for _, other in self.pairs:
+            perform_text_similarity(query, other, vectorizer='hashing')
+        stats = vector_cache.stats()
+        self.assertEqual(stats['entries'], 1 + len(self.pairs))
+        self.assertEqual(stats['hits'] - hits, len(self.pairs) - 1)
+
+    def test_unknown_vectorizer(self, mock_tokenize):
+        """Test unknown vectorizers are rejected"""
+        with self.assertRaises(ValueError):
+            perform_text_similarity("a b", "b c", vectorizer='bm25')
+
+
+class TestSimilarityMatrix(unittest.TestCase):
+    """Test cases for the blocked pairwise similarity matrix"""
+
+    texts = [f"shared topic words plus token{i % 4} and item{i % 3}"
+             for i in range(12)] + ["the and of"]
+
+    def test_blocks_match_single_block(self):
+        """Test small row blocks give the same matrix and pairs"""
+        full = perform_similarity_matrix(self.texts)
+        pairs = perform_similarity_matrix(self.texts, 0.5)
+        with patch('nlp_utils.Config.SIMILARITY_BLOCK_CELLS', 20):
+            self.assertEqual(perform_similarity_matrix(self.texts), full)
+            self.assertEqual(perform_similarity_matrix(self.texts, 0.5),
+                             pairs)
+
+        matrix = full['matrix']
+        expected = {(a, b) for a in range(len(matrix))
+                    for b in range(a + 1, len(matrix)) if matrix[a][b] >= 0.5}
+        self.assertEqual({(p['a'], p['b']) for p in pairs['pairs']}, expected)
+        scores = [p['score'] for p in pairs['pairs']]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        # The stop-word-only text matches nothing
+        self.assertEqual(matrix[-1][:-1], [0.0] * (len(matrix) - 1))
+
+    def test_pair_limit(self):
+        """Test too many pairs above the threshold are rejected"""
+        with patch('nlp_utils.Config.SIMILARITY_MATRIX_MAX_PAIRS', 3):
+            with self.assertRaises(ValueError):
+                perform_similarity_matrix(self.texts, 0.1)
+
+
+class TestNearDuplicates(unittest.TestCase):
+    """Test cases for MinHash near-duplicate detection"""
+
+    base = ('Quarterly revenue grew in every region while costs stayed flat, '
+            'so the board raised its forecast for the rest of the year and '
+            'approved a new round of hiring in the engineering teams')
+
+    def test_estimate_tracks_jaccard(self):
+        """Test signature agreement estimates shingle overlap"""
+        edited = self.base.replace('flat', 'level')
+        signature = minhash_signature(self.base)
+        self.assertEqual(estimate_jaccard(signature, signature), 1.0)
+        # 3 of 31 shingles change: Jaccard 28 / 34
+        self.assertAlmostEqual(
+            estimate_jaccard(signature, minhash_signature(edited)),
+            28 / 34, delta=0.1)
+        self.assertLess(estimate_jaccard(
+            signature, minhash_signature('An unrelated note about cats')),
+            0.1)
+
+    def test_groups(self):
+        """Test near-duplicates are grouped and other texts left out"""
+        texts = [self.base,
+                 'Completely different words about weather and rain',
+                 self.base.replace('flat', 'level'),
+                 self.base, self.base, '', '...']
+        result = perform_near_duplicate_detection(texts, 0.7)
+        self.assertEqual([group['documents'] for group in result['groups']],
+                         [[0, 2, 3, 4]])
+        self.assertGreaterEqual(result['groups'][0]['similarity'], 0.7)
+        self.assertLess(result['groups'][0]['similarity'], 1.0)
+
+
+class TestLanguageDetection(unittest.TestCase):
+    """Test cases for single-pass language detection"""
+
+    def test_single_detector_run(self):
+        """Test the top language and probabilities come from one run"""
+        factory = get_language_detector_factory()
+        with patch.object(factory, 'create',
+                          wraps=factory.create) as mock_create:
+            result = perform_language_detection(
+                "El rápido zorro marrón salta sobre el perro perezoso.")
+        mock_create.assert_called_once()
+        self.assertEqual(result['language_code'], 'es')
+        self.assertEqual(result['language_name'], 'Spanish')
+        self.assertEqual(result['probabilities'][0]['lang'], 'es')
+        self.assertEqual(result['method'], 'langdetect')
+
+    def test_script_shortcut(self):
+        """Test single-language scripts and letterless texts skip the detector"""
+        factory = get_language_detector_factory()
+        with patch.object(factory, 'create') as mock_create:
+            greek = perform_language_detection("Η γρήγορη καφέ αλεπού")
+            japanese = perform_language_detection("素早い茶色の狐")
+            empty = perform_language_detection("12345 !!!")
+        mock_create.assert_not_called()
+        self.assertEqual((greek['language_code'], greek['method']),
+                         ('el', 'script'))
+        self.assertEqual(japanese['language_code'], 'ja')
+        self.assertEqual((empty['language_code'], empty['probabilities']),
+                         ('unknown', []))
+
+    def test_short_ascii_text_uses_detector(self):
+        """Test short ASCII texts with letters still go to the detector"""
+        factory = get_language_detector_factory()
+        with patch.object(factory, 'create',
+                          wraps=factory.create) as mock_create:
+            result = perform_language_detection("Hola amigo")
+        mock_create.assert_called_once()
+        self.assertEqual(result['method'], 'langdetect')
+
+    def test_batch(self):
+        """Test batch detection matches detecting texts one by one"""
+        texts = ["The quick brown fox jumps over the lazy dog.",
+                 "Быстрая коричневая лиса прыгает через ленивую собаку.",
+                 "빠른 갈색 여우"]
+        outputs = perform_batch('language_detection',
+                                [(i, text, None) for i, text in
+                                 enumerate(texts)], library='spacy')
+        for i, text in enumerate(texts):
+            self.assertEqual(outputs[i]['result'],
+                             perform_language_detection(text))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,10 @@
+import codecs
+import json
 import logging
 import traceback
+from cache import create_cache, hash_text
+from config import Config
+from corpus_index import add_to_corpus_index, get_corpus_index
 from nlp_utils import (
     perform_tokenization,
     perform_stopword_removal,
@@ -8,14 +13,33 @@ from nlp_utils import (
     perform_ner,
     perform_sentiment_analysis,
     perform_text_summarization,
+    perform_hierarchical_summarization,
     perform_keyword_extraction,
     perform_text_similarity,
-    perform_language_detection
+    perform_similarity_matrix,
+    perform_near_duplicate_detection,
+    perform_language_detection,
+    perform_analysis,
+    perform_batch,
+    perform_incremental,
+    stream_tokenization,
+    ANALYSIS_TASKS,
+    INCREMENTAL_TASKS,
+    SENTIMENT_ENGINES,
+    doc_cache,
+    sentence_cache,
+    vector_cache
 )
 
 # Setup logger
 logger = logging.getLogger(__name__)
 
+# Cache of task results in front of process_nlp_task
+result_cache = create_cache('results',
+                            max_entries=Config.RESULT_CACHE_MAX_ENTRIES,
+                            max_bytes=Config.RESULT_CACHE_MAX_BYTES,
+                            ttl=Config.RESULT_CACHE_TTL)
+
 def validate_text_input(text, task, comparison_text=None):
     """
     Validate text input for NLP tasks.
@@ -36,6 +60,10 @@ def validate_text_input(text, task, comparison_text=None):
         
     if task == 'text_summarization' and len(text) < 200:
         return "For text summarization, input must be at least 200 characters long"
+
+    if task == 'text_summarization' and len(text) > Config.SUMMARY_MAX_CHARS:
+        return (f"For text summarization, input must be at most "
+                f"{Config.SUMMARY_MAX_CHARS} characters long")
         
     if task == 'text_similarity':
         if not comparison_text:
@@ -45,7 +73,8 @@ def validate_text_input(text, task, comparison_text=None):
             
     return None
 
-def process_nlp_task(task, library, text, comparison_text=None):
+def process_nlp_task(task, library, text, comparison_text=None,
+                     options=None):
     """
     Process the requested NLP task with error handling.
     
@@ -54,6 +83,17 @@ def process_nlp_task(task, library, text, comparison_text=None):
         library (str): The library to use ('nltk' or 'spacy')
         text (str): The text to process
         comparison_text (str, optional): Secondary text for comparison tasks
+        options (dict, optional): Task options; 'incremental' reuses the
+            results of sentences seen before (see INCREMENTAL_TASKS), and
+            for sentiment 'timeline' adds per-sentence scores,
+            'include_text' (default true) echoes the text back and
+            'engine' picks the scorer (see SENTIMENT_ENGINES); for
+            summarization 'ratio' or 'num_sentences' sets the summary size
+            and 'method' the scoring (see SUMMARY_METHODS), while
+            'hierarchical' summarizes sections first (the default for
+            texts over SUMMARY_HIERARCHICAL_CHARS); for keywords 'method'
+            picks the scorer (see KEYWORD_METHODS); for similarity
+            'vectorizer' picks the vectors (see SIMILARITY_VECTORIZERS)
         
     Returns:
         tuple: (result_dict, visualization_data)
@@ -66,7 +106,13 @@ def process_nlp_task(task, library, text, comparison_text=None):
         # Validate library choice
         if library not in ['nltk', 'spacy']:
             library = 'nltk'  # Default to nltk if invalid
-            
+        options = options or {}
+
+        engine = options.get('engine', Config.DEFAULT_SENTIMENT_ENGINE)
+
+        if _is_incremental(task, options):
+            return perform_incremental(task, text, library, engine)
+
         # Process based on task
         if task == 'tokenization':
             result = perform_tokenization(text, library)
@@ -89,19 +135,32 @@ def process_nlp_task(task, library, text, comparison_text=None):
             return result, None
             
         elif task == 'sentiment_analysis':
-            return perform_sentiment_analysis(text, library)
+            return perform_sentiment_analysis(
+                text, library, timeline=bool(options.get('timeline')),
+                include_text=options.get('include_text', True),
+                engine=engine)
             
         elif task == 'text_summarization':
-            result = perform_text_summarization(text, library)
+            hierarchical = options.get('hierarchical')
+            if hierarchical is None:
+                hierarchical = len(text) > Config.SUMMARY_HIERARCHICAL_CHARS
+            summarize = (perform_hierarchical_summarization if hierarchical
+                         else perform_text_summarization)
+            result = summarize(text, library, ratio=options.get('ratio'),
+                               num_sentences=options.get('num_sentences'),
+                               method=options.get('method', 'frequency'))
             return result, None
             
         elif task == 'keyword_extraction':
-            return perform_keyword_extraction(text, library)
+            return perform_keyword_extraction(
+                text, library, method=options.get('method', 'tfidf'))
             
         elif task == 'text_similarity':
             if not comparison_text:
                 raise ValueError("Comparison text is required for text similarity analysis")
-            return perform_text_similarity(text, comparison_text, library)
+            return perform_text_similarity(
+                text, comparison_text, library,
+                vectorizer=options.get('vectorizer', 'tfidf'))
             
         elif task == 'language_detection':
             result = perform_language_detection(text)
@@ -114,6 +173,410 @@ def process_nlp_task(task, library, text, comparison_text=None):
         logger.error(f"Error processing {task} with {library}: {str(e)}\n{traceback.format_exc()}")
         raise
 
+def _is_incremental(task, options):
+    """Check whether a request runs through incremental analysis."""
+    # A sentiment timeline already reuses cached sentence scores
+    return bool(options.get('incremental') and task in INCREMENTAL_TASKS and
+                not options.get('timeline'))
+
+def _result_size(value):
+    """Approximate the size of a cached result by its JSON length."""
+    return len(json.dumps(value, default=str))
+
+def process_nlp_task_cached(task, library, text, comparison_text=None,
+                            options=None):
+    """
+    Process an NLP task, serving repeated requests from the result cache.
+
+    Results are keyed on the task, library, options and SHA-256 of the
+    input texts. The comparison text only takes part for text similarity,
+    the one task that uses it. Incremental requests bypass the cache: their
+    results report how many sentences this call reused, and the sentence
+    cache already makes repeating them cheap.
+
+    Args:
+        task (str): The NLP task to perform
+        library (str): The library to use ('nltk' or 'spacy')
+        text (str): The text to process
+        comparison_text (str, optional): Secondary text for comparison tasks
+        options (dict, optional): Task options (see process_nlp_task)
+
+    Returns:
+        tuple: (result_dict, visualization_data, cache_hit)
+    """
+    if library not in ['nltk', 'spacy']:
+        library = 'nltk'  # Default to nltk if invalid
+    if task != 'text_similarity':
+        comparison_text = None
+
+    options = options or {}
+    if _is_incremental(task, options):
+        result, visualization_data = process_nlp_task(
+            task, library, text, comparison_text, options)
+        return result, visualization_data, False
+
+    key = (task, library, hash_text(text), hash_text(comparison_text),
+           json.dumps(options, sort_keys=True))
+    cached = result_cache.get(key)
+    if cached is not None:
+        return cached[0], cached[1], True
+
+    result, visualization_data = process_nlp_task(task, library, text,
+                                                  comparison_text, options)
+    value = (result, visualization_data)
+    result_cache.set(key, value, size=_result_size(value))
+    return result, visualization_data, False
+
+def process_nlp_tasks(tasks, library, text, comparison_text=None,
+                      options=None):
+    """
+    Process several NLP tasks on the same text in one pass.
+
+    Args:
+        tasks (list): The NLP tasks to perform
+        library (str): The library to use ('nltk' or 'spacy')
+        text (str): The text to process
+        comparison_text (str, optional): Secondary text for comparison tasks
+        options (dict, optional): 'method' picks the keyword scorer, as for
+            process_nlp_task
+
+    Returns:
+        dict: {'result', 'visualization'} dictionaries keyed by task
+
+    Raises:
+        ValueError: If inputs are invalid
+        Exception: For other processing errors
+    """
+    if not isinstance(tasks, list) or not tasks:
+        raise ValueError("Tasks must be a non-empty list")
+
+    unsupported = [task for task in tasks if task not in ANALYSIS_TASKS]
+    if unsupported:
+        raise ValueError(f"Unsupported task: {unsupported[0]}")
+
+    # Drop duplicates while keeping the requested order
+    tasks = list(dict.fromkeys(tasks))
+    for task in tasks:
+        error = validate_text_input(text, task, comparison_text)
+        if error:
+            raise ValueError(error)
+
+    try:
+        # Validate library choice
+        if library not in ['nltk', 'spacy']:
+            library = 'nltk'  # Default to nltk if invalid
+
+        options = options or {}
+        return perform_analysis(text, tasks, library, comparison_text,
+                                keyword_method=options.get('method', 'tfidf'))
+    except Exception as e:
+        logger.error(f"Error processing {tasks} with {library}: {str(e)}\n{traceback.format_exc()}")
+        raise
+
+def process_nlp_batch(task, library, items, batch_size=None, n_process=1,
+                      options=None):
+    """
+    Process one NLP task over a batch of texts.
+
+    Items that fail validation or processing are reported individually
+    and do not fail the rest of the batch.
+
+    Args:
+        task (str): The NLP task to perform
+        library (str): The library to use ('nltk' or 'spacy')
+        items (list): Dictionaries with 'id', 'text' and, for text
+            similarity, 'comparison_text'
+        batch_size (int, optional): Number of texts per batch
+        n_process (int): Number of worker processes
+        options (dict, optional): Task options; 'engine' picks the
+            sentiment scorer (see SENTIMENT_ENGINES)
+
+    Returns:
+        dict: Per-item outputs keyed by id
+
+    Raises:
+        ValueError: If the batch itself is invalid
+    """
+    if task not in ANALYSIS_TASKS:
+        raise ValueError(f"Unsupported task: {task}")
+    if not isinstance(items, list) or not items:
+        raise ValueError("Items must be a non-empty list")
+    if len(items) > Config.BATCH_MAX_ITEMS:
+        raise ValueError(
+            f"A batch can contain at most {Config.BATCH_MAX_ITEMS} items")
+
+    batch_size = batch_size or Config.BATCH_DEFAULT_SIZE
+    if batch_size < 1:
+        raise ValueError("Batch size must be at least 1")
+    n_process = max(1, min(n_process, Config.BATCH_MAX_PROCESSES))
+    options = options or {}
+    engine = options.get('engine', Config.DEFAULT_SENTIMENT_ENGINE)
+    if engine not in SENTIMENT_ENGINES:
+        raise ValueError(f"Unsupported sentiment engine: {engine}")
+
+    # Validate library choice
+    if library not in ['nltk', 'spacy']:
+        library = 'nltk'  # Default to nltk if invalid
+
+    outputs = {}
+    valid_items = []
+    for item in items:
+        if not isinstance(item, dict) or 'id' not in item:
+            raise ValueError("Each item must be an object with an 'id'")
+        item_id = str(item['id'])
+        if item_id in outputs:
+            raise ValueError(f"Duplicate item id: {item_id}")
+
+        text = item.get('text', '')
+        comparison_text = item.get('comparison_text')
+        if comparison_text is None:
+            comparison_text = ''
+        if not isinstance(text, str):
+            error = "Text must be a string"
+        elif not isinstance(comparison_text, str):
+            error = "Comparison text must be a string"
+        else:
+            error = validate_text_input(text, task, comparison_text)
+        if error:
+            outputs[item_id] = {'success': False, 'error': error}
+        else:
+            outputs[item_id] = None
+            valid_items.append((item_id, text, comparison_text))
+
+    if valid_items:
+        try:
+            outputs.update(perform_batch(task, valid_items, library,
+                                         batch_size, n_process, engine))
+        except Exception as e:
+            logger.error(f"Error processing batch {task} with {library}: {str(e)}\n{traceback.format_exc()}")
+            raise
+
+    return outputs
+
+def read_text_chunks(stream, chunk_size=None):
+    """
+    Read a UTF-8 byte stream incrementally as text chunks.
+
+    Multi-byte characters split across reads are decoded correctly.
+
+    Args:
+        stream: File-like object with a read(size) method
+        chunk_size (int, optional): Number of bytes per read
+
+    Yields:
+        str: Decoded text chunks
+    """
+    chunk_size = chunk_size or Config.STREAM_CHUNK_SIZE
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    while True:
+        data = stream.read(chunk_size)
+        if not data:
+            break
+        text = decoder.decode(data)
+        if text:
+            yield text
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+def stream_nlp_task(task, library, chunks):
+    """
+    Process a text stream and yield the results as NDJSON.
+
+    One line is emitted per sentence, followed by a summary line. Errors
+    after the response has started are reported as a final error line.
+
+    Args:
+        task (str): The NLP task to perform (only 'tokenization' streams)
+        library (str): The library to use ('nltk' or 'spacy')
+        chunks (iterable): Text chunks in document order
+
+    Yields:
+        str: NDJSON lines, one batch of sentences at a time
+    """
+    if task != 'tokenization':
+        raise ValueError(f"Streaming is not supported for task: {task}")
+    if library not in ['nltk', 'spacy']:
+        library = 'nltk'  # Default to nltk if invalid
+
+    sentence_count = 0
+    word_count = 0
+    try:
+        for batch in stream_tokenization(chunks, library):
+            sentence_count += len(batch)
+            word_count += sum(len(item['tokens']) for item in batch)
+            yield ''.join(json.dumps(item) + '\n' for item in batch)
+    except Exception as e:
+        logger.error(f"Error streaming {task} with {library}: {str(e)}\n{traceback.format_exc()}")
+        yield json.dumps({'error': f'An error occurred: {str(e)}'}) + '\n'
+        return
+
+    yield json.dumps({'summary': {'sentence_count': sentence_count,
+                                  'word_count': word_count}}) + '\n'
+
+def _corpus_documents(documents, max_items=None):
+    """
+    Validate a list of {id, text} documents.
+
+    Args:
+        documents (list): Dictionaries with 'id' and 'text'
+        max_items (int, optional): Most documents accepted (defaults to
+            Config.BATCH_MAX_ITEMS)
+
+    Returns:
+        list: (id, text) pairs
+
+    Raises:
+        ValueError: If the documents are invalid
+    """
+    max_items = max_items or Config.BATCH_MAX_ITEMS
+    if not isinstance(documents, list) or not documents:
+        raise ValueError("Documents must be a non-empty list")
+    if len(documents) > max_items:
+        raise ValueError(f"At most {max_items} documents can be sent at once")
+    pairs = []
+    for document in documents:
+        if not isinstance(document, dict) or 'id' not in document:
+            raise ValueError("Each document must be an object with an 'id'")
+        text = document.get('text')
+        if not isinstance(text, str) or not text.strip():
+            raise ValueError(f"Document {document['id']} has no text")
+        pairs.append((str(document['id']), text))
+    return pairs
+
+def index_documents(documents):
+    """
+    Add reference documents to the similarity search index.
+
+    Args:
+        documents (list): Dictionaries with 'id' and 'text'
+
+    Returns:
+        int: Number of indexed documents
+
+    Raises:
+        ValueError: If the documents are invalid or already indexed
+    """
+    return add_to_corpus_index(_corpus_documents(documents))
+
+def search_similar_documents(text, top_k=10):
+    """
+    Find the indexed documents most similar to a text.
+
+    Args:
+        text (str): The query text
+        top_k (int): Number of documents to return
+
+    Returns:
+        tuple: ({'id', 'score'} list, number of indexed documents)
+
+    Raises:
+        ValueError: If the query is invalid
+    """
+    error = validate_text_input(text, 'text_similarity', text)
+    if error:
+        raise ValueError(error)
+    if not 1 <= top_k <= Config.SIMILARITY_MAX_TOP_K:
+        raise ValueError(
+            f"top_k must be between 1 and {Config.SIMILARITY_MAX_TOP_K}")
+    index = get_corpus_index()
+    return index.search(text, top_k), len(index)
+
+def compute_similarity_matrix(documents, threshold=None):
+    """
+    Compute the pairwise similarity of a list of documents.
+
+    Args:
+        documents (list): Dictionaries with 'id' and 'text'
+        threshold (float, optional): Only return pairs scoring at least
+            this; required above Config.SIMILARITY_MATRIX_MAX_DENSE documents
+
+    Returns:
+        dict: The document ids plus the 'matrix' or the 'pairs', whose 'a'
+            and 'b' are positions in the ids
+
+    Raises:
+        ValueError: If the documents or the threshold are invalid
+    """
+    pairs = _corpus_documents(documents,
+                              Config.SIMILARITY_MATRIX_MAX_DOCUMENTS)
+    if threshold is None:
+        if len(pairs) > Config.SIMILARITY_MATRIX_MAX_DENSE:
+            raise ValueError(
+                f"A threshold is required for more than "
+                f"{Config.SIMILARITY_MATRIX_MAX_DENSE} documents")
+    elif not 0 < threshold <= 1:
+        raise ValueError("threshold must be greater than 0 and at most 1")
+
+    result = perform_similarity_matrix([text for _, text in pairs], threshold)
+    result['ids'] = [doc_id for doc_id, _ in pairs]
+    return result
+
+def _near_duplicate_threshold(threshold):
+    """Default and validate a near-duplicate threshold."""
+    if threshold is None:
+        return Config.NEAR_DUPLICATE_THRESHOLD
+    if not 0 < threshold <= 1:
+        raise ValueError("threshold must be greater than 0 and at most 1")
+    return threshold
+
+def find_near_duplicates(documents, threshold=None):
+    """
+    Group near-duplicates within a list of documents.
+
+    Args:
+        documents (list): Dictionaries with 'id' and 'text'
+        threshold (float, optional): Minimum estimated Jaccard similarity
+
+    Returns:
+        dict: Groups of near-duplicate document ids with their similarity
+
+    Raises:
+        ValueError: If the documents or the threshold are invalid
+    """
+    pairs = _corpus_documents(documents,
+                              Config.SIMILARITY_MATRIX_MAX_DOCUMENTS)
+    result = perform_near_duplicate_detection(
+        [text for _, text in pairs], _near_duplicate_threshold(threshold))
+    for group in result['groups']:
+        group['documents'] = [pairs[i][0] for i in group['documents']]
+    return result
+
+def check_near_duplicates(text, threshold=None):
+    """
+    Find the indexed documents that are near-duplicates of a text.
+
+    Args:
+        text (str): The text to check
+        threshold (float, optional): Minimum estimated Jaccard similarity
+
+    Returns:
+        tuple: ({'id', 'similarity'} list, number of indexed documents)
+
+    Raises:
+        ValueError: If the text or the threshold are invalid
+    """
+    error = validate_text_input(text, 'near_duplicates')
+    if error:
+        raise ValueError(error)
+    index = get_corpus_index()
+    return (index.near_duplicates(text, _near_duplicate_threshold(threshold)),
+            len(index))
+
+def get_cache_stats():
+    """
+    Get usage statistics for the NLP caches.
+
+    Returns:
+        dict: Cache statistics keyed by cache name
+    """
+    return {
+        'doc_cache': doc_cache.stats(),
+        'sentence_cache': sentence_cache.stats(),
+        'vector_cache': vector_cache.stats(),
+        'result_cache': result_cache.stats()
+    }
+
 def get_code_samples():
     """
     Get code samples for the code explanation panel.